@@ -9,7 +9,7 @@ from datetime import datetime
 from app.database import get_db
 from app.models import Device, User
 from app.security import get_current_user
-from app.core.model_loader import model_loader # [NEW]
+from app.core.model_registry import model_registry # [수정] 모델 로더(torch) 대신 registry 인덱스만 사용
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -132,7 +132,7 @@ async def get_available_models(
     Registry에 등록된 사용 가능한 AI 모델들의 목록을 반환합니다.
     device_type 파라미터를 통해 특정 장비 타입에 맞는 모델만 필터링할 수 있습니다.
     """
-    models_list = model_loader.get_available_models(device_type=device_type) # 필터링된 모델 목록 가져오기
+    models_list = model_registry.get_available_models(device_type=device_type) # 필터링된 모델 목록 가져오기
     
     # ModelInfo Pydantic 모델에 맞춰 데이터 필터링/변환
     response_models = []
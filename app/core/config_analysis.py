@@ -14,9 +14,31 @@ TRAINING_AUDIO_DATA_DIR_AE = BASE_DIR / "data_backup" / "normal"
 TRAINING_AUDIO_DATA_DIR_IF = BASE_DIR / "data_backup" / "normal"
 
 # --- 오디오 분석 관련 상수 ---
-# 강제 리샘플링할 샘플링 레이트
+# 강제 리샘플링할 샘플링 레이트 (업로드 변환 시 이 레이트로 저장 → 워커에서 리샘플링 생략)
 SAMPLE_RATE = 16000
 
+# 분석에 사용할 클립 앞부분 길이 (초)
+ANALYSIS_DURATION_SEC = 10
+
+# --- 긴 녹음 슬라이딩 윈도우 분석 ---
+# 녹음이 한 윈도우보다 길면 앞부분만 자르지 않고 겹치는 윈도우로 나눠 전체를 분석 (윈도우별 타임라인 + 종합 판정)
+WINDOWED_ANALYSIS = os.getenv("WINDOWED_ANALYSIS", "true").lower() in ("1", "true", "yes")
+# 윈도우 길이 / 간격 (초) - 모델이 학습한 클립 길이와 같은 ANALYSIS_DURATION_SEC 기본
+ANALYSIS_WINDOW_SEC = float(os.getenv("ANALYSIS_WINDOW_SEC", str(ANALYSIS_DURATION_SEC)))
+ANALYSIS_WINDOW_HOP_SEC = float(os.getenv("ANALYSIS_WINDOW_HOP_SEC", "5"))
+# 한 번에 디코딩/추론할 윈도우 수 - 메모리 사용량은 녹음 길이와 무관하게 이 윈도우 수 분량으로 제한
+ANALYSIS_WINDOW_BATCH = max(1, int(os.getenv("ANALYSIS_WINDOW_BATCH", "8")))
+# 녹음당 최대 윈도우 수 (초과하면 간격을 넓혀 녹음 전체에 고르게 배치)
+ANALYSIS_MAX_WINDOWS = max(1, int(os.getenv("ANALYSIS_MAX_WINDOWS", "720")))
+# 이 길이(초) 이상인 표준 WAV 녹음은 R2 byte-range 세그먼트로 나눠 Celery chord로 여러 워커에 분산 분석 (0이면 비활성화)
+FANOUT_MIN_DURATION_SEC = float(os.getenv("FANOUT_MIN_DURATION_SEC", "600"))
+# 세그먼트 태스크 1건이 분석할 윈도우 수 (기본 24 = 5초 간격에서 약 2분 분량)
+FANOUT_WINDOWS_PER_SEGMENT = max(1, int(os.getenv("FANOUT_WINDOWS_PER_SEGMENT", "24")))
+
+# STFT 파라미터 (librosa 기본값과 동일) - SpectralFrontend가 클립당 1회만 계산
+N_FFT = 2048
+HOP_LENGTH = 512
+
 # 밴드패스 필터 주파수 대역 (Hz)
 BP_LOW = 2000
 BP_HIGH = 10000
@@ -33,6 +55,84 @@ N_ML_FEATURES = 30
 # Isolation Forest contamination (이상치 비율)
 IF_CONTAMINATION = 0.01
 
+# Isolation Forest 추론에 sklearn 대신 평탄화된 numpy 트리 평가기 사용 (forest_evaluator.py)
+IF_FLAT_EVALUATOR = os.getenv("IF_FLAT_EVALUATOR", "true").lower() in ("1", "true", "yes")
+
+# Autoencoder 추론에 TorchScript + 동적 int8 양자화 모델 사용 (registry의 file_name_compiled가 있을 때)
+AE_COMPILED_INFERENCE = os.getenv("AE_COMPILED_INFERENCE", "true").lower() in ("1", "true", "yes")
+# 양자화 모델 export 시 허용할 eager 모델 대비 최대 정규화 점수 차이 (초과하면 export하지 않음)
+AE_COMPILED_MAX_SCORE_DIFF = float(os.getenv("AE_COMPILED_MAX_SCORE_DIFF", "0.05"))
+
+# --- 업로드 오디오 변환 (ffmpeg) ---
+# API 프로세스당 동시에 실행할 ffmpeg/ffprobe 프로세스 수 (이벤트 루프 보호)
+FFMPEG_MAX_CONCURRENCY = int(os.getenv("FFMPEG_MAX_CONCURRENCY", "4"))
+# ffmpeg 변환 / ffprobe 조회 1회당 타임아웃 (초)
+FFMPEG_TIMEOUT_SEC = float(os.getenv("FFMPEG_TIMEOUT_SEC", "60"))
+FFPROBE_TIMEOUT_SEC = float(os.getenv("FFPROBE_TIMEOUT_SEC", "15"))
+
+# --- 스트리밍 업로드 (임시 파일 없이 R2 multipart 전송) ---
+# multipart part 크기 (S3/R2 최소 5MiB) - 업로드당 메모리 사용량은 약 part 2개 분량으로 고정
+STREAM_PART_SIZE = max(5 * 1024 * 1024, int(os.getenv("STREAM_PART_SIZE_MB", "8")) * 1024 * 1024)
+# 스트리밍 업로드 최대 크기 (기존 multipart/form 업로드의 5MB 제한 대체)
+STREAM_MAX_UPLOAD_BYTES = int(os.getenv("STREAM_MAX_UPLOAD_MB", "200")) * 1024 * 1024
+# 스트리밍 변환 전체 타임아웃 (네트워크 업로드 시간 포함)
+FFMPEG_STREAM_TIMEOUT_SEC = float(os.getenv("FFMPEG_STREAM_TIMEOUT_SEC", "600"))
+
+# --- Presigned 직접 업로드 (모바일 → R2) ---
+PRESIGNED_UPLOAD_EXPIRES_SEC = int(os.getenv("PRESIGNED_UPLOAD_EXPIRES_SEC", "900"))
+
+# --- 일괄 업로드 (게이트웨이) ---
+MAX_BATCH_UPLOAD_FILES = int(os.getenv("MAX_BATCH_UPLOAD_FILES", "32"))
+
+# --- 워커 마이크로 배치 분석 ---
+# 태스크 1건 실행 시 함께 가져와 분석할 최대 PENDING 분석 수 (1이면 배치 비활성화)
+ANALYSIS_BATCH_SIZE = max(1, int(os.getenv("ANALYSIS_BATCH_SIZE", "8")))
+# 배치를 채우기 위해 추가 PENDING 분석을 기다리는 최대 시간 (ms) - 조회 결과가 비면(대기열이 비어 있으면) 바로 중단
+ANALYSIS_BATCH_WAIT_MS = float(os.getenv("ANALYSIS_BATCH_WAIT_MS", "50"))
+# PROCESSING 선점이 이 시간(초)보다 오래되면 선점한 워커가 죽은 것으로 보고 다른 태스크가 인수 (워커 시작 시 재등록)
+ANALYSIS_CLAIM_TIMEOUT_SEC = float(os.getenv("ANALYSIS_CLAIM_TIMEOUT_SEC", "1800"))
+# 현재 클립을 분석하는 동안 미리 내려받을 다음 클립 수 (다운로드 중 + 대기 중 합계 상한)
+AUDIO_PREFETCH_DEPTH = max(1, int(os.getenv("AUDIO_PREFETCH_DEPTH", "2")))
+# R2 byte-range 읽기 블록 크기 - 이보다 큰 녹음은 통째로 받지 않고 블록 단위 range 요청으로 윈도우를 읽음
+# (기본 4MiB = 16kHz 16-bit 모노 약 2분, 녹음당 메모리는 블록 AUDIO_RANGE_CACHE_BLOCKS개 분량)
+AUDIO_RANGE_BLOCK_BYTES = max(64 * 1024, int(float(os.getenv("AUDIO_RANGE_BLOCK_MB", "4")) * 1024 * 1024))
+AUDIO_RANGE_CACHE_BLOCKS = max(1, int(os.getenv("AUDIO_RANGE_CACHE_BLOCKS", "2")))
+
+# --- 앙상블 분석 (model_preference="ensemble") ---
+# Rule-based / Isolation Forest / Autoencoder를 동시에 실행할 스레드 수 (프로세스당)
+ENSEMBLE_MAX_WORKERS = max(1, int(os.getenv("ENSEMBLE_MAX_WORKERS", "3")))
+# 모델별 투표 가중치 (융합 점수 = 사용 가능한 투표의 가중 평균), 예: "rule=1,isolation_forest=1,autoencoder=1"
+ENSEMBLE_WEIGHTS = {
+    name.strip(): float(weight)
+    for name, weight in (
+        item.split("=", 1)
+        for item in os.getenv("ENSEMBLE_WEIGHTS", "rule=1.0,isolation_forest=1.0,autoencoder=1.0").split(",")
+        if "=" in item
+    )
+}
+
+# --- 캐스케이드 분석 (model_preference="cascade") ---
+# Level 1 점수가 이 구간 [LOW, HIGH]에 있으면 (또는 Rule이 NORMAL이 아니거나 결함 주파수가 검출되면) Level 2로 승급
+CASCADE_UNCERTAIN_LOW = float(os.getenv("CASCADE_UNCERTAIN_LOW", "0.3"))
+CASCADE_UNCERTAIN_HIGH = float(os.getenv("CASCADE_UNCERTAIN_HIGH", "0.8"))
+
+# --- 모델 캐시 (ModelLoader, LRU) ---
+# 프로세스당 메모리에 유지할 최대 모델 수 / 추정 메모리 예산 (0이면 제한 없음)
+MODEL_CACHE_MAX_MODELS = int(os.getenv("MODEL_CACHE_MAX_MODELS", "0"))
+MODEL_CACHE_MAX_MB = int(os.getenv("MODEL_CACHE_MAX_MB", "512"))
+# registry.json 변경(mtime) 확인 주기 (초) - 주기 안의 호출은 stat 없이 메모리 인덱스만 사용 (0이면 매 호출 확인)
+MODEL_REGISTRY_CHECK_INTERVAL_SEC = float(os.getenv("MODEL_REGISTRY_CHECK_INTERVAL_SEC", "2"))
+
+# --- 워커 시작 시 모델 프리로드 / 워밍업 ---
+# 프리로드할 모델: "all" (registry.json 전체), "none", 또는 쉼표로 구분한 모델 ID 목록
+WORKER_PRELOAD_MODELS = os.getenv("WORKER_PRELOAD_MODELS", "all")
+# 합성 클립으로 Level 1 / Level 2 경로를 한 번 실행 (librosa/numba 첫 호출 컴파일 비용을 시작 시점에 지불)
+WORKER_WARMUP = os.getenv("WORKER_WARMUP", "true").lower() in ("1", "true", "yes")
+# prefork 자식 프로세스당 torch intra-op 스레드 수 (자식 수 x 스레드 수가 코어 수를 넘지 않도록)
+WORKER_TORCH_THREADS = max(1, int(os.getenv("WORKER_TORCH_THREADS", "1")))
+# torch inter-op 스레드 수 (워커 시작 시 torch 연산 전에 한 번만 설정 가능)
+WORKER_TORCH_INTEROP_THREADS = max(1, int(os.getenv("WORKER_TORCH_INTEROP_THREADS", "1")))
+
 # --- API 버전 관리 ---
 API_V1_PREFIX = "/api/v1"
 
@@ -0,0 +1,80 @@
+import sys
+import time
+import logging
+import importlib
+from typing import Dict, Any, List, Iterable
+
+logger = logging.getLogger(__name__)
+
+# API 프로세스가 임포트하면 안 되는 ML 스택 (워커 전용)
+HEAVY_MODULES = ("torch", "librosa", "sklearn", "scipy", "numba", "joblib")
+
+# API 프로세스가 로드하는 모듈 (python -m app.core.import_report 기본 대상)
+API_MODULES = (
+    "app.tasks",
+    "app.features.audio_analysis.router",
+    "app.api.v1.endpoints.calibration",
+)
+
+
+def loaded_heavy_modules() -> List[str]:
+    """현재 프로세스에 이미 로드된 HEAVY_MODULES 목록"""
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+def import_report(started: float) -> Dict[str, Any]:
+    """
+    started(time.perf_counter() 값) 이후 경과 시간과 로드된 ML 모듈을 반환합니다.
+    API 진입점에서 첫 임포트 전에 started를 기록해 두고 라우터 등록 후 호출합니다.
+    """
+    return {
+        "elapsed_sec": time.perf_counter() - started,
+        "heavy_modules": loaded_heavy_modules(),
+    }
+
+
+def log_import_report(started: float, process: str = "api") -> Dict[str, Any]:
+    report = import_report(started)
+    if report["heavy_modules"]:
+        logger.warning(
+            f"⚠️ [{process}] Imports took {report['elapsed_sec']:.2f}s and loaded ML modules: "
+            f"{', '.join(report['heavy_modules'])}"
+        )
+    else:
+        logger.info(f"⏱️ [{process}] Imports took {report['elapsed_sec']:.2f}s (no ML modules loaded)")
+    return report
+
+
+def check_imports(modules: Iterable[str] = API_MODULES) -> Dict[str, Any]:
+    """
+    모듈을 순서대로 임포트하며 모듈별 소요 시간과 새로 로드된 ML 모듈을 기록합니다.
+    새 인터프리터에서 실행해야 의미가 있습니다 (python -m app.core.import_report).
+    """
+    started = time.perf_counter()
+    modules_report = []
+    for name in modules:
+        before = set(loaded_heavy_modules())
+        module_started = time.perf_counter()
+        importlib.import_module(name)
+        modules_report.append({
+            "module": name,
+            "elapsed_sec": time.perf_counter() - module_started,
+            "heavy_modules": [m for m in loaded_heavy_modules() if m not in before],
+        })
+    report = import_report(started)
+    report["modules"] = modules_report
+    return report
+
+
+if __name__ == "__main__":
+    # Usage: python -m app.core.import_report [module ...]
+    # ML 모듈이 로드되면 종료 코드 1 (CI / 배포 전 회귀 확인용)
+    report = check_imports(sys.argv[1:] or API_MODULES)
+    for entry in report["modules"]:
+        heavy = f"  ⚠️ {', '.join(entry['heavy_modules'])}" if entry["heavy_modules"] else ""
+        print(f"{entry['elapsed_sec']:8.3f}s  {entry['module']}{heavy}")
+    print(f"{report['elapsed_sec']:8.3f}s  total")
+    if report["heavy_modules"]:
+        print(f"❌ ML modules loaded: {', '.join(report['heavy_modules'])}")
+        sys.exit(1)
+    print("✅ No ML modules loaded")
@@ -1,21 +1,128 @@
 import torch
 from pathlib import Path
 import logging
+import os
+import io
+import pickle
+import threading
+import warnings
+from collections import OrderedDict
 from typing import Optional, Dict, Any, List
-import json
 import joblib # [NEW] for Isolation Forest
 
 # Import config and model definition
-from app.core.config_analysis import MODEL_DIR
-from app.features.audio_analysis.train_autoencoder import IndustrialAutoencoder
-from sklearn.ensemble import IsolationForest # [NEW]
-from sklearn.preprocessing import StandardScaler # [NEW]
+from app.core.config_analysis import (
+    MODEL_DIR, MODEL_CACHE_MAX_MODELS, MODEL_CACHE_MAX_MB, IF_FLAT_EVALUATOR, AE_COMPILED_INFERENCE
+)
+from app.core.model_registry import model_registry # [수정] registry 인덱스는 ML 의존성 없는 별도 모듈 (API도 사용)
+from app.features.audio_analysis.forest_evaluator import FlatIsolationForest # [NEW] numpy IF 평가기
+# IndustrialAutoencoder(train_autoencoder → librosa / sklearn)는 eager 체크포인트를 로드할 때만 임포트
 
 logger = logging.getLogger(__name__)
 
+def estimate_model_size(model: Any) -> int:
+    """
+    Approximate in-memory size of a loaded model in bytes.
+    Torch modules: parameter + buffer bytes (TorchScript: serialized size, since packed int8 weights
+    are not parameters). Others (IsolationForest/scaler dicts): pickled size.
+    """
+    if isinstance(model, torch.jit.ScriptModule):
+        buffer = io.BytesIO()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            torch.jit.save(model, buffer)
+        return buffer.getbuffer().nbytes
+    if isinstance(model, torch.nn.Module):
+        tensors = list(model.parameters()) + list(model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    try:
+        return len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+class ModelCache:
+    """
+    LRU cache for loaded models with a count and byte budget (0 = unlimited).
+    Least recently used models are evicted once either budget is exceeded.
+    The most recently inserted model is never evicted, even if it alone exceeds the byte budget.
+    """
+
+    def __init__(self, max_models: int = MODEL_CACHE_MAX_MODELS, max_bytes: int = MODEL_CACHE_MAX_MB * 1024 * 1024):
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, model_id: str) -> Optional[Any]:
+        with self._lock:
+            if model_id in self._entries:
+                self._entries.move_to_end(model_id)
+                self.hits += 1
+                return self._entries[model_id]
+            self.misses += 1
+            return None
+
+    def put(self, model_id: str, model: Any):
+        size = estimate_model_size(model)
+        with self._lock:
+            if model_id in self._entries:
+                self.total_bytes -= self._sizes[model_id]
+            self._entries[model_id] = model
+            self._entries.move_to_end(model_id)
+            self._sizes[model_id] = size
+            self.total_bytes += size
+
+            while len(self._entries) > 1 and self._over_budget():
+                evicted_id, _ = self._entries.popitem(last=False)
+                self.total_bytes -= self._sizes.pop(evicted_id)
+                self.evictions += 1
+                logger.info(f"Evicted model '{evicted_id}' from cache (LRU).")
+
+    def discard(self, model_id: str):
+        with self._lock:
+            if self._entries.pop(model_id, None) is not None:
+                self.total_bytes -= self._sizes.pop(model_id)
+
+    def _over_budget(self) -> bool:
+        return (
+            (self.max_models > 0 and len(self._entries) > self.max_models)
+            or (self.max_bytes > 0 and self.total_bytes > self.max_bytes)
+        )
+
+    def values(self) -> List[Any]:
+        with self._lock:
+            return list(self._entries.values())
+
+    def __contains__(self, model_id: str) -> bool:
+        return model_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "models": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_models": self.max_models,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "sizes": dict(self._sizes),
+            }
+
+
 class ModelLoader:
     _instance = None
-    _loaded_models: Dict[str, Any] = {} # [수정] 딕셔너리로 변경하여 여러 모델 캐싱
+    _cache = ModelCache() # [수정] 무제한 dict 대신 LRU + 메모리 예산 캐시
+    _registry = model_registry # [NEW] registry.json 인덱스 (mtime 변경 시에만 재로드)
+    _cache_sources: Dict[str, Dict[str, Any]] = {} # 캐시된 모델을 로드할 때 사용한 registry 항목
 
     def __new__(cls):
         if cls._instance is None:
@@ -25,52 +132,71 @@ class ModelLoader:
             # cls._instance._load_default_models_from_registry() # Optional pre-load
         return cls._instance
 
-    def _load_registry(self) -> Dict[str, Any]:
-        registry_path = MODEL_DIR / "registry.json"
-        if registry_path.exists():
-            with open(registry_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        logger.warning(f"Model registry not found at {registry_path}. Returning empty registry.")
-        return {"models": []}
-
     def get_available_models(self, device_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._registry.get_available_models(device_type)
+
+    def get_models_by_type(self, model_type: str) -> List[Dict[str, Any]]:
+        return self._registry.get_models_by_type(model_type)
+
+    def get_model_info(self, model_id: str) -> Optional[Dict[str, Any]]:
+        return self._registry.get_model_info(model_id)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Model cache counters (hits / misses / evictions) and memory accounting."""
+        return self._cache.stats()
+
+    def preload(self, model_ids: Optional[List[str]] = None) -> Dict[str, bool]:
         """
-        Loads the registry and filters models based on device_type.
-        If device_type is None, returns all models.
+        Eagerly loads models from registry.json (all models if model_ids is None).
+        Returns {model_id: loaded} so callers can report which models failed.
         """
-        registry = self._load_registry()
-        models = registry.get("models", [])
-        
-        if device_type:
-            filtered_models = []
-            for model_info in models:
-                # Filter by checking if device_type is in model 'id' or 'description'
-                if device_type.lower() in model_info.get("id", "").lower() or \
-                   device_type.lower() in model_info.get("description", "").lower():
-                    filtered_models.append(model_info)
-            return filtered_models
-        return models
+        if model_ids is None:
+            model_ids = list(self._registry.snapshot().by_id)
 
-    def get_model_info(self, model_id: str) -> Optional[Dict[str, Any]]:
-        registry = self._load_registry()
-        for model_info in registry.get("models", []):
-            if model_info.get("id") == model_id:
-                return model_info
-        return None
+        status = {}
+        for model_id in model_ids:
+            if model_id:
+                status[model_id] = self.load_model(model_id) is not None
+        return status
 
-    def load_model(self, model_id: str) -> Optional[Any]: # [수정] load_autoencoder -> load_model
-        if model_id in self._loaded_models:
-            return self._loaded_models[model_id]
+    def share_loaded_models(self) -> int:
+        """
+        Prepares loaded models to be shared by forked (Celery prefork) children.
+        Torch parameters are moved into shared memory so every child reads the same pages.
+        sklearn/joblib objects are left in place; they stay copy-on-write shared as long as
+        nobody writes to them. (joblib mmap_mode does not help here because the IsolationForest
+        trees copy their node arrays when unpickled.)
+        Returns the number of torch models moved into shared memory.
+        """
+        shared = 0
+        for model in self._cache.values():
+            if isinstance(model, torch.nn.Module):
+                model.share_memory()
+                shared += 1
+        return shared
 
+    def load_model(self, model_id: str) -> Optional[Any]: # [수정] load_autoencoder -> load_model
         model_info = self.get_model_info(model_id)
         if not model_info:
+            self._cache.discard(model_id)
             logger.warning(f"Model info for '{model_id}' not found in registry.json.")
             return None
+
+        # registry 항목이 바뀌지 않았으면 캐시 사용, 바뀌었으면 새로 로드해 put()으로 교체
+        # (교체 전까지 기존 모델로 처리 중인 요청은 그대로 기존 객체를 사용)
+        if self._cache_sources.get(model_id) == model_info:
+            cached = self._cache.get(model_id)
+            if cached is not None:
+                return cached
+        elif model_id in self._cache:
+            logger.info(f"Registry entry for '{model_id}' changed. Reloading model.")
         
         model_type = model_info.get("type")
         file_name = model_info.get("file_name") # For Autoencoder
         file_name_model = model_info.get("file_name_model") # For IF
         file_name_scaler = model_info.get("file_name_scaler") # For IF
+        file_name_flat = model_info.get("file_name_flat") # For IF (평탄화된 .npz, train.py에서 export)
+        file_name_compiled = model_info.get("file_name_compiled") # For Autoencoder (TorchScript int8, train_autoencoder.py에서 export)
 
         if not file_name and not file_name_model:
             logger.error(f"Model file name not specified for '{model_id}' in registry.")
@@ -78,17 +204,36 @@ class ModelLoader:
 
         try:
             loaded_model = None
-            if model_type == "level2_autoencoder":
+            if model_type == "level2_autoencoder" and AE_COMPILED_INFERENCE and file_name_compiled and (MODEL_DIR / file_name_compiled).exists():
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", FutureWarning) # torch.jit deprecation 경고
+                    model = torch.jit.load(str(MODEL_DIR / file_name_compiled), map_location=torch.device('cpu'))
+                model.eval()
+                # TorchScript profiling executor는 처음 몇 번의 호출에서 그래프를 최적화하므로 로드 시점에 미리 실행
+                with torch.no_grad():
+                    for _ in range(2):
+                        model(torch.zeros(1, 64))
+                loaded_model = model
+                logger.info(f"Autoencoder model '{model_id}' loaded successfully (TorchScript int8).")
+
+            elif model_type == "level2_autoencoder":
                 model_path = MODEL_DIR / file_name
                 if not model_path.exists():
                     logger.warning(f"Autoencoder model file not found at {model_path}")
                     return None
+                from app.features.audio_analysis.train_autoencoder import IndustrialAutoencoder
                 model = IndustrialAutoencoder(input_dim=64, latent_dim=16)
                 model.load_state_dict(torch.load(model_path, map_location=torch.device('cpu')))
                 model.eval()
                 loaded_model = model
                 logger.info(f"Autoencoder model '{model_id}' loaded successfully.")
             
+            elif model_type == "level1_isolation_forest" and IF_FLAT_EVALUATOR and file_name_flat and (MODEL_DIR / file_name_flat).exists():
+                # 평탄화된 배열만 로드 (joblib 언피클 없음)
+                flat_forest = FlatIsolationForest.load(MODEL_DIR / file_name_flat)
+                loaded_model = {"model": flat_forest, "scaler": flat_forest.scaler}
+                logger.info(f"Isolation Forest model '{model_id}' loaded successfully (flat arrays).")
+
             elif model_type == "level1_isolation_forest":
                 model_path = MODEL_DIR / file_name_model
                 scaler_path = MODEL_DIR / file_name_scaler
@@ -98,13 +243,21 @@ class ModelLoader:
                 if_model = joblib.load(model_path)
                 scaler = joblib.load(scaler_path)
                 loaded_model = {"model": if_model, "scaler": scaler}
+                if IF_FLAT_EVALUATOR:
+                    # .npz가 없는 기존 모델도 로드 시점에 평탄화해 numpy 평가기로 추론
+                    try:
+                        flat_forest = FlatIsolationForest.from_sklearn(if_model, scaler)
+                        loaded_model = {"model": flat_forest, "scaler": flat_forest.scaler}
+                    except Exception as e:
+                        logger.warning(f"Could not flatten Isolation Forest '{model_id}' ({e}). Using sklearn model.")
                 logger.info(f"Isolation Forest model '{model_id}' loaded successfully.")
 
             else:
                 logger.warning(f"Unsupported model type '{model_type}' for model_id '{model_id}'.")
                 return None
 
-            self._loaded_models[model_id] = loaded_model
+            self._cache.put(model_id, loaded_model)
+            self._cache_sources[model_id] = model_info
             return loaded_model
 
         except Exception as e:
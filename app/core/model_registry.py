@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+from app.core.config_analysis import MODEL_DIR, MODEL_REGISTRY_CHECK_INTERVAL_SEC
+
+logger = logging.getLogger(__name__)
+
+# registry.json 인덱스 (torch / sklearn 등 ML 의존성 없음 → API 프로세스에서도 임포트 가능)
+# 모델 객체 로드는 app.core.model_loader가 담당합니다.
+
+def _model_device_type(model_info: Dict[str, Any]) -> str:
+    """Device type of a registry entry: explicit 'device_type', else the model id prefix (e.g. 'pump_autoencoder_default' -> 'pump')."""
+    device_type = model_info.get("device_type") or model_info.get("id", "").split("_", 1)[0]
+    return device_type.lower()
+
+class RegistrySnapshot:
+    """
+    Immutable, indexed view of one registry.json version.
+    Readers grab the current snapshot once and never see a half-applied reload.
+    """
+
+    def __init__(self, models: List[Dict[str, Any]], mtime_ns: Optional[int] = None):
+        self.models = models
+        self.mtime_ns = mtime_ns
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.by_type: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_device_type: Dict[str, List[Dict[str, Any]]] = {}
+        for model_info in models:
+            model_id = model_info.get("id")
+            if not model_id:
+                continue
+            self.by_id[model_id] = model_info
+            self.by_type.setdefault(model_info.get("type", ""), []).append(model_info)
+            self.by_device_type.setdefault(_model_device_type(model_info), []).append(model_info)
+
+class ModelRegistry:
+    """
+    In-memory registry.json index.
+    The file is re-parsed only when its mtime changes, and at most once per
+    MODEL_REGISTRY_CHECK_INTERVAL_SEC (calls in between do not touch the filesystem).
+    A reload builds a new RegistrySnapshot and swaps it in with a single assignment.
+    """
+
+    def __init__(self, registry_path: Path = MODEL_DIR / "registry.json",
+                 check_interval: float = MODEL_REGISTRY_CHECK_INTERVAL_SEC):
+        self.registry_path = registry_path
+        self.check_interval = check_interval
+        self._snapshot = RegistrySnapshot([])
+        self._loaded = False
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> RegistrySnapshot:
+        if time.monotonic() >= self._next_check:
+            self.refresh()
+        return self._snapshot
+
+    def refresh(self, force: bool = False) -> bool:
+        """Re-reads registry.json if its mtime changed. Returns True if a new snapshot was installed."""
+        with self._lock:
+            self._next_check = time.monotonic() + self.check_interval
+            try:
+                mtime_ns = os.stat(self.registry_path).st_mtime_ns
+            except FileNotFoundError:
+                if self._loaded and self._snapshot.mtime_ns is None and not force:
+                    return False
+                logger.warning(f"Model registry not found at {self.registry_path}. Using empty registry.")
+                self._install(RegistrySnapshot([]))
+                return True
+
+            if self._loaded and mtime_ns == self._snapshot.mtime_ns and not force:
+                return False
+
+            try:
+                with open(self.registry_path, 'r', encoding='utf-8') as f:
+                    models = json.load(f).get("models", [])
+            except (OSError, ValueError) as e:
+                # 학습 스크립트가 쓰는 도중일 수 있음 → 이전 스냅샷 유지, 다음 확인 때 재시도
+                logger.warning(f"Model registry reload failed ({e}). Keeping previous registry.")
+                return False
+
+            self._install(RegistrySnapshot(models, mtime_ns))
+            return True
+
+    def _install(self, new: RegistrySnapshot):
+        if self._loaded:
+            logger.info(f"🔄 Model registry reloaded ({len(new.by_id)} models).")
+        self._snapshot, self._loaded = new, True
+
+    def get_available_models(self, device_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Returns registry models, filtered by device_type (e.g. 'pump', 'valve') if given.
+        device_type is matched against the indexed device type (registry 'device_type' or model id prefix);
+        unknown values fall back to the old substring match on id/description.
+        """
+        snapshot = self.snapshot()
+        if not device_type:
+            return list(snapshot.models)
+
+        key = device_type.lower()
+        if key in snapshot.by_device_type:
+            return list(snapshot.by_device_type[key])
+        return [
+            model_info for model_info in snapshot.models
+            if key in model_info.get("id", "").lower() or key in model_info.get("description", "").lower()
+        ]
+
+    def get_models_by_type(self, model_type: str) -> List[Dict[str, Any]]:
+        """Registry models of one type (e.g. 'level1_isolation_forest')."""
+        return list(self.snapshot().by_type.get(model_type, []))
+
+    def get_model_info(self, model_id: str) -> Optional[Dict[str, Any]]:
+        return self.snapshot().by_id.get(model_id)
+
+# 프로세스당 하나 (ModelLoader와 API 엔드포인트가 공유)
+model_registry = ModelRegistry()
@@ -0,0 +1,87 @@
+import os
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Optional
+
+logger = logging.getLogger(__name__)
+
+class WorkerEventLoop:
+    """
+    Celery 워커 프로세스 수명 동안 유지되는 asyncio 이벤트 루프.
+    태스크마다 asyncio.run()으로 루프를 생성/종료하는 대신, 백그라운드 스레드의 루프 하나에 코루틴을 제출합니다.
+    → 루프에 묶인 비동기 클라이언트(스토리지/DB 등)를 태스크 간에 재사용할 수 있고,
+      여러 태스크의 비동기 I/O가 같은 루프 위에서 겹쳐 실행될 수 있습니다.
+
+    prefork 풀에서는 worker_init(부모 프로세스) 이후 fork된 자식에 루프 스레드가 복제되지 않으므로,
+    프로세스 ID가 바뀌면 자식 프로세스에서 루프를 새로 시작합니다.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self._loop is not None and self._pid == os.getpid() and self._loop.is_running()
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        """루프가 없으면 (또는 fork 이후라면) 백그라운드 스레드에서 시작하고 루프를 반환합니다."""
+        with self._lock:
+            if self._loop is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return self._loop
+
+            # fork 이전(부모 프로세스)의 루프는 이 프로세스에서 실행 중이 아니므로 참조만 버림
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            thread = threading.Thread(target=run, name="worker-event-loop", daemon=True)
+            thread.start()
+            ready.wait()
+
+            self._loop, self._thread, self._pid = loop, thread, os.getpid()
+            logger.info(f"🔁 Worker event loop started (pid={self._pid})")
+            return loop
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """
+        코루틴을 워커 루프에 제출하고 결과를 기다립니다 (asyncio.run 대체, 동기 태스크 본문에서 호출).
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.start())
+        return future.result(timeout)
+
+    def stop(self, timeout: float = 5.0):
+        """남은 태스크를 정리하고 루프 스레드를 종료합니다 (워커 종료 시)."""
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                self._loop = self._thread = self._pid = None
+                return
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = self._pid = None
+
+        async def shutdown():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await loop.shutdown_asyncgens()
+
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), loop).result(timeout)
+        except Exception as e:
+            logger.warning(f"⚠️ Worker event loop shutdown incomplete: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        if not thread.is_alive():
+            loop.close()
+        logger.info("🛑 Worker event loop stopped")
+
+# 워커 프로세스당 하나
+worker_loop = WorkerEventLoop()
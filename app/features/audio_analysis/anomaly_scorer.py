@@ -1,8 +1,10 @@
 import logging
+import asyncio
 import numpy as np
 import os
 import random
-from typing import Dict, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Tuple, Optional, List, Union
 import torch # [New]
 
 # ML Model Imports and Loading
@@ -25,9 +27,12 @@ except ImportError:
 # Import constants from config_analysis
 from app.core.config_analysis import (
     MODEL_DIR, N_ML_FEATURES, IF_CONTAMINATION,
-    RMS_WARN, RMS_CRIT, BP_LOW, BP_HIGH # BP_LOW/HIGH used for rule-based analysis
+    RMS_WARN, RMS_CRIT, BP_LOW, BP_HIGH, # BP_LOW/HIGH used for rule-based analysis
+    ENSEMBLE_MAX_WORKERS, ENSEMBLE_WEIGHTS, CASCADE_UNCERTAIN_LOW, CASCADE_UNCERTAIN_HIGH,
+    ANALYSIS_WINDOW_SEC, ANALYSIS_WINDOW_HOP_SEC
 )
 from app.core.model_loader import model_loader # [New]
+from app.features.audio_analysis.spectral_frontend import SpectralFrontend
 
 logger = logging.getLogger(__name__)
 
@@ -41,53 +46,148 @@ class AnomalyScorer:
     def __init__(self, dsp_filter_instance=None):
         self.dsp_filter = dsp_filter_instance # Will receive DSPFilter instance
         # Remove self._load_ml_model() as models are now loaded dynamically per request
+        self._ensemble_pool: Optional[ThreadPoolExecutor] = None # [NEW] 앙상블 분기 실행용 (프로세스별로 생성)
+        self._ensemble_pool_pid: Optional[int] = None
 
-    def extract_ml_features(self, y: np.ndarray, sr: int) -> np.ndarray:
+    def extract_ml_features(self, y: np.ndarray, sr: int, spectral: Optional[SpectralFrontend] = None) -> np.ndarray:
         """
         ML 모델을 위한 고차원 특징을 추출합니다.
         MFCC, Spectral Centroid, Spectral Bandwidth, Zero Crossing Rate, Rolloff 포함.
+        spectral이 주어지면 공유 STFT를 재사용합니다 (클립당 FFT 1회).
         1D numpy 배열을 반환합니다.
         """
         if librosa is None:
             logger.error("Librosa not available. Cannot extract ML features.")
             return np.zeros(N_ML_FEATURES) # Return dummy features
 
+        if spectral is None:
+            spectral = SpectralFrontend(y, sr)
+
         features = []
 
         # MFCC (Mean and Std)
-        mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
+        mfccs = spectral.mfcc(n_mfcc=13)
         features.extend(np.mean(mfccs, axis=1))
         features.extend(np.std(mfccs, axis=1))
 
         # Spectral Centroid (Mean and Std)
-        spectral_centroids = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
+        spectral_centroids = spectral.spectral_centroid()[0]
         features.append(np.mean(spectral_centroids))
         features.append(np.std(spectral_centroids))
 
         # Spectral Bandwidth (Mean and Std)
-        spectral_bandwidths = librosa.feature.spectral_bandwidth(y=y, sr=sr)[0]
+        spectral_bandwidths = spectral.spectral_bandwidth()[0]
         features.append(np.mean(spectral_bandwidths))
         features.append(np.std(spectral_bandwidths))
 
         # Zero Crossing Rate (Mean and Std)
-        zero_crossing_rates = librosa.feature.zero_crossing_rate(y)[0]
+        zero_crossing_rates = spectral.zero_crossing_rate()[0]
         features.append(np.mean(zero_crossing_rates))
         features.append(np.std(zero_crossing_rates))
 
         # Spectral Rolloff (Mean and Std)
-        spectral_rolloff = librosa.feature.spectral_rolloff(y=y, sr=sr)[0]
+        spectral_rolloff = spectral.spectral_rolloff()[0]
         features.append(np.mean(spectral_rolloff))
-        features.extend(np.std(spectral_rolloff)) # Use extend for consistency
+        features.append(np.std(spectral_rolloff))
 
         return np.array(features).flatten()
 
-    async def score_level1(self, y: np.ndarray, sr: int, calibration_data: Dict[str, Any] = None, target_model_id: str = None) -> Dict[str, Any]:
+    async def score_level1(self, y: np.ndarray, sr: int, calibration_data: Dict[str, Any] = None, target_model_id: str = None, spectral: Optional[SpectralFrontend] = None) -> Dict[str, Any]:
         """
         Level 1 (Isolation Forest + Rule-based) 이상 점수를 계산합니다.
         calibration_data가 제공되면 동적 임계값을 사용합니다.
         target_model_id가 제공되면 해당 ID의 모델을 로드하여 사용합니다.
+        spectral이 제공되면 공유 STFT를 재사용합니다.
         """
+        if spectral is None:
+            spectral = SpectralFrontend(y, sr)
+
+        # 1. Rule-based Analysis
+        result, peak_frequencies = self._score_rule_based(y, sr, calibration_data, spectral)
+
+        # 2. Isolation Forest Analysis (Dynamic Loading)
+        model_to_use, scaler_to_use = self._load_isolation_forest(target_model_id)
+
+        if model_to_use is not None and scaler_to_use is not None:
+            try:
+                ml_features = self.extract_ml_features(y, sr, spectral=spectral)
+                scaled_features = scaler_to_use.transform(ml_features.reshape(1, -1))
+                anomaly_score_if = model_to_use.decision_function(scaled_features)[0]
+                self._apply_isolation_forest_score(result, anomaly_score_if, peak_frequencies, target_model_id)
+            except Exception as e:
+                logger.error(f"Isolation Forest analysis failed: {e}. Using rule-based result only.")
+        else:
+            logger.warning("No Isolation Forest model available for inference.")
+        
+        return result
+
+    async def score_level1_batch(self, clips: List[Dict[str, Any]], target_model_id: str = None) -> List[Dict[str, Any]]:
+        """
+        여러 클립의 Level 1 점수를 한 번에 계산합니다 (마이크로 배치).
+        Rule-based 분석과 특징 추출은 클립별로(featurize_level1에서 이미 했다면 재사용),
+        scaler.transform / decision_function은 배치 전체에 1회 수행합니다.
+        clips: [{y, sr, spectral, calibration_data}, ...] → 입력 순서대로 결과 반환
+        """
+        for clip in clips:
+            if "rule_result" not in clip:
+                self.featurize_level1(clip)
+        results = [clip["rule_result"][0] for clip in clips]
+
+        # IF 점수를 계산하지 못한 클립(None)은 Rule-based 결과만 사용
+        for index, anomaly_score_if in enumerate(self._isolation_forest_scores(clips, target_model_id)):
+            if anomaly_score_if is not None:
+                self._apply_isolation_forest_score(results[index], anomaly_score_if, clips[index]["rule_result"][1], target_model_id)
+        return results
+
+    def _isolation_forest_scores(self, clips: List[Dict[str, Any]], target_model_id: str = None) -> List[Optional[float]]:
+        """
+        featurize된 클립들의 IF decision_function 값을 scaler/IF 호출 1회로 계산합니다.
+        모델이 없거나 특징 추출/추론에 실패한 클립은 None입니다.
+        """
+        scores: List[Optional[float]] = [None] * len(clips)
+        model_to_use, scaler_to_use = self._load_isolation_forest(target_model_id)
+        if model_to_use is None or scaler_to_use is None:
+            logger.warning("No Isolation Forest model available for inference.")
+            return scores
+
+        rows = [index for index, clip in enumerate(clips) if clip["ml_features"] is not None]
+        if not rows:
+            return scores
+
+        try:
+            scaled_features = scaler_to_use.transform(np.vstack([clips[index]["ml_features"] for index in rows]))
+            anomaly_scores_if = model_to_use.decision_function(scaled_features)
+        except Exception as e:
+            logger.error(f"Isolation Forest batch analysis failed: {e}. Using rule-based results only.")
+            return scores
+
+        for index, anomaly_score_if in zip(rows, anomaly_scores_if):
+            scores[index] = float(anomaly_score_if)
+        return scores
+
+    def featurize_level1(self, clip: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Level 1 배치 추론 전의 클립별 CPU 작업 (Rule-based 분석 + ML 특징 추출).
+        결과를 clip["rule_result"] / clip["ml_features"]에 저장합니다 (특징 추출 실패 시 None).
+        """
+        self._featurize_rules(clip)
+        self._featurize_ml(clip)
+        return clip
+
+    def _featurize_rules(self, clip: Dict[str, Any]):
+        clip["rule_result"] = self._score_rule_based(clip["y"], clip["sr"], clip.get("calibration_data"), clip["spectral"])
+
+    def _featurize_ml(self, clip: Dict[str, Any]):
+        try:
+            clip["ml_features"] = self.extract_ml_features(clip["y"], clip["sr"], spectral=clip["spectral"])
+        except Exception as e:
+            logger.error(f"ML feature extraction failed: {e}. Using rule-based result only.")
+            clip["ml_features"] = None
+
+    def _score_rule_based(self, y: np.ndarray, sr: int, calibration_data: Optional[Dict[str, Any]], spectral: SpectralFrontend) -> Tuple[Dict[str, Any], list]:
+        """Level 1 Rule-based 분석. (result, peak_frequencies)를 반환하며 실패 시 fallback 결과를 반환합니다."""
         result = self._get_fallback_result("INITIAL_FALLBACK") # Initialize with fallback
+        peak_frequencies = []
 
         # Determine Thresholds
         rms_crit = RMS_CRIT
@@ -107,18 +207,18 @@ class AnomalyScorer:
 
                 logger.info(f"Using dynamic thresholds: Warn={rms_warn:.4f}, Crit={rms_crit:.4f}")
 
-        # 1. Rule-based Analysis
         try:
             # RMS 에너지 계산 (소음 레벨)
-            rms = librosa.feature.rms(y=y)
+            rms = spectral.rms()
             avg_rms = float(np.mean(rms))
             
-            # 주파수 대역별 에너지 비율 계산 (from DSPFilter)
-            resonance_energy_ratio = self.dsp_filter.calculate_band_energy(y, sr, BP_LOW, BP_HIGH)
-            high_freq_energy_ratio = self.dsp_filter.calculate_band_energy(y, sr, 10000, sr/2) # Assuming max freq is sr/2
+            # 주파수 대역별 에너지 비율 계산 (from DSPFilter, 공유 STFT 사용)
+            resonance_energy_ratio = self.dsp_filter.calculate_band_energy(y, sr, BP_LOW, BP_HIGH, spectral=spectral)
+            high_freq_energy_ratio = self.dsp_filter.calculate_band_energy(y, sr, 10000, sr/2, spectral=spectral) # Assuming max freq is sr/2
 
-            # Envelope Analysis (from DSPFilter)
-            peak_frequencies = self.dsp_filter.envelope_analysis(y, sr)
+            # Envelope Analysis (from DSPFilter) - 피크 주파수 / 진폭 / prominence
+            envelope_peaks = self.dsp_filter.envelope_peaks(y, sr)
+            peak_frequencies = envelope_peaks["frequencies"].tolist()
 
             label = "NORMAL"
             score = 0.1
@@ -155,13 +255,18 @@ class AnomalyScorer:
                     "noise_level": float(avg_rms),
                     "resonance_energy_ratio": float(resonance_energy_ratio),
                     "high_freq_energy_ratio": float(high_freq_energy_ratio),
-                    "peak_frequencies": [float(f) for f in peak_frequencies]
+                    "peak_frequencies": [float(f) for f in peak_frequencies],
+                    "peak_amplitudes": envelope_peaks["amplitudes"].tolist(),
+                    "peak_prominences": envelope_peaks["prominences"].tolist()
                 }
             }
         except Exception as e:
             logger.warning(f"Rule-based analysis failed: {e}. Falling back to ML if available.")
-            
-        # 2. Isolation Forest Analysis (Dynamic Loading)
+
+        return result, peak_frequencies
+
+    def _load_isolation_forest(self, target_model_id: str = None) -> Tuple[Any, Any]:
+        """target_model_id (없거나 로드 실패 시 기본 모델)의 (IsolationForest, StandardScaler)를 반환합니다."""
         model_to_use = None
         scaler_to_use = None
         
@@ -186,49 +291,113 @@ class AnomalyScorer:
             else:
                 logger.warning("No Isolation Forest model could be loaded, neither target nor default. Skipping ML analysis.")
 
-        if model_to_use is not None and scaler_to_use is not None:
-            try:
-                ml_features = self.extract_ml_features(y, sr)
-                scaled_features = scaler_to_use.transform(ml_features.reshape(1, -1))
-                anomaly_score_if = model_to_use.decision_function(scaled_features)[0]
-                
-                # Normalize IF score to 0-1
-                if_score = 0.5 - anomaly_score_if # Heuristic
-                if_score = max(0.0, min(1.0, if_score))
-                
-                # Combine with rule-based or override if ML is more severe
-                if if_score > result["score"]: # If IF score is higher than current result score
-                    result["score"] = float(if_score)
-                    if if_score > 0.7:
-                        result["label"] = "CRITICAL"
-                        result["summary"] = f"Anomaly detected by ML model ({target_model_id or 'Default'})."
-                    elif if_score > 0.4:
-                        result["label"] = "WARNING"
-                        result["summary"] = f"Potential anomaly detected by ML model ({target_model_id or 'Default'})."
-                    else:
-                        result["label"] = "NORMAL"
-                        result["summary"] = f"Audio levels are within normal operating range ({target_model_id or 'Default'})."
-                    result["details"]["method"] = f"Hybrid ML ({target_model_id or 'IF'})"
-                    result["details"]["ml_anomaly_score_if"] = float(anomaly_score_if)
-                
-                if len(peak_frequencies) > 0 and result["label"] != "CRITICAL": # If peaks are found, elevate to CRITICAL
-                    result["label"] = "CRITICAL"
-                    result["score"] = max(result["score"], 0.8) # Ensure score is high
-                    result["summary"] += " Bearing fault frequencies detected."
-                    result["details"]["method"] = f"Hybrid ML ({target_model_id or 'IF'} + Peaks)"
+        return model_to_use, scaler_to_use
 
-            except Exception as e:
-                logger.error(f"Isolation Forest analysis failed: {e}. Using rule-based result only.")
-        else:
-            logger.warning("No Isolation Forest model available for inference.")
+    def _apply_isolation_forest_score(self, result: Dict[str, Any], anomaly_score_if: float, peak_frequencies: list, target_model_id: str = None):
+        """IF decision_function 값을 Rule-based 결과에 결합합니다 (result를 직접 수정)."""
+        if_score = self._normalize_if_score(anomaly_score_if)
         
-        return result
+        # Combine with rule-based or override if ML is more severe
+        if if_score > result["score"]: # If IF score is higher than current result score
+            result["score"] = float(if_score)
+            if if_score > 0.7:
+                result["label"] = "CRITICAL"
+                result["summary"] = f"Anomaly detected by ML model ({target_model_id or 'Default'})."
+            elif if_score > 0.4:
+                result["label"] = "WARNING"
+                result["summary"] = f"Potential anomaly detected by ML model ({target_model_id or 'Default'})."
+            else:
+                result["label"] = "NORMAL"
+                result["summary"] = f"Audio levels are within normal operating range ({target_model_id or 'Default'})."
+            result["details"]["method"] = f"Hybrid ML ({target_model_id or 'IF'})"
+            result["details"]["ml_anomaly_score_if"] = float(anomaly_score_if)
+        
+        if len(peak_frequencies) > 0 and result["label"] != "CRITICAL": # If peaks are found, elevate to CRITICAL
+            result["label"] = "CRITICAL"
+            result["score"] = max(result["score"], 0.8) # Ensure score is high
+            result["summary"] += " Bearing fault frequencies detected."
+            result["details"]["method"] = f"Hybrid ML ({target_model_id or 'IF'} + Peaks)"
+
+    @staticmethod
+    def _normalize_if_score(anomaly_score_if: float) -> float:
+        """IF decision_function 값을 0-1 이상 점수로 변환 (Heuristic, 낮을수록 이상)"""
+        return max(0.0, min(1.0, 0.5 - anomaly_score_if))
 
-    async def score_level2(self, y: np.ndarray, sr: int, target_model_id: str = None) -> Dict[str, Any]:
+    async def score_level2(self, y: np.ndarray, sr: int, target_model_id: str = None, spectral: Optional[SpectralFrontend] = None) -> Dict[str, Any]:
         """
         Level 2 (Autoencoder) 이상 점수를 계산합니다.
         target_model_id가 제공되면 해당 ID의 모델을 로드하여 사용합니다.
+        spectral이 제공되면 공유 STFT에서 Mel 스펙트로그램을 계산합니다.
         """
+        autoencoder = self._load_autoencoder(target_model_id)
+        if not autoencoder:
+            logger.warning("Autoencoder model not loaded. Returning fallback.")
+            return self._get_fallback_result("AUTOENCODER_NOT_LOADED")
+
+        try:
+            feature_vector = self._autoencoder_features(y, sr, spectral)
+            
+            # Convert to Tensor
+            input_tensor = torch.FloatTensor(feature_vector).unsqueeze(0) # Batch size 1
+            
+            # Inference + Reconstruction Error (MSE)
+            anomaly_score = self._reconstruction_errors(autoencoder, input_tensor)[0]
+            return self._level2_result(anomaly_score, target_model_id)
+
+        except Exception as e:
+            logger.error(f"Autoencoder inference failed: {e}")
+            return self._get_fallback_result(f"AE_INFERENCE_ERROR: {str(e)}")
+
+    async def score_level2_batch(self, clips: List[Dict[str, Any]], target_model_id: str = None) -> List[Dict[str, Any]]:
+        """
+        여러 클립의 Level 2 점수를 한 번의 배치 forward로 계산합니다 (마이크로 배치).
+        clips: [{y, sr, spectral}, ...] → 입력 순서대로 결과 반환 (featurize_level2 결과가 있으면 재사용)
+        """
+        for clip in clips:
+            if "ae_features" not in clip:
+                self.featurize_level2(clip)
+        return [
+            self._level2_result(error, target_model_id) if isinstance(error, float) else self._get_fallback_result(error)
+            for error in self._autoencoder_errors(clips, target_model_id)
+        ]
+
+    def _autoencoder_errors(self, clips: List[Dict[str, Any]], target_model_id: str = None) -> List[Union[float, str]]:
+        """
+        featurize된 클립들의 재구성 오차(MSE)를 배치 forward 1회로 계산합니다.
+        실패한 클립은 float 대신 실패 사유 문자열입니다.
+        """
+        autoencoder = self._load_autoencoder(target_model_id)
+        if not autoencoder:
+            logger.warning("Autoencoder model not loaded. Returning fallback.")
+            return ["AUTOENCODER_NOT_LOADED"] * len(clips)
+
+        errors: List[Union[float, str]] = [
+            f"AE_INFERENCE_ERROR: {clip['ae_error']}" if clip["ae_features"] is None else ""
+            for clip in clips
+        ]
+        rows = [index for index, clip in enumerate(clips) if clip["ae_features"] is not None]
+        if rows:
+            try:
+                input_tensor = torch.FloatTensor(np.vstack([clips[index]["ae_features"] for index in rows])) # (batch, n_mels)
+                for index, anomaly_score in zip(rows, self._reconstruction_errors(autoencoder, input_tensor)):
+                    errors[index] = float(anomaly_score)
+            except Exception as e:
+                logger.error(f"Autoencoder batch inference failed: {e}")
+                for index in rows:
+                    errors[index] = f"AE_INFERENCE_ERROR: {str(e)}"
+        return errors
+
+    def featurize_level2(self, clip: Dict[str, Any]) -> Dict[str, Any]:
+        """Level 2 배치 추론 전의 클립별 CPU 작업 (Mel 특징). clip["ae_features"]에 저장합니다 (실패 시 None)."""
+        try:
+            clip["ae_features"] = self._autoencoder_features(clip["y"], clip["sr"], clip.get("spectral"))
+        except Exception as e:
+            logger.error(f"Autoencoder preprocessing failed: {e}")
+            clip["ae_features"] = None
+            clip["ae_error"] = str(e)
+        return clip
+
+    def _load_autoencoder(self, target_model_id: str = None) -> Optional[Any]:
         autoencoder = None
         if target_model_id:
             autoencoder = model_loader.load_model(target_model_id)
@@ -238,63 +407,315 @@ class AnomalyScorer:
             autoencoder = model_loader.load_model("pump_autoencoder_default")
             if autoencoder:
                 logger.info("Using default 'pump_autoencoder_default' for Level 2 analysis.")
+        return autoencoder
 
-        if not autoencoder:
-            logger.warning("Autoencoder model not loaded. Returning fallback.")
-            return self._get_fallback_result("AUTOENCODER_NOT_LOADED")
+    def _autoencoder_features(self, y: np.ndarray, sr: int, spectral: Optional[SpectralFrontend] = None) -> np.ndarray:
+        """Preprocess using same logic as training (Mel Spectrogram -> Norm -> Mean)"""
+        n_mels = 64
+        if spectral is None:
+            spectral = SpectralFrontend(y, sr)
+        mel_spec = spectral.melspectrogram(n_mels=n_mels)
+        mel_spec_db = librosa.power_to_db(mel_spec, ref=np.max)
+        
+        # Normalize
+        mel_spec_norm = (mel_spec_db - mel_spec_db.min()) / (mel_spec_db.max() - mel_spec_db.min() + 1e-6)
+        
+        # Feature Vector
+        return np.mean(mel_spec_norm, axis=1)
 
-        try:
-            # Preprocess using same logic as training (Mel Spectrogram -> Norm -> Mean)
-            n_mels = 64
-            mel_spec = librosa.feature.melspectrogram(y=y, sr=sr, n_mels=n_mels)
-            mel_spec_db = librosa.power_to_db(mel_spec, ref=np.max)
-            
-            # Normalize
-            mel_spec_norm = (mel_spec_db - mel_spec_db.min()) / (mel_spec_db.max() - mel_spec_db.min() + 1e-6)
-            
-            # Feature Vector
-            feature_vector = np.mean(mel_spec_norm, axis=1)
-            
-            # Convert to Tensor
-            input_tensor = torch.FloatTensor(feature_vector).unsqueeze(0) # Batch size 1
-            
-            # Inference
-            with torch.no_grad():
-                reconstructed = autoencoder(input_tensor)
-                
-            # Calculate Reconstruction Error (MSE)
-            mse_loss = torch.nn.functional.mse_loss(reconstructed, input_tensor)
-            anomaly_score = mse_loss.item()
-            
-            # Normalize Score (Heuristic based on expected MSE range)
-            # Assume normal MSE is low (e.g., < 0.01), abnormal is high (> 0.05)
-            # Map 0.05 to 1.0 score
-            normalized_score = min(1.0, anomaly_score * 20) 
-            
-            label = "NORMAL"
-            summary = f"Level 2 Diagnosis ({target_model_id or 'Default'}): Normal operation pattern."
+    def _reconstruction_errors(self, autoencoder: Any, input_tensor: torch.Tensor) -> List[float]:
+        """배치 forward 1회 후 샘플별 재구성 오차(MSE)를 반환합니다 (배치 크기 1이면 mse_loss와 동일)."""
+        with torch.no_grad():
+            reconstructed = autoencoder(input_tensor)
+        return torch.mean((reconstructed - input_tensor) ** 2, dim=1).tolist()
+
+    def _level2_result(self, anomaly_score: float, target_model_id: str = None) -> Dict[str, Any]:
+        # Normalize Score (Heuristic based on expected MSE range)
+        # Assume normal MSE is low (e.g., < 0.01), abnormal is high (> 0.05)
+        # Map 0.05 to 1.0 score
+        normalized_score = min(1.0, anomaly_score * 20) 
+        
+        label = "NORMAL"
+        summary = f"Level 2 Diagnosis ({target_model_id or 'Default'}): Normal operation pattern."
+        
+        if normalized_score > 0.8:
+            label = "CRITICAL"
+            summary = f"Level 2 Diagnosis ({target_model_id or 'Default'}): Significant anomaly pattern detected."
+        elif normalized_score > 0.5:
+            label = "WARNING"
+            summary = f"Level 2 Diagnosis ({target_model_id or 'Default'}): Deviation from normal pattern detected."
             
-            if normalized_score > 0.8:
-                label = "CRITICAL"
-                summary = f"Level 2 Diagnosis ({target_model_id or 'Default'}): Significant anomaly pattern detected."
-            elif normalized_score > 0.5:
-                label = "WARNING"
-                summary = f"Level 2 Diagnosis ({target_model_id or 'Default'}): Deviation from normal pattern detected."
-                
-            return {
-                "label": label,
-                "score": float(normalized_score),
-                "summary": summary,
-                "details": {
-                    "method": f"Deep Autoencoder ({target_model_id or 'Default'})",
-                    "reconstruction_error": float(anomaly_score),
-                    "normalized_score": float(normalized_score)
-                }
+        return {
+            "label": label,
+            "score": float(normalized_score),
+            "summary": summary,
+            "details": {
+                "method": f"Deep Autoencoder ({target_model_id or 'Default'})",
+                "reconstruction_error": float(anomaly_score),
+                "normalized_score": float(normalized_score)
             }
+        }
 
-        except Exception as e:
-            logger.error(f"Autoencoder inference failed: {e}")
-            return self._get_fallback_result(f"AE_INFERENCE_ERROR: {str(e)}")
+    async def score_ensemble(self, y: np.ndarray, sr: int, calibration_data: Dict[str, Any] = None, target_model_id: str = None, spectral: Optional[SpectralFrontend] = None) -> Dict[str, Any]:
+        """
+        Ensemble (Rule-based + Isolation Forest + Autoencoder) 이상 점수를 계산합니다.
+        공유 STFT 위에서 세 모델을 스레드 풀로 동시에 실행하고, 모델별 투표와 가중 평균 융합 점수를 반환합니다.
+        target_model_id는 해당 모델 타입(IF 또는 AE)의 분기에만 적용되고, 나머지 분기는 기본 모델을 사용합니다.
+        """
+        clip = {
+            "y": y,
+            "sr": sr,
+            "spectral": spectral if spectral is not None else SpectralFrontend(y, sr),
+            "calibration_data": calibration_data
+        }
+        await self.featurize_ensemble(clip)
+        return (await self.score_ensemble_batch([clip], target_model_id=target_model_id))[0]
+
+    async def score_ensemble_batch(self, clips: List[Dict[str, Any]], target_model_id: str = None) -> List[Dict[str, Any]]:
+        """
+        여러 클립의 Ensemble 점수를 계산합니다 (마이크로 배치).
+        IF 배치 추론과 AE 배치 forward를 동시에 실행한 뒤 클립별로 투표를 융합합니다.
+        """
+        for clip in clips:
+            if not all(key in clip for key in ("rule_result", "ml_features", "ae_features")):
+                await self.featurize_ensemble(clip)
+
+        if_model_id, ae_model_id = self._split_target_model_id(target_model_id)
+        if_scores, ae_errors = await self._run_parallel(
+            lambda: self._isolation_forest_scores(clips, if_model_id),
+            lambda: self._autoencoder_errors(clips, ae_model_id)
+        )
+        return [
+            self._fuse_votes(clip, if_score, ae_error, if_model_id, ae_model_id)
+            for clip, if_score, ae_error in zip(clips, if_scores, ae_errors)
+        ]
+
+    async def featurize_ensemble(self, clip: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Ensemble 추론 전의 클립별 CPU 작업.
+        STFT(magnitude/power)를 먼저 1회 계산해 두고, Rule-based 분석 / IF 특징 / AE 특징을 동시에 추출합니다.
+        """
+        clip["spectral"].power # 분기들이 같은 STFT를 중복 계산하지 않도록 미리 계산
+        await self._run_parallel(
+            lambda: self._featurize_rules(clip),
+            lambda: self._featurize_ml(clip),
+            lambda: self.featurize_level2(clip)
+        )
+        return clip
+
+    def _get_ensemble_pool(self) -> ThreadPoolExecutor:
+        """앙상블 분기용 스레드 풀 (prefork 자식 프로세스에서는 새로 생성)"""
+        if self._ensemble_pool is None or self._ensemble_pool_pid != os.getpid():
+            self._ensemble_pool = ThreadPoolExecutor(max_workers=ENSEMBLE_MAX_WORKERS, thread_name_prefix="ensemble")
+            self._ensemble_pool_pid = os.getpid()
+        return self._ensemble_pool
+
+    async def _run_parallel(self, *calls) -> list:
+        loop = asyncio.get_running_loop()
+        pool = self._get_ensemble_pool()
+        return await asyncio.gather(*(loop.run_in_executor(pool, call) for call in calls))
+
+    def _split_target_model_id(self, target_model_id: str = None) -> Tuple[Optional[str], Optional[str]]:
+        """target_model_id를 registry 타입에 따라 (IF 모델 ID, AE 모델 ID) 중 하나에 배정합니다 (Ensemble / Cascade)."""
+        model_info = model_loader.get_model_info(target_model_id) if target_model_id else None
+        model_type = model_info.get("type") if model_info else None
+        return (
+            target_model_id if model_type == "level1_isolation_forest" else None,
+            target_model_id if model_type == "level2_autoencoder" else None
+        )
+
+    def _fuse_votes(self, clip: Dict[str, Any], anomaly_score_if: Optional[float], ae_error: Union[float, str],
+                    if_model_id: str = None, ae_model_id: str = None) -> Dict[str, Any]:
+        """모델별 투표를 ENSEMBLE_WEIGHTS 가중 평균으로 융합합니다. 실패한 모델은 투표에서 제외됩니다."""
+        rule_result, peak_frequencies = clip["rule_result"]
+        votes: Dict[str, Dict[str, Any]] = {}
+
+        if rule_result["details"].get("method") != "Fallback":
+            votes["rule"] = {"name": "Rule-based", "status": rule_result["label"], "score": float(rule_result["score"])}
+        if anomaly_score_if is not None:
+            if_score = self._normalize_if_score(anomaly_score_if)
+            votes["isolation_forest"] = {
+                "name": "Isolation Forest",
+                "model_id": if_model_id or "Default",
+                "status": self._label_for_score(if_score),
+                "score": float(if_score),
+                "raw_score": float(anomaly_score_if)
+            }
+        if isinstance(ae_error, float):
+            ae_result = self._level2_result(ae_error, ae_model_id)
+            votes["autoencoder"] = {
+                "name": "Autoencoder",
+                "model_id": ae_model_id or "Default",
+                "status": ae_result["label"],
+                "score": ae_result["score"],
+                "raw_score": float(ae_error)
+            }
+
+        if not votes:
+            return self._get_fallback_result("ENSEMBLE_NO_VOTES")
+
+        for name, vote in votes.items():
+            vote["weight"] = float(ENSEMBLE_WEIGHTS.get(name, 1.0))
+        total_weight = sum(vote["weight"] for vote in votes.values())
+        if total_weight > 0:
+            fused_score = sum(vote["score"] * vote["weight"] for vote in votes.values()) / total_weight
+        else:
+            fused_score = max(vote["score"] for vote in votes.values())
+
+        label = self._label_for_score(fused_score)
+        summary = f"Ensemble of {len(votes)} model(s): " + ", ".join(f"{v['name']} {v['status']}" for v in votes.values()) + "."
+        if len(peak_frequencies) > 0 and label != "CRITICAL": # Level 1과 동일하게 결함 주파수 검출 시 CRITICAL
+            label = "CRITICAL"
+            fused_score = max(fused_score, 0.8)
+            summary += " Bearing fault frequencies detected."
+
+        details = dict(rule_result["details"]) if "rule" in votes else {}
+        details.update({
+            "method": "Ensemble (" + " + ".join(v["name"] for v in votes.values()) + ")",
+            "votes": votes,
+            "fused_score": float(fused_score),
+            "peak_frequencies": [float(f) for f in peak_frequencies]
+        })
+        if "isolation_forest" in votes:
+            details["ml_anomaly_score_if"] = votes["isolation_forest"]["raw_score"]
+        if "autoencoder" in votes:
+            details["reconstruction_error"] = votes["autoencoder"]["raw_score"]
+
+        return {"label": label, "score": float(fused_score), "summary": summary, "details": details}
+
+    @staticmethod
+    def _label_for_score(score: float) -> str:
+        """0-1 이상 점수의 라벨 (Level 1 Hybrid ML과 같은 기준)"""
+        if score > 0.7:
+            return "CRITICAL"
+        if score > 0.4:
+            return "WARNING"
+        return "NORMAL"
+
+    async def score_cascade(self, y: np.ndarray, sr: int, calibration_data: Dict[str, Any] = None, target_model_id: str = None, spectral: Optional[SpectralFrontend] = None) -> Dict[str, Any]:
+        """
+        Cascade: Level 1 (Rule-based + IF)을 먼저 실행하고, 판정이 불확실하거나 Rule이 발동한 클립만 Level 2 (Autoencoder)로 승급합니다.
+        details["cascade"]에 실행된 단계와 단계별 결과를 기록합니다.
+        """
+        clip = {
+            "y": y,
+            "sr": sr,
+            "spectral": spectral if spectral is not None else SpectralFrontend(y, sr),
+            "calibration_data": calibration_data
+        }
+        self.featurize_level1(clip)
+        return (await self.score_cascade_batch([clip], target_model_id=target_model_id))[0]
+
+    async def score_cascade_batch(self, clips: List[Dict[str, Any]], target_model_id: str = None) -> List[Dict[str, Any]]:
+        """
+        여러 클립의 Cascade 점수를 계산합니다 (마이크로 배치).
+        Level 1은 배치 전체에, Level 2 특징 추출 / forward는 승급된 클립에만 1회 수행합니다.
+        """
+        for clip in clips:
+            if "rule_result" not in clip:
+                self.featurize_level1(clip)
+
+        # Level 1 결합(IF) 전에 Rule 발동 여부 기록 (score_level1_batch가 rule_result를 갱신하므로)
+        rule_fired = [self._rule_fired(*clip["rule_result"]) for clip in clips]
+
+        if_model_id, ae_model_id = self._split_target_model_id(target_model_id)
+        level1_results = await self.score_level1_batch(clips, target_model_id=if_model_id)
+
+        escalated = []
+        for index, (result, fired) in enumerate(zip(level1_results, rule_fired)):
+            uncertain = CASCADE_UNCERTAIN_LOW <= result["score"] <= CASCADE_UNCERTAIN_HIGH
+            if fired or uncertain:
+                escalated.append((index, "rule" if fired else "uncertain"))
+
+        level2_results: Dict[int, Dict[str, Any]] = {}
+        if escalated:
+            batch = [clips[index] for index, _ in escalated]
+            for index, result in zip([index for index, _ in escalated], await self.score_level2_batch(batch, target_model_id=ae_model_id)):
+                level2_results[index] = result
+        logger.info(f"Cascade: {len(escalated)}/{len(clips)} clip(s) escalated to Level 2.")
+
+        reasons = dict(escalated)
+        return [
+            self._cascade_result(level1_results[index], level2_results.get(index), reasons.get(index))
+            for index in range(len(clips))
+        ]
+
+    def _rule_fired(self, rule_result: Dict[str, Any], peak_frequencies: list) -> bool:
+        """Rule-based 판정이 NORMAL이 아니거나 결함 주파수가 검출되었는지 (Fallback 결과는 제외)"""
+        if rule_result["details"].get("method") == "Fallback":
+            return False
+        return rule_result["label"] != "NORMAL" or len(peak_frequencies) > 0
+
+    @staticmethod
+    def _severity(result: Dict[str, Any]) -> Tuple[int, float]:
+        """판정 심각도 비교 키 (라벨 우선, 같은 라벨이면 점수) - 단계별 점수 척도가 달라 라벨을 먼저 비교"""
+        return {"NORMAL": 0, "WARNING": 1, "CRITICAL": 2}.get(result["label"], 0), float(result["score"])
+
+    def _cascade_result(self, level1_result: Dict[str, Any], level2_result: Optional[Dict[str, Any]], reason: Optional[str]) -> Dict[str, Any]:
+        """
+        승급하지 않은 클립은 Level 1 결과를 그대로 사용합니다.
+        불확실 구간으로 승급한 클립은 Level 2 판정을 따르고, Rule이 발동한 클립은 두 단계 중 더 심각한 판정을 따릅니다.
+        (Level 2가 실패해 Fallback이 나온 경우 Level 1 결과 유지)
+        """
+        stages = {"level1": {"label": level1_result["label"], "score": float(level1_result["score"])}}
+        result = {**level1_result, "details": dict(level1_result["details"])}
+
+        if level2_result is not None:
+            stages["level2"] = {"label": level2_result["label"], "score": float(level2_result["score"])}
+            if level2_result["details"].get("method") != "Fallback":
+                if reason == "uncertain" or self._severity(level2_result) > self._severity(level1_result):
+                    result["label"] = level2_result["label"]
+                    result["score"] = float(level2_result["score"])
+                    result["summary"] = level2_result["summary"]
+                result["details"].update({
+                    key: level2_result["details"][key] for key in ("reconstruction_error", "normalized_score")
+                })
+                result["details"]["method"] = f"Cascade ({level1_result['details'].get('method')} → {level2_result['details'].get('method')})"
+
+        result["details"]["cascade"] = {
+            "stages": list(stages),
+            "escalation_reason": reason,
+            "results": stages
+        }
+        return result
+
+    def aggregate_windows(self, windows: List[Dict[str, Any]], duration: Optional[float] = None) -> Dict[str, Any]:
+        """
+        윈도우별 결과를 녹음 전체 판정으로 합칩니다 (슬라이딩 윈도우 분석).
+        가장 심각한 윈도우(_severity: 라벨 우선, 같으면 점수)의 판정을 따르고, details["windows"]에 타임라인을 기록합니다.
+        windows: 시간 순 [{start_sec, end_sec, result}, ...]
+        """
+        worst_index = max(range(len(windows)), key=lambda index: self._severity(windows[index]["result"]))
+        worst = windows[worst_index]
+        result = {**worst["result"], "details": dict(worst["result"]["details"])}
+
+        timeline = []
+        label_counts = {"NORMAL": 0, "WARNING": 0, "CRITICAL": 0}
+        for window in windows:
+            label = window["result"]["label"]
+            label_counts[label] = label_counts.get(label, 0) + 1
+            timeline.append({
+                "start_sec": round(float(window["start_sec"]), 3),
+                "end_sec": round(float(window["end_sec"]), 3),
+                "label": label,
+                "score": float(window["result"]["score"])
+            })
+
+        result["summary"] = (
+            f"{worst['result']['summary']} "
+            f"(Most severe of {len(windows)} windows, {worst['start_sec']:.1f}s-{worst['end_sec']:.1f}s)"
+        )
+        result["details"]["windows"] = {
+            "count": len(windows),
+            "duration_sec": float(duration) if duration is not None else timeline[-1]["end_sec"],
+            "window_sec": ANALYSIS_WINDOW_SEC,
+            "hop_sec": timeline[1]["start_sec"] - timeline[0]["start_sec"] if len(timeline) > 1 else ANALYSIS_WINDOW_HOP_SEC,
+            "worst_window": worst_index,
+            "mean_score": float(np.mean([entry["score"] for entry in timeline])),
+            "label_counts": label_counts,
+            "timeline": timeline
+        }
+        return result
 
     def _get_fallback_result(self, reason: str):
         """Returns a generic fallback result in case of analysis failure."""
@@ -0,0 +1,120 @@
+import io
+import logging
+from collections import OrderedDict
+from typing import Any, Union
+
+from app.core.config_analysis import AUDIO_RANGE_BLOCK_BYTES, AUDIO_RANGE_CACHE_BLOCKS
+
+logger = logging.getLogger(__name__)
+
+
+class _SeekableReader(io.RawIOBase):
+    """읽기 전용 seekable 파일 객체 공통부 (soundfile virtual IO / parse_wav_header / shutil.copyfileobj에서 사용)"""
+
+    size = 0
+
+    def __init__(self):
+        super().__init__()
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self._pos = max(0, offset)
+        return self._pos
+
+
+class BufferReader(_SeekableReader):
+    """
+    메모리 버퍼 위의 파일 객체. io.BytesIO(memoryview)와 달리 버퍼를 복사하지 않고,
+    읽는 구간만 호출자의 버퍼로 복사합니다.
+    """
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview]):
+        super().__init__()
+        self._view = memoryview(data).cast("B")
+        self.size = len(self._view)
+
+    def readinto(self, buffer) -> int:
+        chunk = self._view[self._pos:self._pos + len(buffer)]
+        count = len(chunk)
+        memoryview(buffer).cast("B")[:count] = chunk
+        self._pos += count
+        return count
+
+
+class RangedObjectReader(_SeekableReader):
+    """
+    R2 객체를 통째로 받지 않고 AUDIO_RANGE_BLOCK_BYTES 블록 단위 byte-range 요청으로 읽는 파일 객체.
+    최근 블록 AUDIO_RANGE_CACHE_BLOCKS개만 유지하므로 (순차로 겹쳐 읽는 윈도우 분석 기준 블록당 요청 1회)
+    메모리 사용량은 객체 크기와 무관합니다.
+    head가 주어지면 이미 받은 첫 블록으로 사용합니다 (AudioPrefetcher가 크기 확인 시 받은 앞부분).
+    """
+
+    def __init__(self, storage: Any, object_name: str, size: int, head: bytes = b"",
+                 block_size: int = AUDIO_RANGE_BLOCK_BYTES, cache_blocks: int = AUDIO_RANGE_CACHE_BLOCKS):
+        super().__init__()
+        self.storage = storage
+        self.object_name = object_name
+        self.size = size
+        self.block_size = block_size
+        self.cache_blocks = max(1, cache_blocks)
+        self.requests = 0
+        self._blocks: "OrderedDict[int, bytes]" = OrderedDict()
+        if head and len(head) >= min(block_size, size):
+            self._blocks[0] = head[:block_size]
+
+    @property
+    def name(self) -> str:
+        return self.object_name
+
+    def _block(self, index: int) -> bytes:
+        block = self._blocks.get(index)
+        if block is not None:
+            self._blocks.move_to_end(index)
+            return block
+        start = index * self.block_size
+        end = min(start + self.block_size, self.size) - 1
+        block = self.storage.get_object_range(self.object_name, start, end)
+        if block is None:
+            raise IOError(f"Failed to read bytes {start}-{end} of {self.object_name}")
+        self.requests += 1
+        self._blocks[index] = block
+        while len(self._blocks) > self.cache_blocks:
+            self._blocks.popitem(last=False)
+        return block
+
+    def readinto(self, buffer) -> int:
+        target = memoryview(buffer).cast("B")
+        count = 0
+        while count < len(target) and self._pos < self.size:
+            index, offset = divmod(self._pos, self.block_size)
+            chunk = memoryview(self._block(index))[offset:offset + len(target) - count]
+            if not chunk:
+                break
+            target[count:count + len(chunk)] = chunk
+            count += len(chunk)
+            self._pos += len(chunk)
+        return count
+
+
+AudioBuffer = Union[bytes, bytearray, memoryview, RangedObjectReader]
+
+
+def open_audio_buffer(source: AudioBuffer) -> _SeekableReader:
+    """메모리 버퍼 / RangedObjectReader를 처음 위치의 seekable 파일 객체로 (버퍼 복사 없음)"""
+    if isinstance(source, RangedObjectReader):
+        source.seek(0)
+        return source
+    return BufferReader(source)
@@ -1,20 +1,39 @@
 import os
+import asyncio
+import json
 import subprocess
 import tempfile
+import time
 from pathlib import Path
 import uuid
-from typing import Optional
+from typing import Optional, List, Tuple, Dict, Any, AsyncIterator, Callable, Awaitable
 import logging
 
+from app.core.config_analysis import SAMPLE_RATE, FFMPEG_MAX_CONCURRENCY, FFMPEG_TIMEOUT_SEC, FFPROBE_TIMEOUT_SEC
+from app.features.audio_analysis.wav_header import read_wav_header, is_canonical_wav, to_audio_info
+
 logger = logging.getLogger(__name__)
 
 class AudioConverter:
     """
     오디오 파일 변환을 위한 유틸리티 클래스
     - M4A → WAV 변환 (안드로이드)
-    - WAV 검증 및 최적화 (iOS)
+    - WAV 검증 및 최적화 (iOS) - 분석용 표준 포맷이면 헤더만 확인하고 ffmpeg 생략
+    - 출력은 분석 파이프라인 포맷(SAMPLE_RATE, 모노, 16-bit PCM)으로 통일 → 워커 리샘플링 불필요
     - 특징: 임시 파일 자동 정리, 변환 실패시 원본 보존
     """
+
+    @staticmethod
+    def prepare_for_analysis(file_path: str) -> Tuple[str, dict]:
+        """
+        업로드 파일을 분석용 표준 WAV로 만들고 메타데이터와 함께 반환합니다.
+        ffmpeg는 최대 1회만 실행되며, 메타데이터는 결과 WAV 헤더에서 읽습니다 (ffprobe 생략).
+
+        Returns:
+            Tuple[str, dict]: (WAV 파일 경로, audio_info)
+        """
+        wav_path = AudioConverter.ensure_wav_format(file_path)
+        return wav_path, AudioConverter.get_audio_info(wav_path)
     
     @staticmethod
     def ensure_wav_format(file_path: str) -> str:
@@ -39,11 +58,12 @@ class AudioConverter:
         
         # 이미 WAV인 경우 검증 후 반환
         if file_path.suffix.lower() == '.wav':
-            if AudioConverter._validate_wav(file_path):
+            # Fast path: 헤더가 표준 포맷이면 ffmpeg 생략
+            if is_canonical_wav(read_wav_header(file_path)):
                 return str(file_path)
-            else:
-                logger.warning(f"Invalid WAV detected, converting: {file_path}")
-                return AudioConverter._convert_invalid_wav(file_path)
+            # 비표준/손상 WAV는 변환 1회로 검증과 표준화를 함께 수행
+            logger.warning(f"Non-canonical WAV detected, converting: {file_path}")
+            return AudioConverter._convert_invalid_wav(file_path)
         
         # M4A 또는 MP4의 경우 변환
         if file_path.suffix.lower() in ['.m4a', '.mp4']:
@@ -52,28 +72,86 @@ class AudioConverter:
         # 지원하지 않는 포맷
         raise ValueError(f"Unsupported audio format: {file_path.suffix}")
     
+    # --- ffmpeg 명령어 / 결과 파싱 (동기/비동기 공용) ---
+
+    @staticmethod
+    def _build_wav_convert_cmd(input_path: Path, output_path: Path) -> List[str]:
+        """분석용 표준 WAV (SAMPLE_RATE, 모노, 16-bit PCM) 변환 명령어"""
+        return [
+            'ffmpeg',
+            '-y',                          # 덮어쓰기 (대화형 프롬프트 방지)
+            '-i', str(input_path),          # 입력 파일
+            '-vn',                         # MP4 영상 스트림 제외
+            '-ar', str(SAMPLE_RATE),       # 분석 파이프라인 샘플레이트 (워커 리샘플링 생략)
+            '-ac', '1',                    # 모노 (파일 크기 효율)
+            '-f', 'wav',                   # WAV 포맷
+            '-sample_fmt', 's16',         # 16-bit PCM
+            str(output_path)               # 출력 파일
+        ]
+
+    @staticmethod
+    def _build_pcm_stream_cmd(input_spec: str = 'pipe:0') -> List[str]:
+        """분석용 raw PCM (SAMPLE_RATE, 모노, s16le)을 stdout으로 출력하는 스트리밍 변환 명령어"""
+        return [
+            'ffmpeg',
+            '-hide_banner',
+            '-loglevel', 'error',
+            '-i', input_spec,              # 'pipe:0' (stdin) 또는 파일 경로
+            '-vn',
+            '-ar', str(SAMPLE_RATE),
+            '-ac', '1',
+            '-f', 's16le',                 # 헤더 없는 PCM (WAV 헤더는 업로드 완료 시 작성)
+            'pipe:1'
+        ]
+
+    @staticmethod
+    def _build_probe_cmd(file_path: str) -> List[str]:
+        return [
+            'ffprobe',
+            '-v', 'quiet',
+            '-print_format', 'json',
+            '-show_format',
+            '-show_streams',
+            str(file_path)
+        ]
+
+    @staticmethod
+    def _parse_probe_output(stdout: str) -> dict:
+        """ffprobe JSON 출력을 audio_info 딕셔너리로 변환"""
+        data = json.loads(stdout)
+
+        if 'streams' not in data or len(data['streams']) == 0:
+            return {}
+
+        stream = data['streams'][0]
+        audio_info = {
+            'duration': float(stream.get('duration', 0)),
+            'sample_rate': int(stream.get('sample_rate', 0)),
+            'channels': int(stream.get('channels', 0)),
+            'codec': stream.get('codec_name', 'unknown'),
+            'size_mb': 0
+        }
+
+        # 파일 크기 계산
+        if 'format' in data and 'size' in data['format']:
+            audio_info['size_mb'] = int(data['format']['size']) / (1024 * 1024)
+
+        return audio_info
+
     @staticmethod
     def _convert_m4a_to_wav(input_path: Path) -> str:
         """M4A 파일을 고품질 WAV로 변환"""
         output_path = input_path.parent / f"{input_path.stem}_converted.wav"
         
         try:
-            cmd = [
-                'ffmpeg',
-                '-i', str(input_path),          # 입력 파일
-                '-ar', '22050',                # 샘플레이트 (안정성)
-                '-ac', '1',                    # 모노 (파일 크기 효율)
-                '-f', 'wav',                   # WAV 포맷
-                '-sample_fmt', 's16',         # 16-bit PCM
-                str(output_path)               # 출력 파일
-            ]
+            cmd = AudioConverter._build_wav_convert_cmd(input_path, output_path)
             
             logger.info(f"Converting M4A to WAV: {input_path} → {output_path}")
             result = subprocess.run(
                 cmd, 
                 capture_output=True, 
                 text=True,
-                timeout=60  # 60초 타임아웃
+                timeout=FFMPEG_TIMEOUT_SEC
             )
             
             if result.returncode != 0:
@@ -87,7 +165,7 @@ class AudioConverter:
             return str(output_path)
             
         except subprocess.TimeoutExpired:
-            raise RuntimeError("Audio conversion timeout (60 seconds)")
+            raise RuntimeError(f"Audio conversion timeout ({FFMPEG_TIMEOUT_SEC:g} seconds)")
         except Exception as e:
             raise RuntimeError(f"Audio conversion failed: {e}")
     
@@ -98,15 +176,7 @@ class AudioConverter:
         
         try:
             # 비표준 WAV를 표준 WAV로 변환
-            cmd = [
-                'ffmpeg',
-                '-i', str(input_path),
-                '-ar', '22050',
-                '-ac', '1',
-                '-f', 'wav',
-                '-sample_fmt', 's16',
-                str(temp_path)
-            ]
+            cmd = AudioConverter._build_wav_convert_cmd(input_path, temp_path)
             
             result = subprocess.run(cmd, capture_output=True, text=True)
             
@@ -121,16 +191,6 @@ class AudioConverter:
             logger.error(f"WAV conversion failed, original preserved: {e}")
             return str(input_path)
     
-    @staticmethod
-    def _validate_wav(file_path: Path) -> bool:
-        """WAV 파일 유효성 검사"""
-        try:
-            cmd = ['ffmpeg', '-i', str(file_path), '-f', 'null', '-']
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            return result.returncode == 0
-        except Exception:
-            return False
-    
     @staticmethod
     def get_audio_info(file_path: str) -> dict:
         """
@@ -139,40 +199,19 @@ class AudioConverter:
         Returns:
             dict: {duration, sample_rate, channels, size_mb}
         """
+        # Fast path: 표준 WAV는 헤더에서 바로 메타데이터 추출 (ffprobe 생략)
+        header = read_wav_header(file_path)
+        if is_canonical_wav(header):
+            return to_audio_info(header)
+
         try:
-            cmd = [
-                'ffprobe',
-                '-v', 'quiet',
-                '-print_format', 'json',
-                '-show_format',
-                '-show_streams',
-                file_path
-            ]
+            cmd = AudioConverter._build_probe_cmd(file_path)
             
             result = subprocess.run(cmd, capture_output=True, text=True)
             if result.returncode != 0:
                 return {}
             
-            import json
-            data = json.loads(result.stdout)
-            
-            if 'streams' not in data or len(data['streams']) == 0:
-                return {}
-            
-            stream = data['streams'][0]
-            audio_info = {
-                'duration': float(stream.get('duration', 0)),
-                'sample_rate': int(stream.get('sample_rate', 0)),
-                'channels': int(stream.get('channels', 0)),
-                'codec': stream.get('codec_name', 'unknown'),
-                'size_mb': 0
-            }
-            
-            # 파일 크기 계산
-            if 'format' in data and 'size' in data['format']:
-                audio_info['size_mb'] = int(data['format']['size']) / (1024 * 1024)
-            
-            return audio_info
+            return AudioConverter._parse_probe_output(result.stdout)
             
         except Exception as e:
             logger.error(f"Failed to get audio info: {e}")
@@ -187,7 +226,6 @@ class AudioConverter:
             if upload_dir.exists():
                 for file_path in upload_dir.glob("*.wav"):
                     # 오래된 파일 정리 (1시간 이상)
-                    import time
                     if time.time() - file_path.stat().st_mtime > 3600:
                         file_path.unlink(missing_ok=True)
                         cleanup_count += 1
@@ -196,3 +234,277 @@ class AudioConverter:
         except Exception as e:
             logger.error(f"Cleanup failed: {e}")
             return 0
+
+
+class SubprocessPool:
+    """
+    asyncio 기반 외부 프로세스(ffmpeg/ffprobe) 실행 풀.
+    - Semaphore로 동시 실행 수 제한 (CPU 과점유 방지)
+    - 호출별 타임아웃 (초과 시 프로세스 kill)
+    - 대기열 깊이 / 실행 중 / 완료 / 타임아웃 카운터 제공
+    """
+
+    def __init__(self, max_concurrency: int = FFMPEG_MAX_CONCURRENCY):
+        self.max_concurrency = max(1, max_concurrency)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._waiting = 0
+        self._active = 0
+        self._peak_waiting = 0
+        self._completed = 0
+        self._failed = 0
+        self._timeouts = 0
+        self._total_wait_sec = 0.0
+        self._total_run_sec = 0.0
+
+    async def run(self, cmd: List[str], timeout: float, stdin_data: Optional[bytes] = None) -> Tuple[int, bytes, bytes]:
+        """
+        명령어를 실행하고 (returncode, stdout, stderr)를 반환합니다.
+
+        Raises:
+            asyncio.TimeoutError: timeout 초과 (프로세스는 종료됨)
+            asyncio.CancelledError: 호출 취소 (프로세스는 종료됨)
+        """
+        started_at = await self._acquire()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.PIPE if stdin_data is not None else asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(stdin_data), timeout=timeout)
+            except asyncio.TimeoutError:
+                self._timeouts += 1
+                logger.error(f"⏱️ Subprocess timeout ({timeout:g}s): {cmd[0]}")
+                raise
+            finally:
+                # [수정] 타임아웃뿐 아니라 취소(클라이언트 연결 종료 등)에도 슬롯 반환 전에 프로세스 종료
+                await self._reap(process)
+
+            if process.returncode == 0:
+                self._completed += 1
+            else:
+                self._failed += 1
+            return process.returncode, stdout, stderr
+        finally:
+            self._release(started_at)
+
+    async def pipe(
+        self,
+        cmd: List[str],
+        on_output: Callable[[bytes], Awaitable[None]],
+        timeout: float,
+        input_chunks: Optional[AsyncIterator[bytes]] = None,
+        read_size: int = 64 * 1024
+    ) -> Tuple[int, bytes]:
+        """
+        스트리밍 실행: input_chunks를 stdin으로 공급하면서 stdout을 read_size 단위로 on_output에 전달합니다.
+        입력/출력 전체를 메모리에 올리지 않습니다. (returncode, stderr)를 반환합니다.
+
+        Raises:
+            asyncio.TimeoutError: timeout 초과 (프로세스는 종료됨)
+            Exception: input_chunks / on_output에서 발생한 예외 (프로세스는 종료됨)
+        """
+        started_at = await self._acquire()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.PIPE if input_chunks is not None else asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+
+            async def feed_stdin():
+                try:
+                    async for chunk in input_chunks:
+                        process.stdin.write(chunk)
+                        await process.stdin.drain()
+                except (BrokenPipeError, ConnectionResetError):
+                    # ffmpeg가 먼저 종료된 경우 - returncode/stderr로 판단
+                    pass
+                finally:
+                    if not process.stdin.is_closing():
+                        process.stdin.close()
+
+            async def drain_stdout():
+                while True:
+                    chunk = await process.stdout.read(read_size)
+                    if not chunk:
+                        break
+                    await on_output(chunk)
+
+            tasks = [asyncio.ensure_future(drain_stdout()), asyncio.ensure_future(process.stderr.read())]
+            if input_chunks is not None:
+                tasks.append(asyncio.ensure_future(feed_stdin()))
+
+            gathered = asyncio.gather(*tasks)
+            try:
+                results = await asyncio.wait_for(gathered, timeout=timeout)
+                await process.wait()
+            except asyncio.TimeoutError:
+                self._timeouts += 1
+                logger.error(f"⏱️ Subprocess timeout ({timeout:g}s): {cmd[0]}")
+                raise
+            except BaseException:
+                self._failed += 1
+                raise
+            finally:
+                # [수정] 한 task가 실패/취소되어도 gather는 나머지를 계속 실행하므로 (stdin 공급이 업로드 스트림을 계속 읽음) 직접 취소 후 회수.
+                # stdin이 열려 있으면 process.wait()가 끝나지 않으므로 프로세스 회수보다 먼저 정리
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                if gathered.done() and not gathered.cancelled():
+                    gathered.exception()  # 취소된 gather 예외 회수 ("exception was never retrieved" 로그 방지)
+                await self._reap(process)
+
+            if process.returncode == 0:
+                self._completed += 1
+            else:
+                self._failed += 1
+            return process.returncode, results[1]
+        finally:
+            self._release(started_at)
+
+    @staticmethod
+    async def _reap(process: asyncio.subprocess.Process):
+        """아직 실행 중인 자식 프로세스를 kill 후 회수 (ffmpeg/ffprobe 고아 프로세스 방지)"""
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+        await process.wait()
+
+    async def _acquire(self) -> float:
+        """실행 슬롯 확보 (대기열 깊이 집계) 후 시작 시각 반환"""
+        queued_at = time.perf_counter()
+        self._waiting += 1
+        self._peak_waiting = max(self._peak_waiting, self._waiting)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        started_at = time.perf_counter()
+        self._total_wait_sec += started_at - queued_at
+        self._active += 1
+        return started_at
+
+    def _release(self, started_at: float):
+        self._active -= 1
+        self._total_run_sec += time.perf_counter() - started_at
+        self._semaphore.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        finished = self._completed + self._failed + self._timeouts
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self._active,
+            "queue_depth": self._waiting,
+            "peak_queue_depth": self._peak_waiting,
+            "completed": self._completed,
+            "failed": self._failed,
+            "timeouts": self._timeouts,
+            "avg_wait_ms": (self._total_wait_sec / finished * 1000) if finished else 0.0,
+            "avg_run_ms": (self._total_run_sec / finished * 1000) if finished else 0.0,
+        }
+
+
+# API 프로세스 공용 ffmpeg 실행 풀
+ffmpeg_pool = SubprocessPool()
+
+
+class AsyncAudioConverter:
+    """
+    AudioConverter의 비동기 버전 (FastAPI 이벤트 루프를 블로킹하지 않음).
+    동일한 ffmpeg 명령어/파싱 로직을 사용하고, 실행은 ffmpeg_pool을 통해 제한됩니다.
+    """
+
+    @staticmethod
+    async def prepare_for_analysis(file_path: str, pool: SubprocessPool = None) -> Tuple[str, dict]:
+        """AudioConverter.prepare_for_analysis의 비동기 버전 (ffmpeg 최대 1회)"""
+        wav_path = await AsyncAudioConverter.ensure_wav_format(file_path, pool)
+        return wav_path, await AsyncAudioConverter.get_audio_info(wav_path, pool)
+
+    @staticmethod
+    async def ensure_wav_format(file_path: str, pool: SubprocessPool = None) -> str:
+        """AudioConverter.ensure_wav_format의 비동기 버전"""
+        pool = pool or ffmpeg_pool
+        file_path = Path(file_path)
+
+        if not file_path.exists():
+            raise FileNotFoundError(f"Audio file not found: {file_path}")
+
+        # 이미 WAV인 경우 검증 후 반환
+        if file_path.suffix.lower() == '.wav':
+            # Fast path: 헤더가 표준 포맷이면 ffmpeg 프로세스 생성 없이 통과
+            if is_canonical_wav(read_wav_header(file_path)):
+                return str(file_path)
+            logger.warning(f"Non-canonical WAV detected, converting: {file_path}")
+            return await AsyncAudioConverter._convert_invalid_wav(file_path, pool)
+
+        # M4A 또는 MP4의 경우 변환
+        if file_path.suffix.lower() in ['.m4a', '.mp4']:
+            return await AsyncAudioConverter._convert_m4a_to_wav(file_path, pool)
+
+        # 지원하지 않는 포맷
+        raise ValueError(f"Unsupported audio format: {file_path.suffix}")
+
+    @staticmethod
+    async def _convert_m4a_to_wav(input_path: Path, pool: SubprocessPool) -> str:
+        output_path = input_path.parent / f"{input_path.stem}_converted.wav"
+        cmd = AudioConverter._build_wav_convert_cmd(input_path, output_path)
+
+        logger.info(f"Converting M4A to WAV: {input_path} → {output_path}")
+        try:
+            returncode, _, stderr = await pool.run(cmd, timeout=FFMPEG_TIMEOUT_SEC)
+        except asyncio.TimeoutError:
+            output_path.unlink(missing_ok=True)
+            raise RuntimeError(f"Audio conversion timeout ({FFMPEG_TIMEOUT_SEC:g} seconds)")
+        except Exception as e:
+            raise RuntimeError(f"Audio conversion failed: {e}")
+
+        if returncode != 0:
+            error_msg = stderr.decode(errors="replace") or "Unknown error"
+            raise RuntimeError(f"Audio conversion failed: FFmpeg conversion failed: {error_msg}")
+
+        # 변환 성공 후 원본 파일 정리
+        input_path.unlink(missing_ok=True)
+        logger.info(f"✅ 변환 성공: {output_path}")
+        return str(output_path)
+
+    @staticmethod
+    async def _convert_invalid_wav(input_path: Path, pool: SubprocessPool) -> str:
+        temp_path = input_path.parent / f"temp_{uuid.uuid4()}.wav"
+        cmd = AudioConverter._build_wav_convert_cmd(input_path, temp_path)
+
+        try:
+            returncode, _, stderr = await pool.run(cmd, timeout=FFMPEG_TIMEOUT_SEC)
+            if returncode == 0:
+                input_path.unlink(missing_ok=True)  # 원본 삭제
+                return str(temp_path.rename(input_path))  # 원본 이름으로 대체
+            raise RuntimeError(f"WAV re-conversion failed: {stderr.decode(errors='replace')}")
+        except Exception as e:
+            # 실패 시 원본 보존
+            temp_path.unlink(missing_ok=True)
+            logger.error(f"WAV conversion failed, original preserved: {e}")
+            return str(input_path)
+
+    @staticmethod
+    async def get_audio_info(file_path: str, pool: SubprocessPool = None) -> dict:
+        """AudioConverter.get_audio_info의 비동기 버전"""
+        pool = pool or ffmpeg_pool
+        header = read_wav_header(file_path)
+        if is_canonical_wav(header):
+            return to_audio_info(header)
+
+        try:
+            returncode, stdout, _ = await pool.run(AudioConverter._build_probe_cmd(file_path), timeout=FFPROBE_TIMEOUT_SEC)
+            if returncode != 0:
+                return {}
+            return AudioConverter._parse_probe_output(stdout.decode())
+        except Exception as e:
+            logger.error(f"Failed to get audio info: {e}")
+            return {}
@@ -1,24 +1,91 @@
+import io
+import os
+import shutil
 import logging
+import tempfile
 import numpy as np
 from pathlib import Path
-from typing import Tuple
+from typing import Tuple, Optional, Union, Iterator, List, Dict
 
 # Librosa is a heavy library, so import it only if needed
 try:
     import librosa
+    import soundfile
 except ImportError:
     librosa = None
+    soundfile = None
     logging.warning("Librosa is not available. Audio loading and processing will be disabled.")
 
-from scipy.signal import butter, lfilter, hilbert
-from scipy.fft import fft, fftfreq
-from scipy.ndimage import maximum_filter1d
+from scipy.signal import butter, sosfilt, hilbert
+from scipy.fft import rfft, rfftfreq
+from scipy.ndimage import maximum_filter1d, minimum_filter1d
 
 # Import constants from config_analysis
-from app.core.config_analysis import SAMPLE_RATE, BP_LOW, BP_HIGH
+from app.core.config_analysis import (
+    SAMPLE_RATE, BP_LOW, BP_HIGH, ANALYSIS_DURATION_SEC, ANALYSIS_WINDOW_SEC, ANALYSIS_WINDOW_HOP_SEC, ANALYSIS_MAX_WINDOWS,
+    N_FFT
+)
+from app.features.audio_analysis.spectral_frontend import SpectralFrontend, band_bins
+from app.features.audio_analysis.wav_header import read_wav_header, parse_wav_header, is_canonical_wav
+from app.features.audio_analysis.audio_source import AudioBuffer, open_audio_buffer
+
+# 메모리 버퍼 디코딩 시 헤더 판별에 사용할 앞부분 크기
+BUFFER_HEADER_PEEK_BYTES = 64 * 1024
+
+# 포락선 분석 밴드패스 필터 차수 (Butterworth)
+ENVELOPE_FILTER_ORDER = 5
+# 포락선 스펙트럼에서 결함 주파수 피크를 찾을 상한 (Hz) - 베어링 결함 주파수는 주로 저주파 성분
+ENVELOPE_PEAK_MAX_FREQ = 500
 
 logger = logging.getLogger(__name__)
 
+def window_starts(total_frames: int, window_frames: int, hop_frames: int, max_windows: int = ANALYSIS_MAX_WINDOWS) -> List[int]:
+    """
+    슬라이딩 윈도우 시작 위치 (frame).
+    마지막 윈도우는 녹음 끝에 맞춰 모든 윈도우가 같은 길이가 되도록 하고, 녹음이 한 윈도우보다 짧으면 [0]입니다.
+    max_windows를 넘으면 간격을 넓혀 녹음 전체에 고르게 배치합니다.
+    """
+    if total_frames <= window_frames:
+        return [0]
+    last = total_frames - window_frames
+    starts = list(range(0, last + 1, max(1, hop_frames)))
+    if starts[-1] != last:
+        starts.append(last)
+    if len(starts) > max_windows:
+        starts = [int(round(start)) for start in np.linspace(0, last, max_windows)]
+    return starts
+
+def _window_frames() -> int:
+    return int(round(ANALYSIS_WINDOW_SEC * SAMPLE_RATE))
+
+def _hop_frames() -> int:
+    return int(round(ANALYSIS_WINDOW_HOP_SEC * SAMPLE_RATE))
+
+def plan_window_segments(header: dict, windows_per_segment: int) -> List[dict]:
+    """
+    표준 WAV(is_canonical_wav) 녹음의 윈도우를 연속된 windows_per_segment개씩 묶어 R2 byte-range 세그먼트로 나눕니다 (분산 분석용).
+    윈도우 위치는 iter_windows와 같으므로 세그먼트 결과를 합치면 단일 태스크 윈도우 분석과 같은 타임라인이 됩니다.
+
+    Returns:
+        [{byte_start, byte_end (inclusive), base_frame, total_frames, starts}, ...] - starts는 전체 녹음 기준 frame
+    """
+    total_frames = header["data_size"] // 2
+    window_frames = _window_frames()
+    starts = window_starts(total_frames, window_frames, _hop_frames())
+    segments = []
+    for index in range(0, len(starts), max(1, windows_per_segment)):
+        segment_starts = starts[index:index + windows_per_segment]
+        base_frame = segment_starts[0]
+        end_frame = min(segment_starts[-1] + window_frames, total_frames)
+        segments.append({
+            "byte_start": header["data_offset"] + 2 * base_frame,
+            "byte_end": header["data_offset"] + 2 * end_frame - 1,
+            "base_frame": base_frame,
+            "total_frames": total_frames,
+            "starts": segment_starts
+        })
+    return segments
+
 class DSPFilter:
     """
     디지털 신호 처리(DSP) 필터링 및 전처리 모듈.
@@ -30,6 +97,39 @@ class DSPFilter:
             logger.error("DSPFilter requires librosa but it's not available.")
             raise ImportError("librosa is required for DSPFilter but not found.")
 
+        # (sr, 대역, 차수)별 밴드패스 SOS 계수 / (sr, n_fft, 대역)별 스펙트로그램 bin 범위 - 클립마다 다시 설계/탐색하지 않음
+        # 유효하지 않은 조합은 None으로 캐싱 (경고도 조합당 한 번만)
+        self._sos_cache: Dict[tuple, Optional[np.ndarray]] = {}
+        self._band_bins_cache: Dict[tuple, Optional[slice]] = {}
+
+        # 업로드 표준 SAMPLE_RATE 조합은 미리 계산
+        self.bandpass_sos(SAMPLE_RATE)
+        for low_freq, high_freq in ((BP_LOW, BP_HIGH), (10000, SAMPLE_RATE / 2)):
+            self.band_slice(SAMPLE_RATE, N_FFT, low_freq, high_freq)
+
+    def bandpass_sos(self, sr: int, lowcut: float = BP_LOW, highcut: float = BP_HIGH, order: int = ENVELOPE_FILTER_ORDER) -> Optional[np.ndarray]:
+        """Butterworth 밴드패스 SOS 계수 (캐싱). 대역이 Nyquist를 넘는 등 설계할 수 없으면 None."""
+        key = (sr, lowcut, highcut, order)
+        if key not in self._sos_cache:
+            nyquist = 0.5 * sr
+            sos = None
+            if lowcut >= nyquist or highcut >= nyquist or lowcut >= highcut:
+                logger.warning(f"Invalid filter frequencies for SR {sr}. Nyquist: {nyquist}. Lowcut: {lowcut}, Highcut: {highcut}")
+            else:
+                try:
+                    sos = butter(order, [lowcut, highcut], btype='band', fs=sr, output='sos')
+                except Exception as e:
+                    logger.warning(f"Bandpass filter design failed: {e}")
+            self._sos_cache[key] = sos
+        return self._sos_cache[key]
+
+    def band_slice(self, sr: int, n_fft: int, low_freq: float, high_freq: float) -> Optional[slice]:
+        """STFT(sr, n_fft)에서 [low_freq, high_freq] 대역의 bin 범위 (캐싱, SpectralFrontend.band_energy_ratio에 전달)"""
+        key = (sr, n_fft, low_freq, high_freq)
+        if key not in self._band_bins_cache:
+            self._band_bins_cache[key] = band_bins(librosa.fft_frequencies(sr=sr, n_fft=n_fft), low_freq, high_freq)
+        return self._band_bins_cache[key]
+
     async def process_audio(self, audio_path: Path) -> Tuple[np.ndarray, int]:
         """
         오디오 파일을 로드하고 리샘플링 및 전처리를 수행합니다.
@@ -43,41 +143,176 @@ class DSPFilter:
         if not audio_path.exists():
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
-        y, sr = librosa.load(audio_path, sr=SAMPLE_RATE, duration=10) # Load and resample to SAMPLE_RATE
-        
-        logger.info(f"Audio loaded and resampled to {SAMPLE_RATE}Hz from {audio_path.name}")
+        # 업로드 시 이미 SAMPLE_RATE 모노로 저장된 파일은 리샘플링 생략 (레거시 파일만 리샘플링)
+        header = read_wav_header(audio_path)
+        if header and header["sample_rate"] == SAMPLE_RATE and header["channels"] == 1:
+            y, sr = librosa.load(audio_path, sr=None, duration=ANALYSIS_DURATION_SEC)
+            logger.info(f"Audio loaded at native {SAMPLE_RATE}Hz (no resampling) from {audio_path.name}")
+        else:
+            y, sr = librosa.load(audio_path, sr=SAMPLE_RATE, duration=ANALYSIS_DURATION_SEC) # Load and resample to SAMPLE_RATE
+            logger.info(f"Audio loaded and resampled to {SAMPLE_RATE}Hz from {audio_path.name}")
 
         # Apply bandpass filter if needed (or keep it in envelope_analysis/calculate_band_energy)
         # For now, just resampling and returning. Further filtering will be in specific analysis functions.
         
         return y, SAMPLE_RATE
 
-    def calculate_band_energy(self, y: np.ndarray, sr: int, low_freq: float, high_freq: float) -> float:
-        """지정된 주파수 대역의 에너지 비율 계산"""
+    async def process_audio_buffer(self, data: AudioBuffer, name: str = "<buffer>") -> Tuple[np.ndarray, int]:
+        """
+        메모리 버퍼(R2에서 바로 받은 bytes 또는 RangedObjectReader)의 오디오를 디스크를 거치지 않고 디코딩합니다.
+        process_audio와 같은 결과(앞 ANALYSIS_DURATION_SEC초, SAMPLE_RATE 모노 float32)를 반환합니다.
+        - 표준 WAV (SAMPLE_RATE 16-bit PCM 모노): data 청크 앞부분만 읽어 numpy로 변환
+        - 그 외 soundfile이 읽을 수 있는 포맷: 버퍼를 복사하지 않는 파일 객체로 librosa.load (필요 시 리샘플링)
+        - M4A 등 soundfile 미지원 포맷 (레거시 직접 업로드 원본): 임시 파일로 대체 디코딩
+        """
+        reader = open_audio_buffer(data)
+        header = self._peek_header(reader)
+
+        if is_canonical_wav(header):
+            frames = min(header["data_size"] // 2, int(ANALYSIS_DURATION_SEC * SAMPLE_RATE))
+            y = self._read_pcm(reader, header["data_offset"], frames)
+            logger.info(f"Audio decoded in memory at native {SAMPLE_RATE}Hz (no resampling) from {name}")
+            return y, SAMPLE_RATE
+
+        target_sr = None if header and header["sample_rate"] == SAMPLE_RATE and header["channels"] == 1 else SAMPLE_RATE
         try:
-            # STFT를 사용하여 스펙트로그램 얻기
-            S = np.abs(librosa.stft(y))
-            
-            # 주파수 축 가져오기
-            freqs = librosa.fft_frequencies(sr=sr)
-            
-            # 해당 주파수 대역의 인덱스 찾기
-            if high_freq > freqs[-1]:
-                high_freq = freqs[-1]
-            
-            if low_freq >= high_freq:
-                return 0.0
-
-            idx_low = np.where(freqs >= low_freq)[0][0] if np.any(freqs >= low_freq) else 0
-            idx_high = np.where(freqs <= high_freq)[0][-1] if np.any(freqs <= high_freq) else len(freqs) - 1
-            
-            # 해당 대역의 에너지 합산
-            band_energy = np.sum(S[idx_low:idx_high+1, :])
-            
-            # 전체 에너지 합산
-            total_energy = np.sum(S)
-            
-            return band_energy / total_energy if total_energy > 0 else 0
+            reader.seek(0)
+            y, _ = librosa.load(reader, sr=target_sr, duration=ANALYSIS_DURATION_SEC)
+            logger.info(f"Audio decoded in memory and resampled to {SAMPLE_RATE}Hz from {name}")
+        except Exception as e:
+            logger.warning(f"In-memory decode failed for {name} ({e}), falling back to temporary file")
+            y, _ = self._load_via_temp_file(reader, name, duration=ANALYSIS_DURATION_SEC)
+
+        return y, SAMPLE_RATE
+
+    @staticmethod
+    def _peek_header(reader: io.RawIOBase) -> Optional[Dict]:
+        """파일 객체 앞 BUFFER_HEADER_PEEK_BYTES만 읽어 WAV 헤더를 파싱합니다 (WAV가 아니면 None)."""
+        reader.seek(0)
+        header = parse_wav_header(io.BytesIO(reader.read(BUFFER_HEADER_PEEK_BYTES)), file_size=reader.size)
+        reader.seek(0)
+        return header
+
+    @staticmethod
+    def _read_pcm(reader: io.RawIOBase, offset: int, frames: int) -> np.ndarray:
+        """offset 위치의 16-bit PCM frames개를 읽어 libsndfile과 같은 정규화로 float32 변환"""
+        reader.seek(offset)
+        pcm = np.frombuffer(reader.read(2 * frames), dtype="<i2")
+        return pcm.astype(np.float32) / 32768.0 # libsndfile과 동일한 정규화
+
+    @staticmethod
+    def _load_via_temp_file(reader: io.RawIOBase, name: str, duration: Optional[float] = None) -> Tuple[np.ndarray, int]:
+        """soundfile이 읽지 못하는 포맷: 파일 객체를 임시 파일로 스트리밍 복사한 뒤 librosa.load (audioread)"""
+        reader.seek(0)
+        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(name)[1] or ".wav") as temp_file:
+            shutil.copyfileobj(reader, temp_file)
+        try:
+            return librosa.load(temp_file.name, sr=SAMPLE_RATE, duration=duration)
+        finally:
+            os.remove(temp_file.name)
+
+    def audio_duration(self, source: Union[Path, AudioBuffer]) -> Optional[float]:
+        """
+        샘플을 디코딩하지 않고 녹음 길이(초)를 반환합니다 (파일 경로, 메모리 버퍼 또는 RangedObjectReader).
+        WAV 헤더 → soundfile 헤더 순으로 확인하고, 읽을 수 없는 포맷(M4A 등)이면 None을 반환합니다.
+        """
+        if isinstance(source, Path):
+            header = read_wav_header(source)
+        else:
+            source = open_audio_buffer(source)
+            header = self._peek_header(source)
+        if header:
+            return float(header["duration"])
+        try:
+            return float(soundfile.info(source).duration)
+        except Exception:
+            return None
+
+    def iter_windows(self, source: Union[Path, AudioBuffer], name: str = "<buffer>") -> Iterator[Tuple[float, np.ndarray]]:
+        """
+        녹음 전체를 ANALYSIS_WINDOW_SEC 길이, ANALYSIS_WINDOW_HOP_SEC 간격의 겹치는 윈도우로 나눠 순서대로 반환합니다.
+        (시작 시각(초), SAMPLE_RATE 모노 float32) - 한 번에 한 윈도우만 읽어 디코딩하므로 녹음 길이와 무관하게 메모리 사용량이 일정합니다.
+        (RangedObjectReader는 R2에서 블록 단위로 읽으므로 녹음 전체를 내려받지 않습니다.)
+        - 표준 WAV: data 청크에서 윈도우 구간만 읽어 numpy로 변환
+        - 그 외 soundfile이 읽을 수 있는 포맷: 윈도우 구간만 읽고 필요 시 윈도우 단위로 리샘플링
+        - M4A 등 soundfile 미지원 포맷 (레거시): 전체를 디코딩한 뒤 윈도우로 나눔
+        """
+        if not isinstance(source, Path):
+            source = open_audio_buffer(source)
+            header = self._peek_header(source)
+            if is_canonical_wav(header):
+                total_frames = header["data_size"] // 2
+                window_frames = _window_frames()
+                for start in window_starts(total_frames, window_frames, _hop_frames()):
+                    y = self._read_pcm(source, header["data_offset"] + 2 * start, min(window_frames, total_frames - start))
+                    yield start / SAMPLE_RATE, y
+                return
+        else:
+            name = source.name
+
+        try:
+            sound_file = soundfile.SoundFile(source)
+        except Exception as e:
+            logger.warning(f"Windowed decode not supported for {name} ({e}), decoding the whole recording")
+            yield from self._iter_decoded_windows(source, name)
+            return
+
+        with sound_file:
+            native_sr = sound_file.samplerate
+            window_frames = int(round(ANALYSIS_WINDOW_SEC * native_sr))
+            for start in window_starts(sound_file.frames, window_frames, int(round(ANALYSIS_WINDOW_HOP_SEC * native_sr))):
+                sound_file.seek(start)
+                block = sound_file.read(window_frames, dtype="float32", always_2d=True)
+                y = block.mean(axis=1) if block.shape[1] > 1 else block[:, 0] # librosa.to_mono와 동일
+                if native_sr != SAMPLE_RATE:
+                    y = librosa.resample(y, orig_sr=native_sr, target_sr=SAMPLE_RATE)
+                yield start / native_sr, np.ascontiguousarray(y, dtype=np.float32)
+
+    def iter_pcm_windows(self, data: Union[bytes, bytearray, memoryview], starts: List[int], data_offset: int = 0,
+                         base_frame: int = 0, total_frames: Optional[int] = None) -> Iterator[Tuple[float, np.ndarray]]:
+        """
+        표준 PCM(SAMPLE_RATE 16-bit 모노) 바이트에서 starts(전체 녹음 기준 frame) 위치의 윈도우를 반환합니다 (process_audio_buffer와 같은 정규화).
+        data가 녹음 일부(R2 byte-range 세그먼트)이면 base_frame은 data_offset 위치의 frame 번호입니다.
+        """
+        view = memoryview(data)
+        if total_frames is None:
+            total_frames = base_frame + (len(view) - data_offset) // 2
+        window_frames = _window_frames()
+        for start in starts:
+            frames = min(window_frames, total_frames - start)
+            pcm = np.frombuffer(view, dtype="<i2", count=frames, offset=data_offset + 2 * (start - base_frame))
+            yield start / SAMPLE_RATE, pcm.astype(np.float32) / 32768.0
+
+    def _iter_decoded_windows(self, source: Union[Path, io.RawIOBase], name: str) -> Iterator[Tuple[float, np.ndarray]]:
+        y, _ = self.decode_full(source, name)
+        yield from self.iter_array_windows(y)
+
+    def decode_full(self, source: Union[Path, AudioBuffer, io.RawIOBase], name: str = "<buffer>") -> Tuple[np.ndarray, int]:
+        """
+        녹음 전체를 SAMPLE_RATE 모노로 디코딩합니다 (헤더로 길이를 알 수 없는 레거시 M4A 등 - 메모리 사용량이 녹음 길이에 비례).
+        버퍼는 임시 파일로 스트리밍 복사해 audioread로 디코딩합니다.
+        """
+        if isinstance(source, Path):
+            return librosa.load(source, sr=SAMPLE_RATE)
+        if not isinstance(source, io.RawIOBase):
+            source = open_audio_buffer(source)
+        return self._load_via_temp_file(source, name)
+
+    def iter_array_windows(self, y: np.ndarray) -> Iterator[Tuple[float, np.ndarray]]:
+        """이미 디코딩된 SAMPLE_RATE 녹음을 윈도우로 나눕니다 (iter_windows와 같은 위치/길이)."""
+        window_frames = _window_frames()
+        for start in window_starts(len(y), window_frames, _hop_frames()):
+            yield start / SAMPLE_RATE, y[start:start + window_frames]
+
+    def calculate_band_energy(self, y: np.ndarray, sr: int, low_freq: float, high_freq: float, spectral: Optional[SpectralFrontend] = None) -> float:
+        """
+        지정된 주파수 대역의 에너지 비율 계산.
+        spectral이 주어지면 이미 계산된 STFT를 재사용합니다.
+        """
+        try:
+            if spectral is None:
+                spectral = SpectralFrontend(y, sr)
+            return spectral.band_energy_ratio(low_freq, high_freq, bins=self.band_slice(spectral.sr, spectral.n_fft, low_freq, high_freq))
         except Exception as e:
             logger.warning(f"   ⚠️ 에너지 계산 중 오류: {e}")
             return 0.0
@@ -86,50 +321,55 @@ class DSPFilter:
         """
         Performs envelope analysis to identify bearing fault frequencies.
         Uses BP_LOW and BP_HIGH from config_analysis for the bandpass filter.
+        피크 주파수 목록만 반환합니다 (진폭 / prominence가 필요하면 envelope_peaks 사용).
         """
-        # 1. Bandpass Filter (from config)
-        lowcut = BP_LOW
-        highcut = BP_HIGH
-        order = 5
-        nyquist = 0.5 * sr
-        
-        if lowcut >= nyquist or highcut >= nyquist or lowcut >= highcut:
-            logger.warning(f"Invalid filter frequencies for SR {sr}. Nyquist: {nyquist}. Lowcut: {lowcut}, Highcut: {highcut}")
-            return []
+        return self.envelope_peaks(y, sr)["frequencies"].tolist()
+
+    def envelope_peaks(self, y: np.ndarray, sr: int) -> Dict[str, np.ndarray]:
+        """
+        포락선 스펙트럼의 결함 주파수 피크를 한 번에 찾습니다.
+        {"frequencies", "amplitudes", "prominences"} 배열(주파수 오름차순)을 반환하며, 분석할 수 없으면 빈 배열입니다.
+        피크 판정과 prominence 모두 bin 단위 필터 연산이라 임계값을 넘는 bin 수와 무관하게 비용이 일정합니다.
+        """
+        empty = {"frequencies": np.empty(0), "amplitudes": np.empty(0), "prominences": np.empty(0)}
+
+        # 1. Bandpass Filter (from config, 캐싱된 SOS 계수 - 고차 밴드패스에서 b/a 형식보다 수치적으로 안정)
+        sos = self.bandpass_sos(sr)
+        if sos is None:
+            return empty
 
         try:
-            b, a = butter(order, [lowcut, highcut], btype='band', fs=sr)
-            filtered_signal = lfilter(b, a, y)
+            filtered_signal = sosfilt(sos, y)
         except Exception as e:
             logger.warning(f"Bandpass filtering failed: {e}")
-            return []
+            return empty
 
         # 2. Hilbert Transform (Extract Envelope)
-        analytic_signal = hilbert(filtered_signal)
-        amplitude_envelope = np.abs(analytic_signal)
+        amplitude_envelope = np.abs(hilbert(filtered_signal))
 
-        # 3. FFT (Spectrum of the Envelope)
+        # 3. FFT (Spectrum of the Envelope) - 실수 입력이므로 rfft, 크기는 ENVELOPE_PEAK_MAX_FREQ 이하 bin만 계산
         n = len(amplitude_envelope)
-        yf = fft(amplitude_envelope)
-        xf = fftfreq(n, 1 / sr)[:n//2]
+        xf = rfftfreq(n, 1 / sr)[:n//2]
+        limit = int(np.searchsorted(xf, ENVELOPE_PEAK_MAX_FREQ, side="right"))
+        if limit == 0:
+            return empty
+        xf = xf[:limit]
+        magnitude = 2.0/n * np.abs(rfft(amplitude_envelope)[:limit])
 
-        magnitude = 2.0/n * np.abs(yf[0:n//2])
+        # 4. Find significant peaks - 이웃 window_size bin 안의 최대값이면서 평균 + 1 표준편차를 넘는 bin
+        window_size = max(1, int(sr / 200)) # Tune as needed
+        min_peak_magnitude = np.mean(magnitude) + np.std(magnitude)
+        is_peak = (maximum_filter1d(magnitude, size=window_size) == magnitude) & (magnitude > min_peak_magnitude)
+        peak_indices = np.flatnonzero(is_peak)
 
-        # 4. Find significant peaks
-        peak_frequencies = []
-        freq_limit = 500 # Bearing fault frequencies are usually low frequency components
-        valid_indices = np.where(xf <= freq_limit)
-        
-        if len(valid_indices[0]) == 0:
-            return []
-
-        window_size = int(sr / 200) # Tune as needed
-        peaks = maximum_filter1d(magnitude[valid_indices], size=window_size) == magnitude[valid_indices]
-        
-        min_peak_magnitude = np.mean(magnitude[valid_indices]) + np.std(magnitude[valid_indices])
-        
-        for i, is_peak in enumerate(peaks):
-            if is_peak and magnitude[valid_indices][i] > min_peak_magnitude:
-                peak_frequencies.append(xf[valid_indices][i])
-                
-        return sorted(list(set(peak_frequencies)))
+        # 5. Prominence - 좌/우 half bin 범위의 최소값 중 높은 쪽을 기준선으로 사용
+        # (scipy.signal.peak_prominences(magnitude, peaks, wlen=2 * half + 1)과 같은 값, 피크별 루프 없이 계산)
+        half = window_size // 2
+        left_base = minimum_filter1d(magnitude, size=half + 1, origin=half // 2, mode="nearest")
+        right_base = minimum_filter1d(magnitude, size=half + 1, origin=-((half + 1) // 2), mode="nearest")
+        amplitudes = magnitude[peak_indices]
+        return {
+            "frequencies": xf[peak_indices],
+            "amplitudes": amplitudes,
+            "prominences": amplitudes - np.maximum(left_base[peak_indices], right_base[peak_indices]),
+        }
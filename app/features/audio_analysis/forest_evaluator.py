@@ -0,0 +1,167 @@
+import logging
+import numpy as np
+from pathlib import Path
+from typing import Dict, Any, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# 평탄화 포맷 버전 (배열 구성이 바뀌면 증가)
+FLAT_FOREST_VERSION = 1
+
+# 평탄화 결과와 sklearn decision_function의 허용 오차 (export 시 검증)
+FLAT_FOREST_ATOL = 1e-9
+
+TREE_LEAF = -1
+
+
+def _average_path_length(n_samples: np.ndarray) -> np.ndarray:
+    """sklearn.ensemble._iforest._average_path_length와 동일 (n개 샘플 iTree의 평균 경로 길이)"""
+    n_samples = np.asarray(n_samples, dtype=np.float64)
+    result = np.zeros_like(n_samples)
+    result[n_samples == 2] = 1.0
+    mask = n_samples > 2
+    result[mask] = 2.0 * (np.log(n_samples[mask] - 1.0) + np.euler_gamma) - 2.0 * (n_samples[mask] - 1.0) / n_samples[mask]
+    return result
+
+
+def _node_depths(children_left: np.ndarray, children_right: np.ndarray) -> np.ndarray:
+    """루트 = 0 기준 노드 깊이 (sklearn 노드 번호는 부모 < 자식)"""
+    depths = np.zeros(children_left.shape[0], dtype=np.int64)
+    for node in range(children_left.shape[0]):
+        if children_left[node] != TREE_LEAF:
+            depths[children_left[node]] = depths[node] + 1
+            depths[children_right[node]] = depths[node] + 1
+    return depths
+
+
+def flatten_isolation_forest(model: Any, scaler: Any = None) -> Dict[str, np.ndarray]:
+    """
+    학습된 sklearn IsolationForest (+ StandardScaler)를 연속 배열로 평탄화합니다.
+    모든 트리의 노드를 하나의 배열에 이어 붙이고, 자식 인덱스는 전역 인덱스로, feature는 원본 특징 인덱스로 변환합니다.
+    leaf_value는 (leaf 깊이 + leaf 샘플 수의 평균 경로 길이)로, 추론 시 트리별 경로 길이를 그대로 더하면 됩니다.
+    """
+    features, thresholds, lefts, rights, leaf_values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator, estimator_features in zip(model.estimators_, model.estimators_features_):
+        tree = estimator.tree_
+        children_left = tree.children_left.astype(np.int64)
+        children_right = tree.children_right.astype(np.int64)
+        is_leaf = children_left == TREE_LEAF
+        depths = _node_depths(children_left, children_right)
+
+        features.append(np.where(is_leaf, 0, np.asarray(estimator_features)[np.maximum(tree.feature, 0)]))
+        thresholds.append(tree.threshold.astype(np.float64))
+        lefts.append(np.where(is_leaf, TREE_LEAF, children_left + offset))
+        rights.append(np.where(is_leaf, TREE_LEAF, children_right + offset))
+        leaf_values.append(np.where(is_leaf, depths + _average_path_length(tree.n_node_samples), 0.0))
+        roots.append(offset)
+        offset += tree.node_count
+        max_depth = max(max_depth, int(depths.max()))
+
+    n_features = int(model.n_features_in_)
+    mean = getattr(scaler, "mean_", None) if scaler is not None else None
+    scale = getattr(scaler, "scale_", None) if scaler is not None else None
+    return {
+        "version": np.array(FLAT_FOREST_VERSION),
+        "feature": np.concatenate(features).astype(np.int32),
+        "threshold": np.concatenate(thresholds),
+        "children_left": np.concatenate(lefts).astype(np.int32),
+        "children_right": np.concatenate(rights).astype(np.int32),
+        "leaf_value": np.concatenate(leaf_values),
+        "roots": np.asarray(roots, dtype=np.int32),
+        "max_depth": np.array(max_depth),
+        "max_samples": np.array(int(getattr(model, "_max_samples", model.max_samples_))),
+        "offset": np.array(float(model.offset_)),
+        "n_features": np.array(n_features),
+        "scaler_mean": np.zeros(n_features) if mean is None else np.asarray(mean, dtype=np.float64),
+        "scaler_scale": np.ones(n_features) if scale is None else np.asarray(scale, dtype=np.float64),
+    }
+
+
+class FlatStandardScaler:
+    """평탄화된 StandardScaler (transform만 지원)"""
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+class FlatIsolationForest:
+    """
+    평탄화된 IsolationForest의 numpy 배치 평가기.
+    sklearn과 같은 decision_function / score_samples 인터페이스를 제공하므로 AnomalyScorer가 그대로 사용합니다.
+    배치의 모든 (샘플, 트리) 쌍을 max_depth번의 벡터 연산으로 동시에 leaf까지 내려보냅니다.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        version = int(arrays["version"])
+        if version != FLAT_FOREST_VERSION:
+            raise ValueError(f"Unsupported flat forest version {version} (expected {FLAT_FOREST_VERSION})")
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.children_left = arrays["children_left"]
+        self.children_right = arrays["children_right"]
+        self.leaf_value = arrays["leaf_value"]
+        self.roots = arrays["roots"]
+        self.max_depth = int(arrays["max_depth"])
+        self.offset_ = float(arrays["offset"])
+        self.n_features_in_ = int(arrays["n_features"])
+        self.scaler = FlatStandardScaler(arrays["scaler_mean"], arrays["scaler_scale"])
+        self._denominator = len(self.roots) * float(_average_path_length(np.array([int(arrays["max_samples"])]))[0])
+
+    @classmethod
+    def from_sklearn(cls, model: Any, scaler: Any = None) -> "FlatIsolationForest":
+        return cls(flatten_isolation_forest(model, scaler))
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "FlatIsolationForest":
+        with np.load(path, allow_pickle=False) as data:
+            return cls({key: data[key] for key in data.files})
+
+    def score_samples(self, X: np.ndarray) -> np.ndarray:
+        # sklearn 트리는 입력을 float32로 변환한 뒤 float64 threshold와 비교
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has shape {X.shape}, but FlatIsolationForest expects {self.n_features_in_} features")
+
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], len(self.roots))).copy() # (n_samples, n_trees)
+        for _ in range(self.max_depth):
+            left = self.children_left[nodes]
+            internal = left != TREE_LEAF
+            if not internal.any():
+                break
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(internal, np.where(go_left, left, self.children_right[nodes]), nodes)
+
+        depths = self.leaf_value[nodes].sum(axis=1)
+        if self._denominator == 0:
+            return -np.ones(X.shape[0])
+        return -(2.0 ** (-depths / self._denominator))
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        return self.score_samples(X) - self.offset_
+
+
+def save_flat_forest(path: Union[str, Path], model: Any, scaler: Any = None,
+                     validation_data: Optional[np.ndarray] = None) -> bool:
+    """
+    IsolationForest를 평탄화해 .npz로 저장합니다.
+    validation_data가 주어지면 sklearn decision_function과 FLAT_FOREST_ATOL 이내로 일치하는지 확인하고,
+    일치하지 않으면 저장하지 않고 False를 반환합니다.
+    """
+    arrays = flatten_isolation_forest(model, scaler)
+    if validation_data is not None and len(validation_data) > 0:
+        expected = model.decision_function(validation_data)
+        actual = FlatIsolationForest(arrays).decision_function(validation_data)
+        max_error = float(np.max(np.abs(expected - actual)))
+        if max_error > FLAT_FOREST_ATOL:
+            logger.error(f"Flat forest does not match sklearn (max error {max_error:.3g}). Not saving {path}.")
+            return False
+    np.savez(path, **arrays)
+    logger.info(f"Flat Isolation Forest saved to {path}")
+    return True
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON, func
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, JSON, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -13,6 +13,13 @@ class AudioFile(Base):
     mime_type = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     device_id = Column(String, nullable=True) # Mobile app sends this
+    # [NEW] 분석용 표준 PCM(data 청크)의 SHA-256 - 재전송/중복 업로드 판별용
+    content_hash = Column(String(64), nullable=True)
+
+    # 같은 장비의 같은 녹음은 R2 객체 하나만 유지 (unique 인덱스가 중복 조회 인덱스 역할도 함)
+    __table_args__ = (
+        UniqueConstraint("device_id", "content_hash", name="uq_audio_files_device_content_hash"),
+    )
 
     # 관계 설정
     user = relationship("app.models.User", backref="audio_files")
@@ -29,11 +36,13 @@ class AIAnalysisResult(Base):
     result_data = Column(JSON, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
+    claimed_at = Column(DateTime(timezone=True), nullable=True) # [NEW] PROCESSING으로 선점한 시각 - ANALYSIS_CLAIM_TIMEOUT_SEC보다 오래되면 다른 태스크가 인수
     device_id = Column(String, nullable=True) # For direct lookup/filtering
+    model_preference = Column(String(20), nullable=True) # [NEW] level1 / level2 / ensemble / cascade - 중복 업로드 시 결과 재사용 조건
 
     # 관계 설정
     audio_file = relationship("AudioFile", back_populates="analysis_results")
-    user = relationship("app.models.User", backref="analysis_results")
+    user = relationship("app.models.User", backref="analysis_results", foreign_keys=[user_id])
 
     # [NEW] Active Learning Feedback Loop 관련 컬럼
     feedback_status = Column(String(50), nullable=True) # TRUE_POSITIVE, FALSE_POSITIVE, IGNORE
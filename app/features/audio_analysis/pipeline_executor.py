@@ -1,13 +1,17 @@
+import time
 import logging
+import numpy as np
 from pathlib import Path
-from typing import Dict, Any, Optional # [수정] Optional 임포트
+from typing import Dict, Any, Optional, List, Union, Iterable, Tuple # [수정] Optional 임포트
 
 # Import the new config
 from app.core.config_analysis import (
-    SAMPLE_RATE
+    SAMPLE_RATE, ANALYSIS_DURATION_SEC, WINDOWED_ANALYSIS, ANALYSIS_WINDOW_SEC, ANALYSIS_WINDOW_BATCH
 )
 from app.features.audio_analysis.dsp_filter import DSPFilter
+from app.features.audio_analysis.audio_source import AudioBuffer
 from app.features.audio_analysis.anomaly_scorer import AnomalyScorer
+from app.features.audio_analysis.spectral_frontend import SpectralFrontend
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +38,7 @@ class PipelineExecutor:
 
         Args:
             file_path (Path): 분석할 오디오 파일의 경로.
-            model_preference (str): 사용할 모델 레벨 ('level1' 또는 'level2').
+            model_preference (str): 사용할 모델 레벨 ('level1', 'level2', 'ensemble' 또는 'cascade').
             calibration_data (Dict[str, Any]): 장비별 캘리브레이션 데이터 (Optional).
             target_model_id (Optional[str]): 특정 모델 ID를 지정하여 사용 (registry.json).
 
@@ -46,13 +50,231 @@ class PipelineExecutor:
         if not file_path.exists():
             raise FileNotFoundError(f"Audio file not found: {file_path}")
 
+        # [NEW] 한 윈도우보다 긴 녹음은 슬라이딩 윈도우로 전체 분석
+        duration = self._windowed_duration(file_path)
+        if duration is not None:
+            return await self.analyze_windows(file_path, model_preference, calibration_data, target_model_id, duration=duration)
+
         # 1. DSP Filtering & Preprocessing (resampling, bandpass etc.)
-        y, sr = await self.dsp_filter.process_audio(file_path)
+        if self._needs_full_decode(file_path):
+            y, sr = self.dsp_filter.decode_full(file_path)
+            if len(y) > ANALYSIS_WINDOW_SEC * sr:
+                return await self.analyze_windows(y, model_preference, calibration_data, target_model_id, name=file_path.name, duration=len(y) / sr)
+            y = y[:int(ANALYSIS_DURATION_SEC * sr)]
+        else:
+            y, sr = await self.dsp_filter.process_audio(file_path)
+
+        # 2. 공유 스펙트럼 프론트엔드 (STFT 1회 계산 후 모든 특징이 재사용)
+        spectral = SpectralFrontend(y, sr)
 
-        # 2. Anomaly Scoring based on model preference
+        # 3. Anomaly Scoring based on model preference
         if model_preference == "level2":
-            result = await self.anomaly_scorer.score_level2(y, sr, target_model_id=target_model_id) # [수정] target_model_id 전달
+            result = await self.anomaly_scorer.score_level2(y, sr, target_model_id=target_model_id, spectral=spectral) # [수정] target_model_id 전달
+        elif model_preference == "ensemble": # [NEW] Rule-based + IF + AE 병렬 실행 후 투표 융합
+            result = await self.anomaly_scorer.score_ensemble(y, sr, calibration_data=calibration_data, target_model_id=target_model_id, spectral=spectral)
+        elif model_preference == "cascade": # [NEW] Level 1 선별 후 불확실/Rule 발동 클립만 Level 2
+            result = await self.anomaly_scorer.score_cascade(y, sr, calibration_data=calibration_data, target_model_id=target_model_id, spectral=spectral)
         else: # Default to level1
-            result = await self.anomaly_scorer.score_level1(y, sr, calibration_data=calibration_data, target_model_id=target_model_id) # [수정] target_model_id 전달
+            result = await self.anomaly_scorer.score_level1(y, sr, calibration_data=calibration_data, target_model_id=target_model_id, spectral=spectral) # [수정] target_model_id 전달
         
         return result
+
+    async def prepare_clip(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        배치 추론 전의 클립별 CPU 작업: 디코딩 → 공유 스펙트럼 프론트엔드 → 모델별 특징 추출.
+        워커는 다음 클립을 다운로드(prefetch)하는 동안 이 단계를 수행합니다.
+
+        Args:
+            request: {file_path 또는 audio_bytes(+name), model_preference, calibration_data, target_model_id}
+                     audio_bytes(bytes 또는 RangedObjectReader)가 있으면 디스크를 거치지 않고 메모리에서 디코딩합니다.
+        """
+        if request.get("audio_bytes") is not None:
+            source = request["audio_bytes"]
+        else:
+            source = request["file_path"]
+            if not source.exists():
+                raise FileNotFoundError(f"Audio file not found: {source}")
+
+        # [NEW] 한 윈도우보다 긴 녹음: 윈도우 단위로 끝까지 분석한 결과를 담아 반환 (score_prepared는 그대로 전달)
+        duration = self._windowed_duration(source)
+        if duration is not None:
+            model_preference = self._normalize_preference(request.get("model_preference"))
+            return {
+                "model_preference": model_preference,
+                "target_model_id": request.get("target_model_id"),
+                "result": await self.analyze_windows(
+                    source, model_preference, request.get("calibration_data"), request.get("target_model_id"),
+                    name=request.get("name", "<buffer>"), duration=duration
+                )
+            }
+
+        # 헤더로 길이를 알 수 없는 포맷 (레거시 M4A): 한 번 전체 디코딩한 뒤 길이에 따라 윈도우 / 단일 클립 분석
+        if self._needs_full_decode(source):
+            y, sr = self.dsp_filter.decode_full(source, request.get("name", "<buffer>"))
+            if len(y) > ANALYSIS_WINDOW_SEC * sr:
+                model_preference = self._normalize_preference(request.get("model_preference"))
+                return {
+                    "model_preference": model_preference,
+                    "target_model_id": request.get("target_model_id"),
+                    "result": await self.analyze_windows(
+                        y, model_preference, request.get("calibration_data"), request.get("target_model_id"),
+                        name=request.get("name", "<buffer>"), duration=len(y) / sr
+                    )
+                }
+            return await self._featurize_clip(y[:int(ANALYSIS_DURATION_SEC * sr)], sr, request)
+
+        # 1~2. 디코딩 + 공유 스펙트럼 프론트엔드
+        if request.get("audio_bytes") is not None:
+            y, sr = await self.dsp_filter.process_audio_buffer(source, request.get("name", "<buffer>"))
+        else:
+            y, sr = await self.dsp_filter.process_audio(source)
+        return await self._featurize_clip(y, sr, request)
+
+    async def _featurize_clip(self, y: np.ndarray, sr: int, request: Dict[str, Any]) -> Dict[str, Any]:
+        """디코딩된 클립(또는 윈도우)에 공유 스펙트럼 프론트엔드를 만들고 model_preference별 특징을 추출합니다."""
+        clip = {
+            "y": y,
+            "sr": sr,
+            "spectral": SpectralFrontend(y, sr),
+            "calibration_data": request.get("calibration_data"),
+            "model_preference": self._normalize_preference(request.get("model_preference")),
+            "target_model_id": request.get("target_model_id")
+        }
+
+        if clip["model_preference"] == "level2":
+            self.anomaly_scorer.featurize_level2(clip)
+        elif clip["model_preference"] == "ensemble":
+            await self.anomaly_scorer.featurize_ensemble(clip)
+        else: # level1 / cascade (Level 2 특징은 승급된 클립만 추론 시점에 추출)
+            self.anomaly_scorer.featurize_level1(clip)
+        return clip
+
+    @staticmethod
+    def _normalize_preference(model_preference: Optional[str]) -> str:
+        return model_preference if model_preference in ("level2", "ensemble", "cascade") else "level1"
+
+    def _windowed_duration(self, source: Union[Path, AudioBuffer]) -> Optional[float]:
+        """윈도우 분석 대상이면 녹음 길이(초), 아니면 None (WINDOWED_ANALYSIS 비활성 / 한 윈도우 이하 / 길이를 알 수 없는 포맷)"""
+        if not WINDOWED_ANALYSIS:
+            return None
+        duration = self.dsp_filter.audio_duration(source)
+        return duration if duration is not None and duration > ANALYSIS_WINDOW_SEC else None
+
+    def _needs_full_decode(self, source: Union[Path, AudioBuffer]) -> bool:
+        """윈도우 분석이 켜져 있고 헤더로 길이를 알 수 없는 포맷(M4A 등)이라 전체를 디코딩해야 녹음 길이를 알 수 있는지"""
+        return WINDOWED_ANALYSIS and self.dsp_filter.audio_duration(source) is None
+
+    async def analyze_windows(
+        self,
+        source: Union[Path, AudioBuffer, np.ndarray],
+        model_preference: str = "level1",
+        calibration_data: Dict[str, Any] = None,
+        target_model_id: Optional[str] = None,
+        name: str = "<buffer>",
+        duration: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        긴 녹음을 겹치는 윈도우로 나눠 분석합니다 (DSPFilter.iter_windows, 이미 디코딩된 배열이면 iter_array_windows).
+        ANALYSIS_WINDOW_BATCH개씩 디코딩 → 특징 추출 → 배치 추론하고 윈도우별 판정만 남기므로,
+        메모리 사용량은 녹음 길이와 무관하게 윈도우 배치 하나 분량입니다.
+        결과는 가장 심각한 윈도우의 판정 + details["windows"] 타임라인입니다 (AnomalyScorer.aggregate_windows).
+        """
+        started = time.perf_counter()
+        if isinstance(source, np.ndarray):
+            window_iter = self.dsp_filter.iter_array_windows(source)
+        else:
+            window_iter = self.dsp_filter.iter_windows(source, name)
+        windows = await self.score_windows(window_iter, model_preference, calibration_data, target_model_id)
+        if not windows:
+            raise ValueError(f"No audio windows decoded from {source if isinstance(source, Path) else name}")
+        logger.info(f"🪟 Windowed analysis: {len(windows)} window(s) over {duration or windows[-1]['end_sec']:.1f}s in {time.perf_counter() - started:.2f}s")
+        return self.anomaly_scorer.aggregate_windows(windows, duration)
+
+    async def score_windows(
+        self,
+        windows: Iterable[Tuple[float, np.ndarray]],
+        model_preference: str = "level1",
+        calibration_data: Dict[str, Any] = None,
+        target_model_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        (시작 시각, 윈도우) 시퀀스를 ANALYSIS_WINDOW_BATCH개씩 특징 추출 → 배치 추론합니다 (합치지 않은 윈도우별 결과).
+        Returns: 시간 순 [{start_sec, end_sec, result}, ...]
+        """
+        model_preference = self._normalize_preference(model_preference)
+        request = {"model_preference": model_preference, "calibration_data": calibration_data, "target_model_id": target_model_id}
+
+        scored: List[Dict[str, Any]] = []
+        chunk: List[Dict[str, Any]] = []
+        for start_sec, y in windows:
+            clip = await self._featurize_clip(y, SAMPLE_RATE, request)
+            clip["start_sec"] = start_sec
+            chunk.append(clip)
+            if len(chunk) >= ANALYSIS_WINDOW_BATCH:
+                scored.extend(await self._score_windows(chunk))
+                chunk = []
+        if chunk:
+            scored.extend(await self._score_windows(chunk))
+        return scored
+
+    async def _score_windows(self, clips: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        results = await self._score_group(clips[0]["model_preference"], clips, clips[0]["target_model_id"])
+        return [
+            {"start_sec": clip["start_sec"], "end_sec": clip["start_sec"] + len(clip["y"]) / clip["sr"], "result": result}
+            for clip, result in zip(clips, results)
+        ]
+
+    async def _score_group(self, model_preference: str, batch: List[Dict[str, Any]], target_model_id: Optional[str]) -> List[Dict[str, Any]]:
+        if model_preference == "level2":
+            return await self.anomaly_scorer.score_level2_batch(batch, target_model_id=target_model_id)
+        if model_preference == "ensemble":
+            return await self.anomaly_scorer.score_ensemble_batch(batch, target_model_id=target_model_id)
+        if model_preference == "cascade":
+            return await self.anomaly_scorer.score_cascade_batch(batch, target_model_id=target_model_id)
+        return await self.anomaly_scorer.score_level1_batch(batch, target_model_id=target_model_id)
+
+    async def score_prepared(self, prepared: List[Union[Dict[str, Any], Exception]]) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        prepare_clip 결과를 (model_preference, target_model_id)별로 묶어 배치 추론합니다.
+        Exception 항목은 그대로 결과에 전달됩니다.
+        """
+        outcomes: List[Union[Dict[str, Any], Exception, None]] = [
+            clip if isinstance(clip, Exception) else None for clip in prepared
+        ]
+        groups: Dict[tuple, List[int]] = {}
+        for index, clip in enumerate(prepared):
+            if isinstance(clip, Exception):
+                continue
+            if "result" in clip: # 윈도우 분석으로 이미 판정된 긴 녹음
+                outcomes[index] = clip["result"]
+            else:
+                groups.setdefault((clip["model_preference"], clip["target_model_id"]), []).append(index)
+
+        # 3. 모델별 배치 추론
+        for (model_preference, target_model_id), indices in groups.items():
+            batch = [prepared[index] for index in indices]
+            logger.info(f"Batch inference: {len(batch)} clip(s), model preference: {model_preference}, target_model_id: {target_model_id}")
+            results = await self._score_group(model_preference, batch, target_model_id)
+            for index, result in zip(indices, results):
+                outcomes[index] = result
+
+        return outcomes
+
+    async def warm_up(self) -> float:
+        """
+        합성 클립(노이즈 + 저주파 톤)으로 Level 1 / Level 2 경로를 한 번씩 실행합니다.
+        STFT / Mel 필터뱅크 / numba 컴파일 / 모델 첫 호출 비용을 첫 실제 분석 대신 워커 시작 시점에 지불합니다.
+        소요 시간(초)을 반환합니다.
+        """
+        started = time.perf_counter()
+        rng = np.random.default_rng(0)
+        t = np.arange(int(SAMPLE_RATE * ANALYSIS_DURATION_SEC)) / SAMPLE_RATE
+        y = (0.05 * rng.standard_normal(t.size) + 0.1 * np.sin(2 * np.pi * 120 * t)).astype(np.float32)
+
+        spectral = SpectralFrontend(y, SAMPLE_RATE)
+        await self.anomaly_scorer.score_level1(y, SAMPLE_RATE, spectral=spectral)
+        await self.anomaly_scorer.score_level2(y, SAMPLE_RATE, spectral=spectral)
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"🔥 Pipeline warm-up completed in {elapsed:.2f}s")
+        return elapsed
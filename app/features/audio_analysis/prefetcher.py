@@ -0,0 +1,81 @@
+import os
+import logging
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Iterator, List, Tuple, Union
+
+from app.core.config_analysis import AUDIO_PREFETCH_DEPTH, AUDIO_RANGE_BLOCK_BYTES
+from app.storage import S3Storage
+from app.features.audio_analysis.audio_source import AudioBuffer, RangedObjectReader
+
+logger = logging.getLogger(__name__)
+
+def fetch_audio(storage: S3Storage, r2_object_key: str) -> AudioBuffer:
+    """
+    R2 객체를 메모리로 바로 읽어옵니다 (임시 파일 없음).
+    첫 AUDIO_RANGE_BLOCK_BYTES만 요청해 객체 전체가 들어오면 bytes를, 더 큰 객체(긴 녹음)는 통째로 받지 않고
+    나머지를 분석 중에 블록 단위 byte-range로 읽는 RangedObjectReader를 반환합니다.
+    """
+    fetched = storage.get_object_prefix(r2_object_key, AUDIO_RANGE_BLOCK_BYTES)
+    if fetched is not None:
+        head, size = fetched
+        if len(head) >= size:
+            return head
+        logger.info(f"📏 {r2_object_key} is {size} bytes, reading it in {AUDIO_RANGE_BLOCK_BYTES}-byte ranges")
+        return RangedObjectReader(storage, r2_object_key, size, head=head)
+    if os.path.exists(r2_object_key):
+        # 혹시 로컬 경로로 남아있는 경우 (마이그레이션 과도기)
+        logger.warning(f"⚠️ R2 fetch failed, but found local file: {r2_object_key}")
+        with open(r2_object_key, "rb") as f:
+            return f.read()
+    raise FileNotFoundError(f"File not found in R2 or disk: {r2_object_key}")
+
+class AudioPrefetcher:
+    """
+    분석할 오디오를 순서대로 최대 depth건 앞서 백그라운드 스레드에서 메모리로 내려받습니다.
+    소비 측이 한 건을 가져갈 때마다 다음 다운로드를 시작하므로 (다운로드 중 + 소비 대기) 건수는 항상 depth 이하입니다.
+    → 현재 클립의 디코딩/DSP 동안 다음 클립의 R2 네트워크 지연이 가려지고, 메모리 사용량은 클립 depth개 분량(긴 녹음은 range 블록 분량)으로 제한됩니다.
+
+    사용법:
+        with AudioPrefetcher(storage, keys) as prefetcher:
+            for key, fetched in prefetcher:  # fetched: 오디오 bytes / RangedObjectReader 또는 다운로드 Exception
+                ...
+    """
+
+    def __init__(self, storage: S3Storage, keys: List[str], depth: int = AUDIO_PREFETCH_DEPTH):
+        self.storage = storage
+        self.keys = list(keys)
+        self.depth = max(1, depth)
+        self._executor = ThreadPoolExecutor(max_workers=self.depth, thread_name_prefix="audio-prefetch")
+        self._inflight: Deque[Tuple[str, Future]] = deque()
+        self._next = 0
+
+    def _fill(self):
+        while len(self._inflight) < self.depth and self._next < len(self.keys):
+            key = self.keys[self._next]
+            self._inflight.append((key, self._executor.submit(fetch_audio, self.storage, key)))
+            self._next += 1
+
+    def __iter__(self) -> Iterator[Tuple[str, Union[AudioBuffer, Exception]]]:
+        self._fill()
+        while self._inflight:
+            key, future = self._inflight.popleft()
+            self._fill() # 소비 직전에 다음 다운로드 시작
+            try:
+                yield key, future.result()
+            except Exception as e:
+                logger.error(f"❌ Prefetch failed for {key}: {e}")
+                yield key, e
+
+    def close(self):
+        """시작되지 않은 다운로드를 취소하고 스레드를 정리합니다."""
+        while self._inflight:
+            _, future = self._inflight.popleft()
+            future.cancel()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "AudioPrefetcher":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
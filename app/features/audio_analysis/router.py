@@ -1,22 +1,31 @@
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Form
+from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Form, Request
 from sqlalchemy.ext.asyncio import AsyncSession # Session 대신 AsyncSession 임포트
 from app.features.audio_analysis.models import AIAnalysisResult, AudioFile
 from app.models import User # User 모델 필요
 from app.features.audio_analysis import service # 새 서비스 모듈 임포트
-from app.features.audio_analysis.converter import AudioConverter # [추가] 오디오 변환기 임포트
+from app.features.audio_analysis.converter import AsyncAudioConverter, ffmpeg_pool # [수정] 비동기 변환기 (이벤트 루프 비블로킹)
+from app.features.audio_analysis.stream_ingest import ingest_stream, UploadTooLargeError, WAV_PEEK_BYTES # [NEW] 스트리밍 업로드
+from app.features.audio_analysis.wav_header import parse_wav_header, pcm_content_hash
+from app.core.config_analysis import STREAM_MAX_UPLOAD_BYTES, PRESIGNED_UPLOAD_EXPIRES_SEC, MAX_BATCH_UPLOAD_FILES
 from app.security import get_current_user # [추가] get_current_user 임포트
 from app.database import get_db # [추가] get_db 임포트
 from app.storage import S3Storage # [추가] Cloudflare R2 스토리지
+from app.tasks import analyze_audio_task, analyze_audio_signature # [수정] 태스크 이름 기반 시그니처 (API에서 ML 스택 임포트 안 함)
+from celery import group
 from uuid import uuid4
+import io
 import os
+import asyncio
 import shutil
 import tempfile # [추가] 임시 파일 처리
 from datetime import datetime
-from sqlalchemy import select # select 임포트 추가
+from sqlalchemy import select, update # select 임포트 추가
+from sqlalchemy.exc import IntegrityError
 import logging
-from pydantic import BaseModel # [NEW]
-from typing import Literal # [NEW]
+from pydantic import BaseModel, BeforeValidator # [NEW]
+from typing import Literal, Annotated # [NEW]
 from typing import Optional # Optional import 추가
+from typing import List, Dict, Any, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -25,12 +34,34 @@ router = APIRouter()
 # Cloudflare R2 Storage 초기화
 s3_storage = S3Storage()
 
+def _model_level_alias(value: Any) -> Any:
+    """registry 모델 타입("level1_isolation_forest" 등)을 보내는 기존 앱 호환: 앞의 분석 레벨로 변환"""
+    if isinstance(value, str):
+        for level in ("level1", "level2"):
+            if value.startswith(f"{level}_"):
+                return level
+    return value
+
+# 분석 모드 (AIAnalysisResult.model_preference String(20)에 저장되고 중복 업로드 판별 키로 쓰이므로 API 경계에서 제한, 그 외 값은 422)
+ModelPreference = Annotated[Literal["level1", "level2", "ensemble", "cascade"], BeforeValidator(_model_level_alias)]
+
 # --- Pydantic Models for Feedback ---
 class FeedbackRequest(BaseModel):
     feedback_status: Literal["TRUE_POSITIVE", "FALSE_POSITIVE", "IGNORE"]
     feedback_comment: Optional[str] = None
     is_retraining_candidate: Optional[bool] = False
 
+# --- Pydantic Models for Presigned Upload ---
+class PresignedUploadRequest(BaseModel):
+    device_id: str
+    filename: str
+    content_type: str = "audio/wav"
+
+class UploadCompleteRequest(BaseModel):
+    model_preference: ModelPreference = "level1"
+
+SUPPORTED_UPLOAD_FORMATS = ['.wav', '.m4a', '.mp4']
+
 # --- Endpoints ---
 
 @router.post("/upload", summary="모바일 오디오 파일 업로드 및 분석 요청")
@@ -38,7 +69,7 @@ async def upload_audio_for_analysis(
     file: UploadFile = File(...),
     device_id: str = Form(...),
     audio_format: str = Form(None), # [추가] 오디오 포맷 정보
-    model_preference: str = Form("level1"), # [NEW] model_preference 추가, 기본값 'level1'
+    model_preference: ModelPreference = Form("level1"), # [NEW] model_preference 추가, 기본값 'level1'
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -46,37 +77,350 @@ async def upload_audio_for_analysis(
     모바일 앱에서 녹음된 오디오 파일을 업로드하고 AI 분석을 요청합니다.
     - 파일을 임시 디렉토리에 저장
     - WAV로 변환 (표준화)
+    - 같은 장비의 같은 녹음(PCM 해시)이 이미 있으면 기존 R2 객체 / 분석 결과 재사용 (재전송 대응)
     - Cloudflare R2에 업로드
     - DB에 R2 키 저장
     - Celery 워커에 분석 요청
     """
-    # 순환 참조 해결을 위해 함수 내부에서 analyze_audio_task 임포트
-    from app.worker import analyze_audio_task
 
-    if not file.content_type.startswith('audio/'):
+    file_extension = _validate_upload_file(file)
+
+    try:
+        # 1~3. 임시 저장 → WAV 변환 → PCM 해시
+        converted = await _convert_upload(file, file_extension)
+        try:
+            # 중복 업로드 확인 (완료/진행 중인 분석이 있으면 작업을 새로 만들지 않음)
+            duplicates = await service.find_duplicate_uploads(
+                db, current_user.id, [(device_id, converted["content_hash"])], model_preference
+            )
+            existing_file, existing_result = duplicates.get((device_id, converted["content_hash"]), (None, None))
+            if existing_result:
+                logger.info(f"♻️ Duplicate upload for device {device_id}, reusing analysis {existing_result.id}")
+                return _duplicate_upload_response(existing_result, converted["conversion_applied"])
+
+            # 4. Cloudflare R2 업로드 (같은 녹음의 객체가 이미 있으면 생략)
+            r2_object_name = existing_file.file_path if existing_file else await _store_converted_upload(converted)
+        finally:
+            _cleanup_converted_upload(converted)
+
+        audio_info = converted["audio_info"]
+
+        # 5~6. AudioFile / AIAnalysisResult DB 레코드 생성 (R2 경로 저장)
+        analysis_result, is_duplicate = await _register_upload(
+            db,
+            user_id=current_user.id,
+            device_id=device_id,
+            filename=file.filename,
+            r2_object_name=r2_object_name, # 로컬 경로 대신 R2 키 저장
+            file_size=int(audio_info.get('size_mb', 0) * 1024 * 1024),
+            content_hash=converted["content_hash"],
+            model_preference=model_preference,
+            audio_file=existing_file
+        )
+        if is_duplicate:
+            return _duplicate_upload_response(analysis_result, converted["conversion_applied"])
+        await db.refresh(analysis_result)
+
+        # 7. Celery 워커에 분석 작업 요청
+        try:
+            analyze_audio_task.delay(analysis_result.id, model_preference) # [수정] model_preference 전달
+            logger.info(f"🚀 Analysis task queued: {analysis_result.id} with model preference: {model_preference}")
+        except Exception as e:
+            logger.error(f"❌ Task submission failed: {e}")
+            await _fail_unqueued_analyses(db, [analysis_result.id])
+            raise HTTPException(status_code=500, detail="Failed to queue analysis task")
+
+        return {
+            "success": True,
+            "task_id": analysis_result.id,
+            "file_type": "wav",
+            "conversion_applied": converted["conversion_applied"],
+            "duplicate": False
+        }
+
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"❌ Upload Error: {e}")
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Failed to upload or schedule analysis: {str(e)}"
+        )
+
+@router.post("/upload/batch", summary="게이트웨이 일괄 오디오 업로드 및 분석 요청")
+async def upload_audio_batch_for_analysis(
+    files: List[UploadFile] = File(...),
+    device_ids: List[str] = Form(...),
+    model_preference: ModelPreference = Form("level1"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    여러 장비의 녹음 파일을 한 번의 요청으로 업로드합니다 (files[i] ↔ device_ids[i]).
+    - 파일별 변환 / R2 업로드는 동시에 수행 (ffmpeg 동시 실행 수는 ffmpeg_pool이 제한)
+    - 이미 분석된(또는 배치 안에서 반복된) 녹음은 기존 R2 객체 / 분석 결과를 재사용 (duplicate=True)
+    - 모든 AudioFile / AIAnalysisResult 레코드를 한 트랜잭션으로 생성 (flush 1회, commit 1회)
+    - 분석 작업은 Celery group으로 한 번에 등록
+    - 변환/업로드에 실패한 파일은 errors에 담아 반환하고 나머지는 정상 처리
+    """
+    if len(files) != len(device_ids):
+        raise HTTPException(status_code=400, detail="files and device_ids must have the same length")
+    if len(files) > MAX_BATCH_UPLOAD_FILES:
+        raise HTTPException(status_code=400, detail=f"Too many files in batch (max {MAX_BATCH_UPLOAD_FILES})")
+
+    errors = []
+
+    def add_error(index: int, error: Exception):
+        detail = error.detail if isinstance(error, HTTPException) else str(error)
+        errors.append({"index": index, "filename": files[index].filename, "device_id": device_ids[index], "error": detail})
+
+    async def convert(index: int) -> Dict[str, Any]:
+        file = files[index]
+        file_extension = _validate_upload_file(file)
+        return await _convert_upload(file, file_extension)
+
+    outcomes = await asyncio.gather(*[convert(i) for i in range(len(files))], return_exceptions=True)
+    converted = {}
+    for index, outcome in enumerate(outcomes):
+        if isinstance(outcome, Exception):
+            add_error(index, outcome)
+        else:
+            converted[index] = outcome
+
+    results: Dict[int, Dict[str, Any]] = {}
+    items = []
+    try:
+        # 중복 확인 (쿼리 2회로 배치 전체 조회)
+        keys = {index: (device_ids[index], outcome["content_hash"]) for index, outcome in converted.items()}
+        duplicates = await service.find_duplicate_uploads(db, current_user.id, list(keys.values()), model_preference)
+
+        primaries: Dict[Any, int] = {} # 배치 안 같은 녹음 → 첫 번째 항목의 분석 결과 공유
+        aliases: Dict[int, int] = {}
+        for index, key in keys.items():
+            existing_file, existing_result = duplicates.get(key, (None, None))
+            if existing_result:
+                results[index] = _batch_result(index, device_ids[index], existing_result.id, converted[index], duplicate=True)
+            elif key in primaries:
+                aliases[index] = primaries[key]
+            else:
+                primaries[key] = index
+                items.append({
+                    "index": index,
+                    "device_id": device_ids[index],
+                    "file_path": existing_file.file_path if existing_file else None,
+                    "filename": files[index].filename,
+                    "file_size": int(converted[index]["audio_info"].get('size_mb', 0) * 1024 * 1024),
+                    "content_hash": key[1],
+                    "audio_file": existing_file
+                })
+
+        # R2 업로드 (기존 객체가 없는 녹음만, 동시 수행)
+        to_store = [item for item in items if item["audio_file"] is None]
+        stored = await asyncio.gather(
+            *[_store_converted_upload(converted[item["index"]]) for item in to_store], return_exceptions=True
+        )
+        for item, outcome in zip(to_store, stored):
+            if isinstance(outcome, Exception):
+                add_error(item["index"], outcome)
+                item["failed"] = True
+            else:
+                item["file_path"] = outcome
+    finally:
+        for outcome in converted.values():
+            _cleanup_converted_upload(outcome)
+
+    failed = {item["index"] for item in items if item.get("failed")}
+    items = [item for item in items if not item.get("failed")]
+    for index, primary in list(aliases.items()):
+        if primary in failed:
+            add_error(index, RuntimeError("Failed to upload file to cloud storage"))
+            del aliases[index]
+
+    if not items and not results:
+        raise HTTPException(status_code=400, detail={"message": "No file in the batch could be processed", "errors": errors})
+
+    task_ids = []
+    if items:
+        try:
+            pairs = await service.create_pending_analyses(db, current_user.id, items, model_preference=model_preference)
+            await db.commit()
+        except IntegrityError:
+            # 같은 녹음이 다른 요청으로 동시에 등록됨 → 이번 배치에서 올린 객체 정리 후 재시도 유도
+            await db.rollback()
+            await _delete_batch_objects(items)
+            raise HTTPException(status_code=409, detail="Duplicate upload registered concurrently, please retry")
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"❌ Batch DB insert failed: {e}")
+            await _delete_batch_objects(items)
+            raise HTTPException(status_code=500, detail=f"Failed to register batch: {str(e)}")
+
+        task_ids = [analysis_result.id for _, analysis_result in pairs]
+        for item, task_id in zip(items, task_ids):
+            results[item["index"]] = _batch_result(item["index"], item["device_id"], task_id, converted[item["index"]])
+
+        try:
+            group(analyze_audio_signature(task_id, model_preference) for task_id in task_ids).apply_async()
+            logger.info(f"🚀 Batch of {len(task_ids)} analysis tasks queued with model preference: {model_preference}")
+        except Exception as e:
+            logger.error(f"❌ Batch task submission failed: {e}")
+            await _fail_unqueued_analyses(db, task_ids)
+            raise HTTPException(status_code=500, detail="Failed to queue analysis tasks")
+
+    for index, primary in aliases.items():
+        results[index] = _batch_result(index, device_ids[index], results[primary]["task_id"], converted[index], duplicate=True)
+
+    ordered = [results[index] for index in sorted(results)]
+    if len(ordered) > len(task_ids):
+        logger.info(f"♻️ Batch reused {len(ordered) - len(task_ids)} existing analyses")
+
+    return {
+        "success": len(errors) == 0,
+        "task_ids": [result["task_id"] for result in ordered],
+        "results": ordered,
+        "errors": sorted(errors, key=lambda error: error["index"])
+    }
+
+async def _delete_batch_objects(items: List[Dict[str, Any]]):
+    """배치 등록 실패 시 이번 배치에서 새로 올린 R2 객체 삭제 (기존 녹음을 재사용한 항목은 제외)"""
+    await asyncio.gather(*[
+        asyncio.to_thread(s3_storage.delete_file, item["file_path"])
+        for item in items if item["audio_file"] is None
+    ])
+
+async def _fail_unqueued_analyses(db: AsyncSession, task_ids: List[str]):
+    """
+    큐 등록에 실패한 분석을 FAILED 처리합니다.
+    작업 없이 PENDING으로 남으면 재전송이 이 행을 중복으로 재사용하므로 (녹음 파일은 재전송 시 재사용)
+    이미 커밋된 PENDING 행에만 적용합니다.
+    """
+    try:
+        await db.execute(
+            update(AIAnalysisResult)
+            .where(AIAnalysisResult.id.in_(task_ids), AIAnalysisResult.status == "PENDING")
+            .values(status="FAILED", result_data={"error": "Failed to queue analysis task"})
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+    except Exception as mark_error:
+        await db.rollback()
+        logger.error(f"❌ Failed to mark analyses as FAILED: {mark_error}")
+
+def _batch_result(index: int, device_id: str, task_id: str, converted: Dict[str, Any], duplicate: bool = False) -> Dict[str, Any]:
+    return {
+        "index": index,
+        "device_id": device_id,
+        "task_id": task_id,
+        "conversion_applied": converted["conversion_applied"],
+        "duplicate": duplicate
+    }
+
+def _duplicate_upload_response(analysis_result: AIAnalysisResult, conversion_applied: bool) -> Dict[str, Any]:
+    """중복 업로드 응답: 새 작업 대신 기존 분석 작업 ID와 상태를 반환"""
+    return {
+        "success": True,
+        "task_id": analysis_result.id,
+        "file_type": "wav",
+        "conversion_applied": conversion_applied,
+        "duplicate": True,
+        "status": analysis_result.status
+    }
+
+async def _register_upload(
+    db: AsyncSession,
+    user_id: int,
+    device_id: str,
+    filename: str,
+    r2_object_name: str,
+    file_size: Optional[int],
+    content_hash: Optional[str],
+    model_preference: str,
+    audio_file: Optional[AudioFile]
+) -> Tuple[AIAnalysisResult, bool]:
+    """
+    분석 레코드를 생성하고 커밋합니다.
+    같은 녹음이 동시에 두 번 들어와 (device_id, content_hash) unique 제약에 걸리면,
+    방금 올린 R2 객체를 삭제하고 먼저 커밋된 업로드를 재사용합니다.
+
+    Returns:
+        (analysis_result, is_duplicate) - is_duplicate이면 기존 작업이므로 큐에 넣지 않음
+    """
+    try:
+        _, analysis_result = await service.create_pending_analysis(
+            db,
+            user_id=user_id,
+            device_id=device_id,
+            file_path=r2_object_name,
+            filename=filename,
+            file_size=file_size,
+            content_hash=content_hash,
+            model_preference=model_preference,
+            audio_file=audio_file
+        )
+        await db.commit()
+        return analysis_result, False
+    except IntegrityError:
+        await db.rollback()
+        if audio_file is not None:
+            raise
+
+    logger.info(f"♻️ Concurrent duplicate upload for device {device_id}, dropping {r2_object_name}")
+    await asyncio.to_thread(s3_storage.delete_file, r2_object_name)
+    duplicates = await service.find_duplicate_uploads(db, user_id, [(device_id, content_hash)], model_preference)
+    existing_file, existing_result = duplicates[(device_id, content_hash)]
+    if existing_result:
+        return existing_result, True
+
+    _, analysis_result = await service.create_pending_analysis(
+        db,
+        user_id=user_id,
+        device_id=device_id,
+        file_path=existing_file.file_path,
+        filename=filename,
+        file_size=file_size,
+        model_preference=model_preference,
+        audio_file=existing_file
+    )
+    await db.commit()
+    return analysis_result, False
+
+def _validate_upload_file(file: UploadFile) -> str:
+    """업로드 파일의 타입 / 크기 / 확장자를 확인하고 확장자를 반환합니다."""
+    if not file.content_type or not file.content_type.startswith('audio/'):
         raise HTTPException(status_code=400, detail="Only audio files are allowed")
     
-    # 파일 크기 제한 (5MB)
+    # 파일 크기 제한 (5MB) - 더 긴 녹음은 /upload/stream 또는 /upload/presign 사용
     if file.size and file.size > 5 * 1024 * 1024:
         raise HTTPException(status_code=400, detail="Audio file too large (max 5MB)")
 
-    # 파일 확장자 및 타입 확인
-    file_extension = os.path.splitext(file.filename)[1].lower()
-    
     # 지원 포맷 확인
-    supported_formats = ['.wav', '.m4a', '.mp4']
-    if file_extension not in supported_formats:
+    file_extension = os.path.splitext(file.filename)[1].lower()
+    if file_extension not in SUPPORTED_UPLOAD_FORMATS:
         raise HTTPException(
             status_code=400, 
-            detail=f"Unsupported format. Supported: {', '.join(supported_formats)}"
+            detail=f"Unsupported format. Supported: {', '.join(SUPPORTED_UPLOAD_FORMATS)}"
         )
+    return file_extension
+
+async def _convert_upload(file: UploadFile, file_extension: str) -> Dict[str, Any]:
+    """
+    업로드 파일을 임시 저장 → 분석용 WAV 변환 → PCM 콘텐츠 해시 계산까지 수행합니다.
+    성공 시 임시 파일은 남겨두므로 호출자가 _cleanup_converted_upload로 정리해야 합니다.
 
+    Returns:
+        dict: {local_file_path, wav_path, audio_info, conversion_applied, content_hash}
+
+    Raises:
+        HTTPException: 400 (변환 실패)
+    """
     # 임시 파일 생성
     unique_filename = f"{uuid4()}{file_extension}"
     temp_dir = tempfile.gettempdir()
     local_file_path = os.path.join(temp_dir, unique_filename)
-    converted_wav_path = None
-    
+    converted = {"local_file_path": local_file_path, "wav_path": None}
+
     try:
         # 1. 원본 파일 로컬 임시 저장
         with open(local_file_path, "wb") as buffer:
@@ -84,83 +428,288 @@ async def upload_audio_for_analysis(
         
         logger.info(f"📁 Original file saved temporarily: {local_file_path}")
         
-        # 2. 오디오 포맷 통일 (WAV) - 로컬에서 수행
+        # 2~3. 분석용 표준 WAV 변환 + 메타데이터 조회 (ffmpeg 최대 1회, ffmpeg_pool에서 비동기 수행)
         try:
-            converted_wav_path = AudioConverter.ensure_wav_format(local_file_path)
+            converted_wav_path, audio_info = await AsyncAudioConverter.prepare_for_analysis(local_file_path)
+            converted["wav_path"] = converted_wav_path
             logger.info(f"🎵 WAV conversion completed: {converted_wav_path}")
         except Exception as e:
             logger.error(f"❌ Audio conversion failed: {e}")
             raise HTTPException(status_code=400, detail=f"Audio processing failed: {str(e)}")
         
-        # 3. 변환된 파일 정보 조회
-        audio_info = AudioConverter.get_audio_info(converted_wav_path)
         logger.info(f"📊 Audio info: {audio_info}")
-        
-        # 4. Cloudflare R2 업로드
-        r2_object_name = f"audio_files/{os.path.basename(converted_wav_path)}"
-        upload_success = s3_storage.upload_file(converted_wav_path, r2_object_name)
-        
-        if not upload_success:
-             raise HTTPException(status_code=500, detail="Failed to upload file to cloud storage")
 
-        # 5. AudioFile DB 레코드 생성 (R2 경로 저장)
-        audio_file = AudioFile(
-            user_id=current_user.id,
-            file_path=r2_object_name, # 로컬 경로 대신 R2 키 저장
-            filename=file.filename,
-            file_size=int(audio_info.get('size_mb', 0) * 1024 * 1024),
-            mime_type='audio/wav',
-            device_id=device_id
+        converted.update({
+            "audio_info": audio_info,
+            "conversion_applied": local_file_path != converted_wav_path,
+            "content_hash": await asyncio.to_thread(pcm_content_hash, converted_wav_path)
+        })
+        return converted
+    except BaseException:
+        _cleanup_converted_upload(converted)
+        raise
+
+async def _store_converted_upload(converted: Dict[str, Any]) -> str:
+    """변환된 WAV를 Cloudflare R2에 업로드하고 객체 키를 반환합니다 (boto3는 블로킹이므로 스레드에서 실행)."""
+    r2_object_name = f"audio_files/{os.path.basename(converted['wav_path'])}"
+    upload_success = await asyncio.to_thread(s3_storage.upload_file, converted["wav_path"], r2_object_name)
+    
+    if not upload_success:
+         raise HTTPException(status_code=500, detail="Failed to upload file to cloud storage")
+    return r2_object_name
+
+def _cleanup_converted_upload(converted: Dict[str, Any]):
+    """로컬 임시 파일 정리"""
+    local_file_path = converted["local_file_path"]
+    converted_wav_path = converted["wav_path"]
+    try:
+        if os.path.exists(local_file_path):
+            os.remove(local_file_path)
+        if converted_wav_path and os.path.exists(converted_wav_path) and converted_wav_path != local_file_path:
+            os.remove(converted_wav_path)
+        logger.info("🧹 Cleaned up local temporary files")
+    except Exception as cleanup_error:
+        logger.warning(f"⚠️ Failed to clean up temp files: {cleanup_error}")
+
+@router.post("/upload/stream", summary="모바일 오디오 스트리밍 업로드 및 분석 요청 (임시 파일 없음)")
+async def upload_audio_stream_for_analysis(
+    request: Request,
+    device_id: str,
+    filename: str,
+    model_preference: ModelPreference = "level1",
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    요청 바디(raw 오디오 바이트)를 스트리밍으로 받아 분석용 WAV로 변환하면서
+    Cloudflare R2에 multipart 업로드합니다.
+    - 임시 파일 복사/재읽기 없음, 업로드당 메모리 사용량은 part 크기 수준으로 고정
+    - 5MB 제한 대신 STREAM_MAX_UPLOAD_MB 적용 (긴 녹음 지원)
+    - 같은 장비의 같은 녹음(PCM 해시)이 이미 있으면 새 객체는 삭제하고 기존 업로드 / 분석 결과 재사용
+    - Content-Type: audio/*, device_id / filename / model_preference는 쿼리 파라미터
+    """
+    content_type = request.headers.get("content-type", "")
+    if not content_type.startswith('audio/'):
+        raise HTTPException(status_code=400, detail="Only audio files are allowed")
+
+    file_extension = os.path.splitext(filename)[1].lower()
+    if file_extension not in SUPPORTED_UPLOAD_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format. Supported: {', '.join(SUPPORTED_UPLOAD_FORMATS)}"
         )
-        db.add(audio_file)
-        await db.flush()
 
-        # 6. AIAnalysisResult DB 레코드 생성
-        analysis_result = AIAnalysisResult(
-            id=str(uuid4()),
-            audio_file_id=audio_file.id,
+    r2_object_name = f"audio_files/{uuid4()}.wav"
+
+    try:
+        ingest = await ingest_stream(request.stream(), s3_storage, r2_object_name, file_extension)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        logger.error(f"❌ Streaming ingest failed: {e}")
+        raise HTTPException(status_code=400, detail=f"Audio processing failed: {str(e)}")
+
+    audio_info = ingest["audio_info"]
+    content_hash = ingest["content_hash"]
+    logger.info(f"📊 Audio info: {audio_info}")
+
+    try:
+        # 중복 업로드: 방금 올린 객체는 지우고 기존 R2 객체 / 분석 결과 재사용
+        duplicates = await service.find_duplicate_uploads(db, current_user.id, [(device_id, content_hash)], model_preference)
+        existing_file, existing_result = duplicates.get((device_id, content_hash), (None, None))
+        if existing_file:
+            await asyncio.to_thread(s3_storage.delete_file, r2_object_name)
+            r2_object_name = existing_file.file_path
+        if existing_result:
+            logger.info(f"♻️ Duplicate upload for device {device_id}, reusing analysis {existing_result.id}")
+            return {**_duplicate_upload_response(existing_result, ingest["conversion_applied"]), "duration": audio_info["duration"]}
+
+        analysis_result, is_duplicate = await _register_upload(
+            db,
             user_id=current_user.id,
             device_id=device_id,
-            status="PENDING",
-            created_at=datetime.now()
+            filename=filename,
+            r2_object_name=r2_object_name,
+            file_size=int(audio_info['size_mb'] * 1024 * 1024),
+            content_hash=content_hash,
+            model_preference=model_preference,
+            audio_file=existing_file
         )
-        db.add(analysis_result)
-        await db.commit()
+        if is_duplicate:
+            return {**_duplicate_upload_response(analysis_result, ingest["conversion_applied"]), "duration": audio_info["duration"]}
         await db.refresh(analysis_result)
-
-        # 7. Celery 워커에 분석 작업 요청
-        try:
-            analyze_audio_task.delay(analysis_result.id, model_preference) # [수정] model_preference 전달
-            logger.info(f"🚀 Analysis task queued: {analysis_result.id} with model preference: {model_preference}")
-        except Exception as e:
-            logger.error(f"❌ Task submission failed: {e}")
-            await db.rollback()
-            raise HTTPException(status_code=500, detail="Failed to queue analysis task")
-
-        return {
-            "success": True,
-            "task_id": analysis_result.id,
-            "file_type": "wav",
-            "conversion_applied": local_file_path != converted_wav_path
-        }
-
     except Exception as e:
         await db.rollback()
         logger.error(f"❌ Upload Error: {e}")
         raise HTTPException(
-            status_code=500, 
+            status_code=500,
             detail=f"Failed to upload or schedule analysis: {str(e)}"
         )
-    finally:
-        # 로컬 임시 파일 정리
+
+    try:
+        analyze_audio_task.delay(analysis_result.id, model_preference)
+        logger.info(f"🚀 Analysis task queued: {analysis_result.id} with model preference: {model_preference}")
+    except Exception as e:
+        logger.error(f"❌ Task submission failed: {e}")
+        await _fail_unqueued_analyses(db, [analysis_result.id])
+        raise HTTPException(status_code=500, detail="Failed to queue analysis task")
+
+    return {
+        "success": True,
+        "task_id": analysis_result.id,
+        "file_type": "wav",
+        "conversion_applied": ingest["conversion_applied"],
+        "duplicate": False,
+        "duration": audio_info["duration"]
+    }
+
+@router.post("/upload/presign", summary="R2 직접 업로드용 Presigned URL 발급")
+async def create_presigned_upload(
+    payload: PresignedUploadRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    1단계: 오디오 바이트가 API 서버를 거치지 않도록 R2 Presigned PUT URL을 발급합니다.
+    AWAITING_UPLOAD 상태의 AudioFile / AIAnalysisResult 레코드를 함께 생성합니다.
+    클라이언트는 upload_url로 PUT (Content-Type 헤더 동일하게) 후 /upload/{task_id}/complete를 호출합니다.
+    """
+    if not payload.content_type.startswith('audio/'):
+        raise HTTPException(status_code=400, detail="Only audio files are allowed")
+
+    file_extension = os.path.splitext(payload.filename)[1].lower()
+    if file_extension not in SUPPORTED_UPLOAD_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format. Supported: {', '.join(SUPPORTED_UPLOAD_FORMATS)}"
+        )
+
+    r2_object_name = f"audio_files/{uuid4()}{file_extension}"
+    upload_url = await asyncio.to_thread(
+        s3_storage.generate_presigned_put_url, r2_object_name, payload.content_type, PRESIGNED_UPLOAD_EXPIRES_SEC
+    )
+    if not upload_url:
+        raise HTTPException(status_code=500, detail="Failed to create upload URL")
+
+    try:
+        audio_file, analysis_result = await service.create_pending_analysis(
+            db,
+            user_id=current_user.id,
+            device_id=payload.device_id,
+            file_path=r2_object_name,
+            filename=payload.filename,
+            file_size=None,
+            mime_type=payload.content_type,
+            status="AWAITING_UPLOAD"
+        )
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"❌ Presign Error: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to create upload: {str(e)}")
+
+    return {
+        "success": True,
+        "task_id": analysis_result.id,
+        "upload_url": upload_url,
+        "method": "PUT",
+        "headers": {"Content-Type": payload.content_type},
+        "expires_in": PRESIGNED_UPLOAD_EXPIRES_SEC
+    }
+
+@router.post("/upload/{task_id}/complete", summary="R2 직접 업로드 완료 처리 및 분석 요청")
+async def complete_presigned_upload(
+    task_id: str,
+    payload: UploadCompleteRequest = UploadCompleteRequest(),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    2단계: R2에 업로드된 객체를 검증(존재/크기/WAV 헤더)하고 분석 작업을 큐에 등록합니다.
+    이미 완료 처리된 업로드에 대해 다시 호출하면 작업을 중복 등록하지 않습니다.
+    AWAITING_UPLOAD → PENDING 전환은 조건부 UPDATE로 한 요청만 성공하며, 그 요청만 작업을 등록합니다.
+    """
+    result = await db.execute(select(AIAnalysisResult).filter(AIAnalysisResult.id == task_id))
+    analysis_result = result.scalar_one_or_none()
+    if not analysis_result:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    if analysis_result.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to complete this upload")
+    if analysis_result.status != "AWAITING_UPLOAD":
+        return {"success": True, "task_id": analysis_result.id, "status": analysis_result.status}
+
+    result = await db.execute(select(AudioFile).filter(AudioFile.id == analysis_result.audio_file_id))
+    audio_file = result.scalar_one()
+    r2_object_name = audio_file.file_path
+
+    # 객체 검증: 존재 여부 / 크기
+    head = await asyncio.to_thread(s3_storage.head_object, r2_object_name)
+    if not head:
+        raise HTTPException(status_code=409, detail="Audio file has not been uploaded yet")
+    object_size = int(head.get("ContentLength", 0))
+    if object_size == 0:
+        raise HTTPException(status_code=400, detail="Uploaded audio file is empty")
+    if object_size > STREAM_MAX_UPLOAD_BYTES:
+        await asyncio.to_thread(s3_storage.delete_file, r2_object_name)
+        raise HTTPException(status_code=413, detail=f"Audio file too large (max {STREAM_MAX_UPLOAD_BYTES // (1024 * 1024)}MB)")
+
+    # WAV는 헤더만 부분 조회하여 손상 여부 확인 (M4A/MP4는 워커 디코딩 단계에서 검증)
+    if r2_object_name.endswith('.wav'):
+        head_bytes = await asyncio.to_thread(s3_storage.get_object_range, r2_object_name, 0, WAV_PEEK_BYTES - 1)
+        if not head_bytes or parse_wav_header(io.BytesIO(head_bytes), file_size=object_size) is None:
+            raise HTTPException(status_code=400, detail="Uploaded file is not a valid WAV")
+
+    # 상태 전환 선점: 동시에 들어온 complete 요청 중 하나만 rowcount == 1
+    try:
+        transition = await db.execute(
+            update(AIAnalysisResult)
+            .where(AIAnalysisResult.id == task_id, AIAnalysisResult.status == "AWAITING_UPLOAD")
+            .values(status="PENDING", model_preference=payload.model_preference)
+            .execution_options(synchronize_session=False)
+        )
+        if transition.rowcount != 1:
+            await db.rollback()
+            result = await db.execute(select(AIAnalysisResult.status).filter(AIAnalysisResult.id == task_id))
+            return {"success": True, "task_id": task_id, "status": result.scalar_one()}
+        audio_file.file_size = object_size
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"❌ Upload completion failed: {e}")
+        raise HTTPException(status_code=500, detail="Failed to complete upload")
+
+    try:
+        analyze_audio_task.delay(task_id, payload.model_preference)
+        logger.info(f"🚀 Analysis task queued (direct upload): {task_id} with model preference: {payload.model_preference}")
+    except Exception as e:
+        # 작업 등록 실패 시 AWAITING_UPLOAD로 되돌려 complete 재호출이 다시 등록하도록 함
+        logger.error(f"❌ Failed to queue analysis task for {task_id}: {e}")
         try:
-            if os.path.exists(local_file_path):
-                os.remove(local_file_path)
-            if converted_wav_path and os.path.exists(converted_wav_path) and converted_wav_path != local_file_path:
-                os.remove(converted_wav_path)
-            logger.info("🧹 Cleaned up local temporary files")
-        except Exception as cleanup_error:
-            logger.warning(f"⚠️ Failed to clean up temp files: {cleanup_error}")
+            await db.execute(
+                update(AIAnalysisResult)
+                .where(AIAnalysisResult.id == task_id, AIAnalysisResult.status == "PENDING")
+                .values(status="AWAITING_UPLOAD")
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        except Exception as revert_error:
+            await db.rollback()
+            logger.error(f"❌ Failed to reset {task_id} to AWAITING_UPLOAD: {revert_error}")
+        raise HTTPException(status_code=500, detail="Failed to queue analysis task")
+
+    return {"success": True, "task_id": task_id, "status": "PENDING"}
+
+@router.get("/converter/metrics", summary="오디오 변환(ffmpeg) 풀 상태 조회")
+async def get_converter_metrics(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    현재 API 프로세스의 ffmpeg 실행 풀 상태(동시 실행 수, 대기열 깊이, 타임아웃 등)를 반환합니다.
+    """
+    return {
+        "success": True,
+        "metrics": ffmpeg_pool.metrics()
+    }
 
 @router.get("/result/{task_id}", summary="오디오 분석 결과 조회")
 async def get_analysis_result(
@@ -1,9 +1,10 @@
 import logging
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.features.audio_analysis.models import AIAnalysisResult
-from typing import Dict, Any, Optional, List
+from app.features.audio_analysis.models import AIAnalysisResult, AudioFile
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, timedelta
+from uuid import uuid4
 
 logger = logging.getLogger(__name__)
 
@@ -86,6 +87,127 @@ def generate_diagnostic_insight(label: str, score: float, details: Dict[str, Any
         }
     }
 
+# 중복 업로드 시 그대로 재사용하는 분석 상태 (FAILED는 재분석)
+REUSABLE_ANALYSIS_STATUSES = ("PENDING", "PROCESSING", "COMPLETED")
+
+async def create_pending_analysis(
+    db: AsyncSession,
+    user_id: int,
+    device_id: str,
+    file_path: str,
+    filename: str,
+    file_size: Optional[int],
+    mime_type: str = 'audio/wav',
+    status: str = "PENDING",
+    content_hash: Optional[str] = None,
+    model_preference: Optional[str] = None,
+    audio_file: Optional[AudioFile] = None
+) -> Tuple[AudioFile, AIAnalysisResult]:
+    """
+    업로드된 오디오에 대한 AudioFile / AIAnalysisResult(PENDING) 레코드를 생성합니다.
+    Presigned 직접 업로드는 status="AWAITING_UPLOAD"로 먼저 생성한 뒤 완료 시 PENDING으로 전환합니다.
+    audio_file을 넘기면 (중복 업로드) 기존 AudioFile / R2 객체에 새 분석 결과만 연결합니다.
+    커밋은 호출자가 수행합니다 (여러 건을 한 트랜잭션으로 묶을 수 있도록).
+    """
+    pairs = await create_pending_analyses(db, user_id, [{
+        "device_id": device_id,
+        "file_path": file_path,
+        "filename": filename,
+        "file_size": file_size,
+        "mime_type": mime_type,
+        "content_hash": content_hash,
+        "audio_file": audio_file,
+    }], status=status, model_preference=model_preference)
+    return pairs[0]
+
+async def create_pending_analyses(
+    db: AsyncSession,
+    user_id: int,
+    items: List[Dict[str, Any]],
+    status: str = "PENDING",
+    model_preference: Optional[str] = None
+) -> List[Tuple[AudioFile, AIAnalysisResult]]:
+    """
+    여러 업로드에 대한 레코드를 한 번에 생성합니다 (flush 1회, 커밋은 호출자가 1회 수행).
+    items: [{device_id, file_path, filename, file_size, mime_type, content_hash, audio_file}, ...]
+    (content_hash / audio_file은 선택. audio_file이 있으면 새 AudioFile을 만들지 않음)
+    """
+    audio_files = [
+        item.get("audio_file") or AudioFile(
+            user_id=user_id,
+            file_path=item["file_path"], # R2 키
+            filename=item["filename"],
+            file_size=item.get("file_size"),
+            mime_type=item.get("mime_type", 'audio/wav'),
+            device_id=item["device_id"],
+            content_hash=item.get("content_hash")
+        )
+        for item in items
+    ]
+    db.add_all([audio_file for audio_file in audio_files if audio_file.id is None])
+    await db.flush() # 모든 audio_file.id를 한 번에 확보
+
+    now = datetime.now()
+    analysis_results = [
+        AIAnalysisResult(
+            id=str(uuid4()),
+            audio_file_id=audio_file.id,
+            user_id=user_id,
+            device_id=audio_file.device_id,
+            status=status,
+            model_preference=model_preference,
+            created_at=now
+        )
+        for audio_file in audio_files
+    ]
+    db.add_all(analysis_results)
+    return list(zip(audio_files, analysis_results))
+
+async def find_duplicate_uploads(
+    db: AsyncSession,
+    user_id: int,
+    keys: List[Tuple[str, str]],
+    model_preference: str
+) -> Dict[Tuple[str, str], Tuple[AudioFile, Optional[AIAnalysisResult]]]:
+    """
+    (device_id, content_hash) 목록에 대해 이미 저장된 AudioFile과 재사용 가능한 분석 결과를 조회합니다 (쿼리 2회).
+    - AudioFile: 같은 장비 + 같은 PCM 해시 (R2 객체 재사용)
+    - AIAnalysisResult: 같은 사용자 + 같은 model_preference + PENDING/PROCESSING/COMPLETED 중 최신 1건 (없으면 None)
+
+    Returns:
+        dict: {(device_id, content_hash): (audio_file, analysis_result | None)} - 중복이 아닌 키는 포함되지 않음
+    """
+    wanted = {key for key in keys if key[1]}
+    if not wanted:
+        return {}
+
+    result = await db.execute(
+        select(AudioFile).filter(AudioFile.content_hash.in_({content_hash for _, content_hash in wanted}))
+    )
+    audio_files = {
+        (audio_file.device_id, audio_file.content_hash): audio_file
+        for audio_file in result.scalars().all()
+        if (audio_file.device_id, audio_file.content_hash) in wanted
+    }
+    if not audio_files:
+        return {}
+
+    result = await db.execute(
+        select(AIAnalysisResult)
+        .filter(
+            AIAnalysisResult.audio_file_id.in_([audio_file.id for audio_file in audio_files.values()]),
+            AIAnalysisResult.user_id == user_id,
+            AIAnalysisResult.model_preference == model_preference,
+            AIAnalysisResult.status.in_(REUSABLE_ANALYSIS_STATUSES)
+        )
+        .order_by(AIAnalysisResult.created_at.desc())
+    )
+    latest: Dict[int, AIAnalysisResult] = {}
+    for analysis_result in result.scalars().all():
+        latest.setdefault(analysis_result.audio_file_id, analysis_result)
+
+    return {key: (audio_file, latest.get(audio_file.id)) for key, audio_file in audio_files.items()}
+
 async def get_analysis_report(db: AsyncSession, device_id: str) -> Optional[Dict[str, Any]]:
     """
     device_id에 따라 실제 DB 분석 결과를 반환합니다. 
@@ -183,7 +305,14 @@ async def get_analysis_report(db: AsyncSession, device_id: str) -> Optional[Dict
         payload["maintenance_guide"] = insights["maintenance_guide"]
 
         # 3. Ensemble Analysis 업데이트 (실제 지표 반영)
-        if details:
+        if details.get("votes"):
+            # [NEW] ensemble 모드: 모델별 실제 투표와 융합 점수
+            payload["ensemble_analysis"]["voting_result"] = {
+                vote.get("name", name): {"status": vote["status"], "score": vote["score"]}
+                for name, vote in details["votes"].items()
+            }
+            payload["ensemble_analysis"]["consensus_score"] = details.get("fused_score", overall_score_from_analysis)
+        elif details:
             payload["ensemble_analysis"]["voting_result"] = {
                 "RMS Level": {
                     "status": overall_status_from_analysis,
@@ -209,12 +338,16 @@ async def get_analysis_report(db: AsyncSession, device_id: str) -> Optional[Dict
             payload["ensemble_analysis"]["consensus_score"] = overall_score_from_analysis
 
         # 4. Frequency Analysis 업데이트
+        # 진폭 / prominence는 envelope_peaks 도입 이후 결과에만 있음 (이전 결과는 기존 고정값 0.8로 표시)
         peak_freqs = details.get("peak_frequencies", [])
+        peak_amps = details.get("peak_amplitudes") or []
+        peak_proms = details.get("peak_prominences") or []
         detected_peaks = []
-        for freq in peak_freqs:
+        for index, freq in enumerate(peak_freqs):
             detected_peaks.append({
                 "hz": freq,
-                "amp": 0.8, # Placeholder amplitude as analyzer doesn't return it yet
+                "amp": peak_amps[index] if index < len(peak_amps) else 0.8,
+                "prominence": peak_proms[index] if index < len(peak_proms) else None,
                 "match": True,
                 "label": "결함 주파수"
             })
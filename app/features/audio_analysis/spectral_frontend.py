@@ -0,0 +1,151 @@
+import logging
+import numpy as np
+from typing import Dict, Optional
+
+# Librosa is a heavy library, so import it only if needed
+try:
+    import librosa
+except ImportError:
+    librosa = None
+    logging.warning("Librosa is not available. Spectral frontend will be disabled.")
+
+# Import constants from config_analysis
+from app.core.config_analysis import N_FFT, HOP_LENGTH
+
+logger = logging.getLogger(__name__)
+
+def band_bins(freqs: np.ndarray, low_freq: float, high_freq: float) -> Optional[slice]:
+    """
+    [low_freq, high_freq] 대역에 해당하는 스펙트로그램 bin 범위 (high_freq는 최고 bin 주파수로 제한).
+    대역이 비어 있으면 None. DSPFilter가 (sr, n_fft, 대역)별로 캐싱해 band_energy_ratio에 전달합니다.
+    """
+    if high_freq > freqs[-1]:
+        high_freq = freqs[-1]
+
+    if low_freq >= high_freq:
+        return None
+
+    idx_low = np.where(freqs >= low_freq)[0][0] if np.any(freqs >= low_freq) else 0
+    idx_high = np.where(freqs <= high_freq)[0][-1] if np.any(freqs <= high_freq) else len(freqs) - 1
+    return slice(int(idx_low), int(idx_high) + 1)
+
+class SpectralFrontend:
+    """
+    클립 단위 공유 스펙트럼 프론트엔드.
+    STFT를 한 번만 계산하고, 밴드 에너지 / RMS / MFCC / Centroid / Bandwidth /
+    Rolloff / Mel 등 모든 소비자가 같은 magnitude/power 스펙트로그램을 재사용합니다.
+    결과는 librosa의 y 기반 호출과 동일한 파라미터(n_fft, hop_length)로 계산됩니다.
+    """
+
+    def __init__(self, y: np.ndarray, sr: int, n_fft: int = N_FFT, hop_length: int = HOP_LENGTH):
+        if librosa is None:
+            logger.error("SpectralFrontend requires librosa but it's not available.")
+            raise ImportError("librosa is required for SpectralFrontend but not found.")
+
+        self.y = y
+        self.sr = sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+
+        self._magnitude = None
+        self._power = None
+        self._mel_cache: Dict[int, np.ndarray] = {}
+        self._feature_cache: Dict[str, np.ndarray] = {}
+
+    @property
+    def magnitude(self) -> np.ndarray:
+        """|STFT| (클립당 1회만 계산)"""
+        if self._magnitude is None:
+            self._magnitude = np.abs(librosa.stft(self.y, n_fft=self.n_fft, hop_length=self.hop_length))
+        return self._magnitude
+
+    @property
+    def power(self) -> np.ndarray:
+        """|STFT|^2 (Mel/MFCC 입력)"""
+        if self._power is None:
+            self._power = self.magnitude ** 2
+        return self._power
+
+    @property
+    def frequencies(self) -> np.ndarray:
+        """스펙트로그램 각 bin의 중심 주파수 (Hz)"""
+        return librosa.fft_frequencies(sr=self.sr, n_fft=self.n_fft)
+
+    def rms(self) -> np.ndarray:
+        """
+        프레임별 RMS.
+        캘리브레이션된 RMS 임계값(RMS_WARN/RMS_CRIT, mean_rms)과 값을 맞추기 위해
+        윈도우가 적용된 스펙트럼이 아닌 시간 영역 프레임으로 계산합니다 (FFT 없음).
+        """
+        if "rms" not in self._feature_cache:
+            self._feature_cache["rms"] = librosa.feature.rms(
+                y=self.y, frame_length=self.n_fft, hop_length=self.hop_length
+            )
+        return self._feature_cache["rms"]
+
+    def band_energy_ratio(self, low_freq: float, high_freq: float, bins: Optional[slice] = None) -> float:
+        """
+        지정된 주파수 대역의 magnitude 에너지 비율.
+        bins가 주어지면 (캐싱된 band_bins 결과) 주파수 축 계산 / bin 탐색을 생략합니다.
+        """
+        if bins is None:
+            bins = band_bins(self.frequencies, low_freq, high_freq)
+        if bins is None:
+            return 0.0
+
+        band_energy = np.sum(self.magnitude[bins, :])
+        total_energy = self.total_energy()
+
+        return band_energy / total_energy if total_energy > 0 else 0
+
+    def total_energy(self) -> float:
+        """전체 magnitude 합 (대역 에너지 비율의 분모, 클립당 1회)"""
+        if "total_energy" not in self._feature_cache:
+            self._feature_cache["total_energy"] = np.sum(self.magnitude)
+        return self._feature_cache["total_energy"]
+
+    def melspectrogram(self, n_mels: int = 128) -> np.ndarray:
+        """Power Mel 스펙트로그램 (n_mels별 캐싱)"""
+        if n_mels not in self._mel_cache:
+            self._mel_cache[n_mels] = librosa.feature.melspectrogram(
+                S=self.power, sr=self.sr, n_fft=self.n_fft, hop_length=self.hop_length, n_mels=n_mels
+            )
+        return self._mel_cache[n_mels]
+
+    def mfcc(self, n_mfcc: int = 13) -> np.ndarray:
+        """librosa.feature.mfcc(y=...)와 동일한 결과 (기본 128 Mel 기반)"""
+        key = f"mfcc_{n_mfcc}"
+        if key not in self._feature_cache:
+            log_mel = librosa.power_to_db(self.melspectrogram())
+            self._feature_cache[key] = librosa.feature.mfcc(S=log_mel, sr=self.sr, n_mfcc=n_mfcc)
+        return self._feature_cache[key]
+
+    def spectral_centroid(self) -> np.ndarray:
+        if "centroid" not in self._feature_cache:
+            self._feature_cache["centroid"] = librosa.feature.spectral_centroid(
+                S=self.magnitude, sr=self.sr, n_fft=self.n_fft, hop_length=self.hop_length
+            )
+        return self._feature_cache["centroid"]
+
+    def spectral_bandwidth(self) -> np.ndarray:
+        if "bandwidth" not in self._feature_cache:
+            self._feature_cache["bandwidth"] = librosa.feature.spectral_bandwidth(
+                S=self.magnitude, sr=self.sr, n_fft=self.n_fft, hop_length=self.hop_length,
+                centroid=self.spectral_centroid()
+            )
+        return self._feature_cache["bandwidth"]
+
+    def spectral_rolloff(self) -> np.ndarray:
+        if "rolloff" not in self._feature_cache:
+            self._feature_cache["rolloff"] = librosa.feature.spectral_rolloff(
+                S=self.magnitude, sr=self.sr, n_fft=self.n_fft, hop_length=self.hop_length
+            )
+        return self._feature_cache["rolloff"]
+
+    def zero_crossing_rate(self) -> np.ndarray:
+        """시간 영역 특징 (FFT 없음)"""
+        if "zcr" not in self._feature_cache:
+            self._feature_cache["zcr"] = librosa.feature.zero_crossing_rate(
+                self.y, frame_length=self.n_fft, hop_length=self.hop_length
+            )
+        return self._feature_cache["zcr"]
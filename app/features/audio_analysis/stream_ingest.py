@@ -0,0 +1,221 @@
+import io
+import os
+import hashlib
+import asyncio
+import logging
+import tempfile
+from typing import AsyncIterator, Dict, Any, Optional, List
+
+from app.core.config_analysis import (
+    SAMPLE_RATE, STREAM_PART_SIZE, STREAM_MAX_UPLOAD_BYTES, FFMPEG_STREAM_TIMEOUT_SEC
+)
+from app.features.audio_analysis.converter import AudioConverter, SubprocessPool, ffmpeg_pool
+from app.features.audio_analysis.wav_header import parse_wav_header, is_canonical_wav, build_wav_header
+from app.storage import S3Storage
+
+logger = logging.getLogger(__name__)
+
+# 스트림 앞부분에서 WAV 헤더 판별에 사용할 최대 바이트
+WAV_PEEK_BYTES = 64 * 1024
+
+# 표준 PCM 1샘플 바이트 수 (s16 모노)
+PCM_BLOCK_ALIGN = 2
+
+
+class UploadTooLargeError(ValueError):
+    """스트리밍 업로드가 STREAM_MAX_UPLOAD_BYTES를 초과한 경우"""
+
+
+class MultipartWavWriter:
+    """
+    표준 PCM 데이터를 part 단위로 R2 multipart upload에 전송합니다.
+    첫 part는 완료 시점까지 보관했다가, 실제 데이터 크기로 작성한 WAV 헤더를 앞에 붙여 업로드합니다.
+    (S3 part는 순서와 무관하게 업로드 가능) → 메모리 사용량은 최대 part 2개 분량.
+    """
+
+    def __init__(self, storage: S3Storage, object_name: str, part_size: int = STREAM_PART_SIZE):
+        self.storage = storage
+        self.object_name = object_name
+        self.part_size = part_size
+        self.upload_id: Optional[str] = None
+        self.data_size = 0
+        self._hasher = hashlib.sha256() # PCM 콘텐츠 해시 (wav_header.pcm_content_hash와 동일한 값)
+        self._first_part: Optional[bytes] = None
+        self._buffer = bytearray()
+        self._next_part_number = 2
+        self._parts: List[Dict[str, Any]] = []
+
+    async def start(self):
+        self.upload_id = await asyncio.to_thread(
+            self.storage.create_multipart_upload, self.object_name, "audio/wav"
+        )
+        if not self.upload_id:
+            raise RuntimeError("Failed to start multipart upload to cloud storage")
+
+    async def write(self, data: bytes):
+        self.data_size += len(data)
+        self._hasher.update(data)
+        self._buffer += data
+        while len(self._buffer) >= self.part_size:
+            part = bytes(self._buffer[:self.part_size])
+            del self._buffer[:self.part_size]
+            if self._first_part is None:
+                self._first_part = part
+            else:
+                await self._upload_part(self._next_part_number, part)
+                self._next_part_number += 1
+
+    async def complete(self) -> int:
+        """남은 데이터와 헤더+첫 part를 업로드하고 업로드를 완료합니다. PCM 데이터 크기를 반환합니다."""
+        if self.data_size == 0:
+            raise RuntimeError("No audio data decoded from upload")
+
+        if self._first_part is None:
+            # 전체가 part 1개 이하 → 단일 part
+            first_part, tail = bytes(self._buffer), b""
+        else:
+            first_part, tail = self._first_part, bytes(self._buffer)
+
+        if tail:
+            await self._upload_part(self._next_part_number, tail)
+        await self._upload_part(1, build_wav_header(self.data_size) + first_part)
+
+        completed = await asyncio.to_thread(
+            self.storage.complete_multipart_upload, self.object_name, self.upload_id, self._parts
+        )
+        if not completed:
+            raise RuntimeError("Failed to complete multipart upload to cloud storage")
+        return self.data_size
+
+    @property
+    def content_hash(self) -> str:
+        return self._hasher.hexdigest()
+
+    async def abort(self):
+        if self.upload_id:
+            await asyncio.to_thread(self.storage.abort_multipart_upload, self.object_name, self.upload_id)
+            self.upload_id = None
+
+    async def _upload_part(self, part_number: int, data: bytes):
+        part = await asyncio.to_thread(
+            self.storage.upload_part, self.object_name, self.upload_id, part_number, data
+        )
+        if not part:
+            raise RuntimeError(f"Failed to upload part {part_number} to cloud storage")
+        self._parts.append(part)
+
+
+async def _limit_size(chunks: AsyncIterator[bytes], max_bytes: int, counter: Dict[str, int]) -> AsyncIterator[bytes]:
+    """요청 바디를 그대로 전달하면서 누적 크기를 제한합니다."""
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        counter["received"] += len(chunk)
+        if counter["received"] > max_bytes:
+            raise UploadTooLargeError(f"Audio upload too large (max {max_bytes // (1024 * 1024)}MB)")
+        yield chunk
+
+
+async def _prepend(prefix: bytes, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    if prefix:
+        yield prefix
+    async for chunk in chunks:
+        yield chunk
+
+
+async def ingest_stream(
+    chunks: AsyncIterator[bytes],
+    storage: S3Storage,
+    object_name: str,
+    file_extension: str,
+    max_bytes: int = STREAM_MAX_UPLOAD_BYTES,
+    pool: SubprocessPool = None
+) -> Dict[str, Any]:
+    """
+    요청 바디 스트림을 분석용 표준 WAV(SAMPLE_RATE, 모노, 16-bit)로 변환하며 R2에 multipart 업로드합니다.
+    - 표준 WAV: ffmpeg 없이 PCM data 청크만 그대로 전달 (헤더 재작성)
+    - 그 외 WAV: stdin → ffmpeg → stdout 파이프로 변환
+    - M4A/MP4: 컨테이너 특성상(moov atom) seek가 필요하므로 압축된 원본만 임시 파일로 받고 출력은 스트리밍
+
+    Returns:
+        dict: {object_name, audio_info, conversion_applied, received_bytes, content_hash}
+    """
+    pool = pool or ffmpeg_pool
+    counter = {"received": 0}
+    body = _limit_size(chunks, max_bytes, counter)
+    writer = MultipartWavWriter(storage, object_name)
+    conversion_applied = True
+    spooled_path = None
+
+    await writer.start()
+    try:
+        if file_extension == '.wav':
+            # 1. 헤더 판별용 앞부분 확보
+            prefix = bytearray()
+            async for chunk in body:
+                prefix += chunk
+                if len(prefix) >= WAV_PEEK_BYTES:
+                    break
+            header = parse_wav_header(io.BytesIO(bytes(prefix)))
+
+            if is_canonical_wav(header):
+                # 2a. 표준 WAV: data 청크만 그대로 전송 (후행 메타 청크는 제외)
+                conversion_applied = False
+                remaining = header["data_size"]
+                async for chunk in _prepend(bytes(prefix[header["data_offset"]:]), body):
+                    if remaining <= 0:
+                        continue
+                    chunk = chunk[:remaining]
+                    remaining -= len(chunk)
+                    await writer.write(chunk)
+            else:
+                # 2b. 비표준 WAV: ffmpeg 파이프 변환
+                await _pipe_through_ffmpeg(pool, writer, 'pipe:0', _prepend(bytes(prefix), body))
+
+        elif file_extension in ['.m4a', '.mp4']:
+            with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as spool:
+                spooled_path = spool.name
+                async for chunk in body:
+                    spool.write(chunk)
+            await _pipe_through_ffmpeg(pool, writer, spooled_path, None)
+
+        else:
+            raise ValueError(f"Unsupported audio format: {file_extension}")
+
+        data_size = await writer.complete()
+    except BaseException:
+        await writer.abort()
+        raise
+    finally:
+        if spooled_path and os.path.exists(spooled_path):
+            os.remove(spooled_path)
+
+    audio_info = {
+        'duration': data_size / (SAMPLE_RATE * PCM_BLOCK_ALIGN),
+        'sample_rate': SAMPLE_RATE,
+        'channels': 1,
+        'codec': 'pcm_s16le',
+        'size_mb': (44 + data_size) / (1024 * 1024)
+    }
+    logger.info(f"🌊 Streamed {counter['received']} bytes → {object_name} ({audio_info['duration']:.1f}s)")
+
+    return {
+        "object_name": object_name,
+        "audio_info": audio_info,
+        "conversion_applied": conversion_applied,
+        "received_bytes": counter["received"],
+        "content_hash": writer.content_hash
+    }
+
+
+async def _pipe_through_ffmpeg(pool: SubprocessPool, writer: MultipartWavWriter, input_spec: str,
+                               input_chunks: Optional[AsyncIterator[bytes]]):
+    cmd = AudioConverter._build_pcm_stream_cmd(input_spec)
+    try:
+        returncode, stderr = await pool.pipe(
+            cmd, writer.write, timeout=FFMPEG_STREAM_TIMEOUT_SEC, input_chunks=input_chunks
+        )
+    except asyncio.TimeoutError:
+        raise RuntimeError(f"Audio conversion timeout ({FFMPEG_STREAM_TIMEOUT_SEC:g} seconds)")
+    if returncode != 0:
+        raise RuntimeError(f"FFmpeg conversion failed: {stderr.decode(errors='replace') or 'Unknown error'}")
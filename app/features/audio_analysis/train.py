@@ -26,6 +26,7 @@ from app.core.config_analysis import (
 )
 # Import AnomalyScorer to get extract_ml_features
 from app.features.audio_analysis.anomaly_scorer import AnomalyScorer
+from app.features.audio_analysis.forest_evaluator import save_flat_forest # [NEW] numpy 평가기용 export
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -103,12 +104,18 @@ def _update_model_registry(model_info: dict):
             logger.error(f"Error decoding {registry_path}. Initializing with empty registry.")
             registry_data = {"models": []}
 
-    # Remove existing entry with same id
-    registry_data["models"] = [m for m in registry_data["models"] if m.get("id") != model_info["id"]]
-    registry_data["models"].append(model_info)
+    # Replace existing entry with same id in place (없으면 추가)
+    ids = [m.get("id") for m in registry_data["models"]]
+    if model_info["id"] in ids:
+        registry_data["models"][ids.index(model_info["id"])] = model_info
+    else:
+        registry_data["models"].append(model_info)
 
-    with open(registry_path, 'w', encoding='utf-8') as f:
+    # 임시 파일에 쓴 뒤 교체 → ModelLoader가 쓰는 도중의 registry.json을 읽지 않도록
+    tmp_path = registry_path.with_suffix(".json.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
         json.dump(registry_data, f, indent=4, ensure_ascii=False)
+    os.replace(tmp_path, registry_path)
     logger.info(f"Model {model_info['id']} registered in {registry_path}")
 
 
@@ -144,13 +151,20 @@ def train_isolation_forest(data_dir: Path, output_if_name: str, output_scaler_na
     logger.info(f"Model saved to {model_save_path}")
     logger.info(f"Scaler saved to {scaler_save_path}")
 
-    # [NEW] Save Metadata JSON
     model_id = os.path.splitext(output_if_name)[0]
+
+    # [NEW] Export flat arrays (학습 데이터로 sklearn과 점수 일치 확인 후 저장)
+    output_flat_name = f"{model_id}_flat.npz"
+    if not save_flat_forest(MODEL_DIR / output_flat_name, model, scaler, validation_data=scaled_features):
+        output_flat_name = None
+
+    # [NEW] Save Metadata JSON
     metadata = {
         "model_id": model_id,
         "model_type": "level1_isolation_forest",
         "file_name_model": output_if_name,
         "file_name_scaler": output_scaler_name,
+        "file_name_flat": output_flat_name,
         "created_at": datetime.now().isoformat(),
         "dataset_path": str(data_dir),
         "sample_count": features_data.shape[0],
@@ -181,9 +195,37 @@ def train_isolation_forest(data_dir: Path, output_if_name: str, output_scaler_na
         "description": metadata["description"],
         "is_default": False # 새로 생성된 모델은 기본값이 아님
     }
+    if output_flat_name:
+        registry_entry["file_name_flat"] = output_flat_name
     _update_model_registry(registry_entry)
 
 
+def export_flat_forest(model_id: str) -> bool:
+    """
+    이미 등록된 Isolation Forest 모델을 평탄화된 .npz로 export하고 registry 항목에 file_name_flat을 추가합니다.
+    (재학습 없이 기존 모델을 numpy 평가기로 전환할 때 사용)
+    """
+    registry_path = MODEL_DIR / "registry.json"
+    with open(registry_path, 'r', encoding='utf-8') as f:
+        registry_data = json.load(f)
+    model_info = next((m for m in registry_data.get("models", []) if m.get("id") == model_id), None)
+    if not model_info or model_info.get("type") != "level1_isolation_forest":
+        logger.error(f"Isolation Forest model '{model_id}' not found in {registry_path}.")
+        return False
+
+    model = joblib.load(MODEL_DIR / model_info["file_name_model"])
+    scaler = joblib.load(MODEL_DIR / model_info["file_name_scaler"])
+    # 학습 데이터가 없으므로 표준화된 특징 공간에서 샘플링한 입력으로 일치 여부 확인
+    rng = np.random.default_rng(42)
+    validation_data = rng.standard_normal((1000, model.n_features_in_)) * 2
+
+    output_flat_name = f"{model_id}_flat.npz"
+    if not save_flat_forest(MODEL_DIR / output_flat_name, model, scaler, validation_data=validation_data):
+        return False
+    _update_model_registry({**model_info, "file_name_flat": output_flat_name})
+    return True
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Train an Isolation Forest model.")
     parser.add_argument(
@@ -204,6 +246,15 @@ if __name__ == "__main__":
         default="scaler.pkl", # 기본 Scaler 파일명
         help="Name of the output StandardScaler file (e.g., pump_scaler_v1.pkl)."
     )
+    parser.add_argument(
+        "--export_flat",
+        type=str,
+        default=None,
+        help="Export an already registered Isolation Forest model (by id) to flat numpy arrays instead of training."
+    )
     args = parser.parse_args()
     
-    train_isolation_forest(args.data_dir, args.output_if_name, args.output_scaler_name)
\ No newline at end of file
+    if args.export_flat:
+        export_flat_forest(args.export_flat)
+    else:
+        train_isolation_forest(args.data_dir, args.output_if_name, args.output_scaler_name)
\ No newline at end of file
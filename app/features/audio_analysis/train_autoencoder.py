@@ -12,6 +12,7 @@ import numpy as np
 import librosa
 import logging
 import random
+import warnings
 import soundfile as sf
 # import pandas as pd # [NEW] pandas 추가 -> moved to AudioDataset.__getitem__
 
@@ -21,7 +22,7 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 # Import config
-from app.core.config_analysis import BASE_DIR, MODEL_DIR, SAMPLE_RATE, TRAINING_AUDIO_DATA_DIR_AE
+from app.core.config_analysis import BASE_DIR, MODEL_DIR, SAMPLE_RATE, TRAINING_AUDIO_DATA_DIR_AE, AE_COMPILED_MAX_SCORE_DIFF
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -117,21 +118,75 @@ class AudioDataset(Dataset):
             logger.error(f"Error loading {file_path}: {e}")
             return torch.zeros(self.n_mels)
 
+# --- Compiled (TorchScript + int8) Export ---
+def export_compiled_autoencoder(model: nn.Module, output_path: Path, validation_data: torch.Tensor) -> dict:
+    """
+    Linear 레이어를 동적 int8 양자화한 뒤 TorchScript로 저장합니다 (CPU 추론 전용).
+    validation_data에서 eager 모델과 재구성 오차 / 정규화 점수(AnomalyScorer와 같은 min(1, mse * 20))를 비교해
+    점수 차이가 AE_COMPILED_MAX_SCORE_DIFF 이하일 때만 저장합니다.
+
+    Returns:
+        dict: {saved, max_score_diff, max_mse_rel_diff, label_agreement}
+    """
+    model.eval()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore") # torch.ao.quantization / torch.jit deprecation 경고
+        quantized = torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+        compiled = torch.jit.freeze(torch.jit.script(quantized))
+
+    with torch.no_grad():
+        mse_eager = torch.mean((model(validation_data) - validation_data) ** 2, dim=1)
+        mse_compiled = torch.mean((compiled(validation_data) - validation_data) ** 2, dim=1)
+    score_eager = torch.clamp(mse_eager * 20, max=1.0)
+    score_compiled = torch.clamp(mse_compiled * 20, max=1.0)
+    label_eager = torch.bucketize(score_eager, torch.tensor([0.5, 0.8]), right=True)
+    label_compiled = torch.bucketize(score_compiled, torch.tensor([0.5, 0.8]), right=True)
+
+    parity = {
+        "max_score_diff": float(torch.max(torch.abs(score_eager - score_compiled))),
+        "max_mse_rel_diff": float(torch.max(torch.abs(mse_eager - mse_compiled) / torch.clamp(mse_eager, min=1e-8))),
+        "label_agreement": float(torch.mean((label_eager == label_compiled).float())),
+    }
+    parity["saved"] = parity["max_score_diff"] <= AE_COMPILED_MAX_SCORE_DIFF
+    if not parity["saved"]:
+        logger.error(f"Compiled autoencoder does not match eager model ({parity}). Not saving {output_path}.")
+        return parity
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        torch.jit.save(compiled, str(output_path))
+    logger.info(f"Compiled (TorchScript int8) autoencoder saved to {output_path} ({parity})")
+    return parity
+
+
+def _validation_tensor(dataset: Dataset) -> torch.Tensor:
+    """parity 확인용 입력 (데이터셋이 비어 있으면 [0, 1] 범위 랜덤 특징)"""
+    if len(dataset) > 0:
+        return torch.stack([dataset[i] for i in range(len(dataset))])
+    return torch.rand(256, 64)
+
+
 # --- Model Registry Update Function ---
 def _update_model_registry(model_info: dict):
     registry_path = MODEL_DIR / "registry.json"
     registry_data = {"models": []}
 
     if registry_path.exists():
-        with open(registry_path, 'r') as f:
+        with open(registry_path, 'r', encoding='utf-8') as f:
             registry_data = json.load(f)
 
-    # Remove existing entry with same id
-    registry_data["models"] = [m for m in registry_data["models"] if m.get("id") != model_info["id"]]
-    registry_data["models"].append(model_info)
+    # Replace existing entry with same id in place (없으면 추가)
+    ids = [m.get("id") for m in registry_data["models"]]
+    if model_info["id"] in ids:
+        registry_data["models"][ids.index(model_info["id"])] = model_info
+    else:
+        registry_data["models"].append(model_info)
 
-    with open(registry_path, 'w') as f:
-        json.dump(registry_data, f, indent=4)
+    # 임시 파일에 쓴 뒤 교체 → ModelLoader가 쓰는 도중의 registry.json을 읽지 않도록
+    tmp_path = registry_path.with_suffix(".json.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(registry_data, f, indent=4, ensure_ascii=False)
+    os.replace(tmp_path, registry_path)
     logger.info(f"Model {model_info['id']} registered in {registry_path}")
 
 
@@ -186,8 +241,15 @@ def train_autoencoder(data_dir: Path, output_name: str):
     torch.save(model.state_dict(), model_save_path)
     logger.info(f"Model saved to {model_save_path}")
 
-    # [NEW] Save Metadata JSON
     model_id = output_name.split('.')[0]
+
+    # [NEW] Export compiled (TorchScript + int8) inference model
+    output_compiled_name = f"{model_id}_int8.pt"
+    compiled_parity = export_compiled_autoencoder(model, MODEL_DIR / output_compiled_name, _validation_tensor(dataset))
+    if not compiled_parity["saved"]:
+        output_compiled_name = None
+
+    # [NEW] Save Metadata JSON
     metadata = {
         "model_id": model_id,
         "model_type": "level2_autoencoder",
@@ -205,6 +267,8 @@ def train_autoencoder(data_dir: Path, output_name: str):
         "training_metrics": {
             "final_loss": total_loss/len(dataloader)
         },
+        "file_name_compiled": output_compiled_name,
+        "compiled_parity": compiled_parity,
         "description": f"Autoencoder trained on data from {actual_training_dir}"
     }
     
@@ -218,14 +282,40 @@ def train_autoencoder(data_dir: Path, output_name: str):
         "id": model_id,
         "name": f"{model_id.replace('_', ' ').title()} (Autoencoder)",
         "type": "level2_autoencoder",
-        "file": output_name,
+        "file_name": output_name, # [수정] ModelLoader가 읽는 키 (기존 "file")
         "meta_file": f"{model_id}_meta.json",
         "description": metadata["description"],
         "is_default": False # 새로 생성된 모델은 기본값이 아님
     }
+    if output_compiled_name:
+        registry_entry["file_name_compiled"] = output_compiled_name
     _update_model_registry(registry_entry)
 
 
+def export_compiled_model(model_id: str, data_dir: Path = None) -> bool:
+    """
+    이미 등록된 Autoencoder를 재학습 없이 TorchScript int8 모델로 export하고 registry 항목에 file_name_compiled를 추가합니다.
+    data_dir에 정상 데이터가 있으면 parity 확인에 사용합니다.
+    """
+    registry_path = MODEL_DIR / "registry.json"
+    with open(registry_path, 'r', encoding='utf-8') as f:
+        registry_data = json.load(f)
+    model_info = next((m for m in registry_data.get("models", []) if m.get("id") == model_id), None)
+    if not model_info or model_info.get("type") != "level2_autoencoder" or not model_info.get("file_name"):
+        logger.error(f"Autoencoder model '{model_id}' not found in {registry_path}.")
+        return False
+
+    model = IndustrialAutoencoder(input_dim=64, latent_dim=16)
+    model.load_state_dict(torch.load(MODEL_DIR / model_info["file_name"], map_location=torch.device('cpu')))
+    dataset = AudioDataset(data_dir, sample_rate=SAMPLE_RATE) if data_dir and data_dir.exists() else []
+
+    output_compiled_name = f"{model_id}_int8.pt"
+    if not export_compiled_autoencoder(model, MODEL_DIR / output_compiled_name, _validation_tensor(dataset))["saved"]:
+        return False
+    _update_model_registry({**model_info, "file_name_compiled": output_compiled_name})
+    return True
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Train an Industrial Autoencoder model.")
     parser.add_argument(
@@ -240,6 +330,15 @@ if __name__ == "__main__":
         default="autoencoder.pth", # 기본 모델 파일명
         help="Name of the output model file (e.g., pump_autoencoder_v1.pth)."
     )
+    parser.add_argument(
+        "--export_compiled",
+        type=str,
+        default=None,
+        help="Export an already registered autoencoder (by id) to a TorchScript int8 model instead of training."
+    )
     args = parser.parse_args()
     
-    train_autoencoder(args.data_dir, args.output_name)
\ No newline at end of file
+    if args.export_compiled:
+        export_compiled_model(args.export_compiled, args.data_dir)
+    else:
+        train_autoencoder(args.data_dir, args.output_name)
\ No newline at end of file
@@ -0,0 +1,182 @@
+import os
+import struct
+import hashlib
+import logging
+from pathlib import Path
+from typing import Optional, Dict, Any, Union, BinaryIO
+
+from app.core.config_analysis import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+# WAVE format tags
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# 헤더 탐색 시 data 청크 이전에 허용할 최대 바이트 (LIST/INFO 등 메타 청크 포함)
+MAX_HEADER_SCAN_BYTES = 1024 * 1024
+
+# 콘텐츠 해시 계산 시 읽기 단위
+HASH_READ_BYTES = 1024 * 1024
+
+# 업로드 파이프라인이 ffmpeg 없이 그대로 받아들이는 포맷: SAMPLE_RATE, 16-bit PCM 모노
+# (분석 워커가 리샘플링 없이 바로 사용할 수 있는 포맷)
+CANONICAL_SAMPLE_RATE = SAMPLE_RATE
+CANONICAL_BITS_PER_SAMPLE = 16
+CANONICAL_CHANNELS = 1
+
+
+def _codec_name(format_tag: int, bits_per_sample: int) -> str:
+    """ffprobe codec_name과 동일한 표기"""
+    if format_tag == WAVE_FORMAT_PCM:
+        if bits_per_sample == 8:
+            return "pcm_u8"
+        return f"pcm_s{bits_per_sample}le"
+    if format_tag == WAVE_FORMAT_IEEE_FLOAT:
+        return f"pcm_f{bits_per_sample}le"
+    return "unknown"
+
+
+def read_wav_header(file_path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+    """
+    RIFF/WAVE 헤더만 읽어 메타데이터를 반환합니다 (샘플 데이터는 읽지 않음).
+    파일이 손상되었거나 WAV가 아니면 None을 반환합니다.
+
+    Returns:
+        dict: {duration, sample_rate, channels, codec, size_mb,
+               bits_per_sample, format_tag, data_offset, data_size}
+    """
+    try:
+        file_size = os.path.getsize(file_path)
+        with open(file_path, "rb") as f:
+            return parse_wav_header(f, file_size)
+    except OSError as e:
+        logger.warning(f"WAV header parse failed for {file_path}: {e}")
+        return None
+
+
+def parse_wav_header(f: BinaryIO, file_size: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    파일 객체(또는 스트림 앞부분의 BytesIO)에서 WAV 헤더를 파싱합니다.
+    file_size가 None이면 (스트리밍 업로드처럼 전체 크기를 모르는 경우) 잘림 검사를 생략합니다.
+    """
+    try:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[0:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            return None
+
+        fmt = None
+        while f.tell() < MAX_HEADER_SCAN_BYTES:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                return None
+            chunk_id, chunk_size = struct.unpack("<4sI", chunk_header)
+
+            if chunk_id == b"fmt ":
+                if chunk_size < 16:
+                    return None
+                body = f.read(chunk_size)
+                if len(body) < chunk_size:
+                    return None
+                format_tag, channels, sample_rate, byte_rate, block_align, bits = struct.unpack("<HHIIHH", body[:16])
+                # WAVE_FORMAT_EXTENSIBLE: 실제 포맷은 SubFormat GUID 앞 2바이트
+                if format_tag == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 40:
+                    format_tag = struct.unpack("<H", body[24:26])[0]
+                fmt = (format_tag, channels, sample_rate, byte_rate, block_align, bits)
+                f.seek(chunk_size & 1, os.SEEK_CUR)
+                continue
+
+            elif chunk_id == b"data":
+                if fmt is None:
+                    return None
+                data_offset = f.tell()
+                format_tag, channels, sample_rate, byte_rate, block_align, bits = fmt
+
+                # 헤더 일관성 검사 (잘린 파일 / 스트리밍 헤더 / 잘못된 필드)
+                if channels == 0 or sample_rate == 0 or bits == 0:
+                    return None
+                if block_align != channels * ((bits + 7) // 8) or byte_rate != sample_rate * block_align:
+                    return None
+                if file_size is not None and data_offset + chunk_size > file_size:
+                    return None
+
+                size_bytes = file_size if file_size is not None else data_offset + chunk_size
+                return {
+                    "duration": chunk_size / byte_rate,
+                    "sample_rate": sample_rate,
+                    "channels": channels,
+                    "codec": _codec_name(format_tag, bits),
+                    "size_mb": size_bytes / (1024 * 1024),
+                    "bits_per_sample": bits,
+                    "format_tag": format_tag,
+                    "data_offset": data_offset,
+                    "data_size": chunk_size,
+                }
+
+            # 그 외 청크(LIST 등)는 건너뜀 (홀수 크기는 1바이트 패딩)
+            f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+
+        return None
+    except struct.error as e:
+        logger.warning(f"WAV header parse failed: {e}")
+        return None
+
+
+def pcm_content_hash(file_path: Union[str, Path]) -> Optional[str]:
+    """
+    WAV data 청크(PCM 샘플)만의 SHA-256을 반환합니다.
+    헤더/메타 청크와 무관하므로 같은 녹음을 재전송하면 업로드 경로(파일/스트리밍)와 상관없이 같은 값이 나옵니다.
+    WAV가 아니면 None을 반환합니다.
+    """
+    header = read_wav_header(file_path)
+    if header is None:
+        return None
+
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        f.seek(header["data_offset"])
+        remaining = header["data_size"]
+        while remaining > 0:
+            block = f.read(min(HASH_READ_BYTES, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+def build_wav_header(data_size: int, sample_rate: int = CANONICAL_SAMPLE_RATE,
+                     channels: int = CANONICAL_CHANNELS, bits_per_sample: int = CANONICAL_BITS_PER_SAMPLE) -> bytes:
+    """표준 44바이트 PCM WAV 헤더 생성 (스트리밍 업로드 완료 시 실제 데이터 크기로 작성)"""
+    block_align = channels * (bits_per_sample // 8)
+    byte_rate = sample_rate * block_align
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, WAVE_FORMAT_PCM, channels, sample_rate, byte_rate, block_align, bits_per_sample,
+        b"data", data_size
+    )
+
+
+def is_canonical_wav(header: Optional[Dict[str, Any]]) -> bool:
+    """ffmpeg 재변환 없이 그대로 저장/분석 가능한 SAMPLE_RATE 16-bit PCM 모노 WAV인지 확인"""
+    return (
+        header is not None
+        and header["format_tag"] == WAVE_FORMAT_PCM
+        and header["sample_rate"] == CANONICAL_SAMPLE_RATE
+        and header["bits_per_sample"] == CANONICAL_BITS_PER_SAMPLE
+        and header["channels"] == CANONICAL_CHANNELS
+        and header["data_size"] > 0
+    )
+
+
+def to_audio_info(header: Dict[str, Any]) -> Dict[str, Any]:
+    """AudioConverter.get_audio_info와 동일한 키만 추출"""
+    return {
+        "duration": float(header["duration"]),
+        "sample_rate": int(header["sample_rate"]),
+        "channels": int(header["channels"]),
+        "codec": header["codec"],
+        "size_mb": header["size_mb"],
+    }
@@ -1,8 +1,9 @@
 import boto3
 import os
 import logging
+from botocore.config import Config
 from botocore.exceptions import ClientError
-from typing import Optional
+from typing import Optional, List, Dict, Any, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +14,8 @@ class S3Storage:
         self.access_key = os.getenv("AWS_ACCESS_KEY_ID")
         self.secret_key = os.getenv("AWS_SECRET_ACCESS_KEY")
         self.region = os.getenv("AWS_DEFAULT_REGION", "auto")
+        # 모바일 앱이 직접 접근하는 주소 (로컬 MinIO 등 내부 주소와 다를 때만 설정)
+        self.public_endpoint_url = os.getenv("S3_PUBLIC_ENDPOINT_URL") or self.endpoint_url
 
         if not all([self.bucket_name, self.endpoint_url, self.access_key, self.secret_key]):
             logger.warning("⚠️ Cloudflare R2 credentials are missing. Storage operations may fail.")
@@ -24,6 +27,15 @@ class S3Storage:
             aws_secret_access_key=self.secret_key,
             region_name=self.region
         )
+        # Presigned URL 전용 클라이언트 (R2/MinIO 모두 SigV4 필요)
+        self.presign_client = boto3.client(
+            's3',
+            endpoint_url=self.public_endpoint_url,
+            aws_access_key_id=self.access_key,
+            aws_secret_access_key=self.secret_key,
+            region_name=self.region,
+            config=Config(signature_version='s3v4')
+        )
 
     def upload_file(self, file_path: str, object_name: Optional[str] = None) -> Optional[str]:
         """Upload a file to an S3 bucket"""
@@ -48,6 +60,106 @@ class S3Storage:
             logger.error(f"❌ Failed to download from R2: {e}")
             return False
 
+    def get_object_bytes(self, object_name: str) -> Optional[bytes]:
+        """Read a whole object into memory (no temp file)"""
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=object_name)
+            data = response["Body"].read()
+            logger.info(f"✅ Fetched {object_name} from R2 into memory ({len(data)} bytes)")
+            return data
+        except ClientError as e:
+            logger.error(f"❌ Failed to fetch from R2: {e}")
+            return None
+
+    def generate_presigned_put_url(self, object_name: str, content_type: str, expires_in: int = 900) -> Optional[str]:
+        """Create a presigned PUT URL so clients can upload directly to the bucket"""
+        try:
+            return self.presign_client.generate_presigned_url(
+                'put_object',
+                Params={"Bucket": self.bucket_name, "Key": object_name, "ContentType": content_type},
+                ExpiresIn=expires_in
+            )
+        except ClientError as e:
+            logger.error(f"❌ Failed to create presigned URL: {e}")
+            return None
+
+    def head_object(self, object_name: str) -> Optional[Dict[str, Any]]:
+        """Return object metadata (ContentLength, ContentType, ...) or None if missing"""
+        try:
+            return self.s3_client.head_object(Bucket=self.bucket_name, Key=object_name)
+        except ClientError as e:
+            logger.warning(f"⚠️ Object not found in R2: {object_name} ({e})")
+            return None
+
+    def get_object_range(self, object_name: str, start: int, end: int) -> Optional[bytes]:
+        """Read bytes [start, end] (inclusive) of an object"""
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=object_name, Range=f"bytes={start}-{end}")
+            return response["Body"].read()
+        except ClientError as e:
+            logger.error(f"❌ Failed to read range from R2: {e}")
+            return None
+
+    def get_object_prefix(self, object_name: str, length: int) -> Optional[Tuple[bytes, int]]:
+        """Read the first `length` bytes of an object in one request. Returns (bytes, total object size)."""
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=object_name, Range=f"bytes=0-{length - 1}")
+            data = response["Body"].read()
+            # "bytes 0-N/TOTAL" (객체가 length보다 작으면 전체가 반환됨)
+            content_range = response.get("ContentRange")
+            total = int(content_range.rsplit("/", 1)[1]) if content_range else len(data)
+            return data, total
+        except ClientError as e:
+            logger.error(f"❌ Failed to fetch from R2: {e}")
+            return None
+
+    # --- Multipart Upload (스트리밍 업로드용, 임시 파일 없이 part 단위 전송) ---
+
+    def create_multipart_upload(self, object_name: str, content_type: Optional[str] = None) -> Optional[str]:
+        """Start a multipart upload and return its upload id"""
+        try:
+            extra = {"ContentType": content_type} if content_type else {}
+            response = self.s3_client.create_multipart_upload(Bucket=self.bucket_name, Key=object_name, **extra)
+            return response["UploadId"]
+        except ClientError as e:
+            logger.error(f"❌ Failed to start multipart upload to R2: {e}")
+            return None
+
+    def upload_part(self, object_name: str, upload_id: str, part_number: int, data: bytes) -> Optional[Dict[str, Any]]:
+        """Upload one part (every part except the last must be at least 5 MiB)"""
+        try:
+            response = self.s3_client.upload_part(
+                Bucket=self.bucket_name, Key=object_name, UploadId=upload_id,
+                PartNumber=part_number, Body=data
+            )
+            return {"PartNumber": part_number, "ETag": response["ETag"]}
+        except ClientError as e:
+            logger.error(f"❌ Failed to upload part {part_number} of {object_name}: {e}")
+            return None
+
+    def complete_multipart_upload(self, object_name: str, upload_id: str, parts: List[Dict[str, Any]]) -> Optional[str]:
+        """Complete a multipart upload (parts may have been uploaded in any order)"""
+        try:
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket_name, Key=object_name, UploadId=upload_id,
+                MultipartUpload={"Parts": sorted(parts, key=lambda p: p["PartNumber"])}
+            )
+            logger.info(f"✅ Multipart upload to R2 completed: {object_name} ({len(parts)} parts)")
+            return object_name
+        except ClientError as e:
+            logger.error(f"❌ Failed to complete multipart upload to R2: {e}")
+            return None
+
+    def abort_multipart_upload(self, object_name: str, upload_id: str) -> bool:
+        """Abort a multipart upload and discard uploaded parts"""
+        try:
+            self.s3_client.abort_multipart_upload(Bucket=self.bucket_name, Key=object_name, UploadId=upload_id)
+            logger.info(f"🧹 Aborted multipart upload: {object_name}")
+            return True
+        except ClientError as e:
+            logger.error(f"❌ Failed to abort multipart upload: {e}")
+            return False
+
     def delete_file(self, object_name: str) -> bool:
         """Delete a file from an S3 bucket"""
         try:
@@ -0,0 +1,41 @@
+# app/tasks.py
+# Celery 앱 설정 + 태스크 시그니처 (API 프로세스용 경량 모듈)
+# API는 태스크를 이름으로만 참조하므로 app.worker (PipelineExecutor → torch / librosa / sklearn)를 임포트하지 않습니다.
+# 태스크 구현은 app/worker.py에 있으며, 워커는 이 모듈의 celery_app에 태스크를 등록합니다.
+import os
+from celery import Celery, Signature
+
+# 환경 변수 가져오기
+BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
+BACKEND_URL = os.getenv("CELERY_RESULT_BACKEND", "redis://redis:6379/0")
+
+# Celery 앱 설정
+celery_app = Celery(
+    "signalcraft_worker",
+    broker=BROKER_URL,
+    backend=BACKEND_URL
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    result_serializer="json",
+    timezone="Asia/Seoul",
+    enable_utc=True,
+    broker_connection_retry_on_startup=True,
+)
+
+# 태스크 이름 (app.worker의 기존 자동 생성 이름과 동일 → 배포 중 큐에 남은 메시지와 호환)
+ANALYZE_AUDIO_TASK = "app.worker.analyze_audio_task"
+TEST_TASK = "app.worker.test_task"
+# 매우 긴 녹음 분산 분석 (analyze_audio_task가 chord로 등록 - API는 직접 호출하지 않음)
+ANALYZE_SEGMENT_TASK = "app.worker.analyze_segment_task"
+REDUCE_SEGMENTS_TASK = "app.worker.reduce_segments_task"
+
+def analyze_audio_signature(analysis_result_id: str, model_preference: str = "level1") -> Signature:
+    """분석 태스크 시그니처 (group / chord 구성용)"""
+    return celery_app.signature(ANALYZE_AUDIO_TASK, args=(analysis_result_id, model_preference))
+
+# 태스크 객체처럼 .delay(...)로 호출 가능한 시그니처 (워커에 등록되지 않은 프로세스에서는 send_task로 전송)
+analyze_audio_task = celery_app.signature(ANALYZE_AUDIO_TASK)
+test_task = celery_app.signature(TEST_TASK)
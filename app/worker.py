@@ -1,153 +1,455 @@
 # app/worker.py
+import io
 import os
+import gc
 import time
+import torch
 import random
-import tempfile # [추가] 임시 파일용
-import asyncio # [추가] 비동기 실행용
-from pathlib import Path # [추가] Path 객체용
-from datetime import datetime, timezone # [수정] timezone 추가
-from celery import Celery
+from datetime import datetime, timezone, timedelta # [수정] timezone 추가
+from sqlalchemy import or_, and_
 from sqlalchemy.orm import Session
-from app.database import SessionLocal
+from app.database import SessionLocal, sync_engine
 import app.models # 추가: User 모델 등 기본 모델 로드 (ForeignKey 해결용)
 from app.models import Device # [추가] Device 모델 임포트
 from app.features.audio_analysis.models import AIAnalysisResult, AudioFile
 # from app.features.audio_analysis.analyzer import analyze_audio_file, _load_ml_model # Removed
 from app.features.audio_analysis.pipeline_executor import PipelineExecutor # [추가] PipelineExecutor
 from app.storage import S3Storage # [추가] Cloudflare R2 스토리지
-from celery.signals import worker_init
-
-# 환경 변수 가져오기
-BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
-BACKEND_URL = os.getenv("CELERY_RESULT_BACKEND", "redis://redis:6379/0")
-
-# Celery 앱 설정
-celery_app = Celery(
-    "signalcraft_worker",
-    broker=BROKER_URL,
-    backend=BACKEND_URL
-)
-
-celery_app.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
-    timezone="Asia/Seoul",
-    enable_utc=True,
-    broker_connection_retry_on_startup=True,
-)
+from app.features.audio_analysis.prefetcher import AudioPrefetcher # [NEW] 다운로드/분석 오버랩
+from app.core.worker_loop import worker_loop # [NEW] 워커 수명 이벤트 루프
+from app.core.config_analysis import ANALYSIS_BATCH_SIZE, ANALYSIS_BATCH_WAIT_MS, ANALYSIS_CLAIM_TIMEOUT_SEC, WORKER_PRELOAD_MODELS, WORKER_WARMUP, WORKER_TORCH_THREADS, WORKER_TORCH_INTEROP_THREADS
+from app.core.config_analysis import SAMPLE_RATE, FANOUT_MIN_DURATION_SEC, FANOUT_WINDOWS_PER_SEGMENT
+from app.features.audio_analysis.dsp_filter import plan_window_segments, BUFFER_HEADER_PEEK_BYTES # [NEW] 분산 윈도우 분석
+from app.features.audio_analysis.wav_header import parse_wav_header, is_canonical_wav
+from app.core.model_loader import model_loader
+from celery import chord
+from celery.signals import worker_init, worker_ready, worker_process_init, worker_process_shutdown, worker_shutdown
+
+# [수정] Celery 앱 설정은 API도 임포트하는 경량 모듈(app.tasks)로 이동 - 여기서는 태스크 구현만 등록
+from app.tasks import celery_app, ANALYZE_AUDIO_TASK, TEST_TASK, ANALYZE_SEGMENT_TASK, REDUCE_SEGMENTS_TASK
 
 # Global PipelineExecutor instance
 pipeline_executor = None
 
+# [NEW] 워커 프로세스당 재사용하는 R2 클라이언트 (태스크마다 생성하지 않음)
+s3_storage = None
+
+def get_storage() -> S3Storage:
+    global s3_storage
+    if s3_storage is None:
+        s3_storage = S3Storage()
+    return s3_storage
+
+def get_pipeline_executor() -> PipelineExecutor:
+    # Ensure pipeline executor is initialized
+    global pipeline_executor
+    if pipeline_executor is None:
+        pipeline_executor = PipelineExecutor()
+    return pipeline_executor
+
 # Celery worker가 초기화될 때 파이프라인 초기화
 @worker_init.connect
 def initialize_pipeline(**kwargs):
     global pipeline_executor
+    configure_torch_threads()
     pipeline_executor = PipelineExecutor()
+    # [NEW] 태스크마다 asyncio.run() 대신 워커 수명 동안 유지되는 이벤트 루프에 제출
+    worker_loop.start()
     print("PipelineExecutor initialized on worker startup.")
 
-@celery_app.task
+    # [NEW] 모델 프리로드 + 워밍업 (worker_init이 끝나야 태스크를 받기 시작하므로 첫 태스크의 지연 스파이크 제거)
+    started = time.perf_counter()
+    preload_models()
+    if WORKER_WARMUP:
+        try:
+            worker_loop.run(pipeline_executor.warm_up())
+        except Exception as e:
+            print(f"⚠️ Pipeline warm-up failed: {e}")
+    print(f"🔥 Worker warm-up finished in {time.perf_counter() - started:.2f}s")
+
+    # [NEW] prefork 자식들이 부모의 모델 메모리 한 벌을 공유하도록 준비 (fork 직전)
+    # - torch 파라미터는 공유 메모리로 이동
+    # - 지금까지 만든 객체를 GC 추적에서 제외: 자식의 GC가 객체 헤더를 건드려 페이지가 복사(COW)되는 것 방지
+    shared = model_loader.share_loaded_models()
+    gc.collect()
+    gc.freeze()
+    print(f"🧊 {shared} torch model(s) moved to shared memory, {gc.get_freeze_count()} objects frozen for copy-on-write sharing")
+
+def configure_torch_threads():
+    """
+    torch 스레드 수를 워커 설정으로 제한합니다 (기본값은 코어 수만큼 스레드를 만들어 prefork 자식 간 과다 구독 발생).
+    Autoencoder 입력은 클립당 64차원 벡터 1~수 개라 intra-op 병렬화 이득보다 스레드 동기화 비용이 큽니다.
+    inter-op 스레드 수는 torch 연산 전에 한 번만 설정할 수 있으므로 워커 시작 직후(모델 로드 전)에 호출합니다.
+    """
+    torch.set_num_threads(WORKER_TORCH_THREADS)
+    try:
+        torch.set_num_interop_threads(WORKER_TORCH_INTEROP_THREADS)
+    except RuntimeError as e:
+        print(f"⚠️ Could not set torch inter-op threads: {e}")
+
+def preload_models():
+    """WORKER_PRELOAD_MODELS 설정에 따라 registry.json의 모델을 미리 로드합니다."""
+    setting = WORKER_PRELOAD_MODELS.strip().lower()
+    if setting in ("", "none"):
+        return
+    model_ids = None if setting == "all" else [model_id.strip() for model_id in WORKER_PRELOAD_MODELS.split(",") if model_id.strip()]
+
+    started = time.perf_counter()
+    status = model_loader.preload(model_ids)
+    loaded = [model_id for model_id, ok in status.items() if ok]
+    failed = [model_id for model_id, ok in status.items() if not ok]
+    stats = model_loader.cache_stats()
+    print(f"📦 Preloaded {len(loaded)} model(s) in {time.perf_counter() - started:.2f}s: {loaded} "
+          f"(cache: {stats['models']} model(s), {stats['bytes'] / (1024 * 1024):.1f}MB, {stats['evictions']} evicted)")
+    if failed:
+        print(f"⚠️ Models not preloaded: {failed}")
+
+@worker_ready.connect
+def report_ready(**kwargs):
+    requeue_stale_analyses()
+    print("✅ Worker ready to consume analysis tasks.")
+
+def requeue_stale_analyses():
+    """
+    [NEW] 선점한 워커가 죽어(OOM, SIGKILL, 배포) PROCESSING에 남은 분석을 PENDING으로 되돌리고 태스크를 다시 등록합니다.
+    배치에 함께 선점된 분석은 자신의 태스크가 이미 건너뛰었으므로, 재등록하지 않으면 영영 처리되지 않습니다.
+    """
+    db: Session = SessionLocal()
+    try:
+        stale = (
+            db.query(AIAnalysisResult)
+            .filter(_stale_claim_filter())
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        for result in stale:
+            result.status = "PENDING"
+            result.claimed_at = None
+        db.commit()
+        for result in stale:
+            analyze_audio_task.delay(result.id, result.model_preference or "level1")
+        if stale:
+            print(f"♻️ Re-queued {len(stale)} analysis(es) with stale PROCESSING claims")
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️ Could not re-queue stale analyses: {e}")
+    finally:
+        db.close()
+        # 부모 프로세스의 DB 연결을 이후 fork되는 자식과 공유하지 않도록 정리
+        sync_engine.dispose()
+
+# [NEW] prefork 자식 프로세스: fork 시 루프 스레드는 복제되지 않으므로 자식에서 루프 시작
+@worker_process_init.connect
+def start_worker_loop(**kwargs):
+    # 부모에서 로드된 모델을 그대로 사용 (자식별 재로드 없음), 자식당 torch 스레드 수 제한
+    torch.set_num_threads(WORKER_TORCH_THREADS)
+    worker_loop.start()
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def stop_worker_loop(**kwargs):
+    worker_loop.stop()
+
+@celery_app.task(name=TEST_TASK)
 def test_task(word: str):
     return f"Celery received: {word}"
 
-@celery_app.task
+@celery_app.task(name=ANALYZE_AUDIO_TASK)
 def analyze_audio_task(analysis_result_id: str, model_preference: str = "level1"): # [수정] model_preference 인자 추가
+    """
+    [수정] 마이크로 배치 분석.
+    요청받은 분석 1건과 함께 대기 중인(PENDING) 다른 분석을 최대 ANALYSIS_BATCH_SIZE건까지
+    (ANALYSIS_BATCH_WAIT_MS 동안) 가져와 한 번에 분석하고, 결과는 건별로 기록합니다.
+    함께 처리된 분석의 개별 태스크는 나중에 실행될 때 이미 처리 중/완료 상태를 보고 건너뜁니다.
+    선점이 ANALYSIS_CLAIM_TIMEOUT_SEC보다 오래된 PROCESSING 분석은 선점한 워커가 죽은 것으로 보고 인수합니다.
+    """
     db: Session = SessionLocal()
-    local_audio_path = None
-    
-    # Ensure pipeline executor is initialized
-    global pipeline_executor
-    if pipeline_executor is None:
-        pipeline_executor = PipelineExecutor()
+    batch = []
+    fanned_out = {}
+    pipeline_executor = get_pipeline_executor()
     
     try:
-        # 1. 분석 작업 조회
-        analysis_result = db.query(AIAnalysisResult).filter(AIAnalysisResult.id == analysis_result_id).first()
+        # 1. 분석 작업 조회 및 선점 (다른 워커의 배치에 이미 포함된 경우 건너뜀)
+        analysis_result = (
+            db.query(AIAnalysisResult)
+            .filter(AIAnalysisResult.id == analysis_result_id)
+            .with_for_update()
+            .first()
+        )
         if not analysis_result:
             print(f"Analysis Result ID {analysis_result_id} not found.")
             return "Not Found"
+        if analysis_result.status == "COMPLETED" or (analysis_result.status == "PROCESSING" and not _is_stale_claim(analysis_result)):
+            db.commit()
+            print(f"Analysis {analysis_result_id} already {analysis_result.status} (claimed by a batch), skipping.")
+            return f"Skipped: {analysis_result.status}"
+        if analysis_result.status == "PROCESSING":
+            print(f"Analysis {analysis_result_id} claim from {analysis_result.claimed_at} is stale, taking over.")
 
-        # 2. 오디오 파일 정보 조회
-        audio_file = db.query(AudioFile).filter(AudioFile.id == analysis_result.audio_file_id).first()
-        if not audio_file:
-             print(f"Audio File for Result ID {analysis_result_id} not found.")
-             analysis_result.status = "FAILED"
-             analysis_result.result_data = {"error": "Audio file record not found"}
-             db.commit()
-             return "Audio File Not Found"
-        
-        # 파일 경로 확인 (R2 키인지 로컬 경로인지)
-        r2_object_key = audio_file.file_path
-        
-        # 3. 상태 업데이트: PROCESSING
-        analysis_result.status = "PROCESSING"
+        # 2. 상태 업데이트: PROCESSING
+        _claim(analysis_result)
         db.commit()
-        
-        print(f"Preparing analysis for task {analysis_result_id}, source: {r2_object_key}...")
 
-        # R2에서 다운로드 준비
-        s3_storage = S3Storage()
-        
-        # 임시 파일 생성 (확장자는 원본 유지)
-        file_ext = os.path.splitext(r2_object_key)[1] if os.path.splitext(r2_object_key)[1] else ".wav"
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=file_ext)
-        local_audio_path = temp_file.name
-        temp_file.close() # 윈도우 호환성을 위해 닫음
-
-        # 다운로드 시도
-        if s3_storage.download_file(r2_object_key, local_audio_path):
-            print(f"✅ Downloaded from R2: {r2_object_key} -> {local_audio_path}")
-        elif os.path.exists(r2_object_key):
-            # 혹시 로컬 경로로 남아있는 경우 (마이그레이션 과도기)
-            print(f"⚠️ R2 download failed, but found local file: {r2_object_key}")
-            import shutil
-            shutil.copy(r2_object_key, local_audio_path)
-        else:
-             raise FileNotFoundError(f"File not found in R2 or disk: {r2_object_key}")
-
-        # [NEW] Fetch Device Calibration Data
-        device = db.query(Device).filter(Device.device_id == analysis_result.device_id).first()
-        calibration_data = device.calibration_data if device else None
-        
-        if calibration_data:
-            print(f"Applying calibration data for device {analysis_result.device_id}: {calibration_data}")
-
-        # 4. 실제 분석 수행 (Using PipelineExecutor)
-        # model_preference는 함수 인자로 받은 값을 사용
-        result_data = asyncio.run(pipeline_executor.analyze_audio_file(
-            Path(local_audio_path), 
-            model_preference=model_preference, # [수정] 인자로 받은 model_preference 전달
-            calibration_data=calibration_data
-        ))
-        
-        # 5. 상태 업데이트: COMPLETED
-        analysis_result.status = "COMPLETED"
-        analysis_result.completed_at = datetime.now(timezone.utc) # [수정] UTC 시간 사용
-        analysis_result.result_data = result_data
-        db.commit()
-        
-        label = result_data.get("label", "UNKNOWN")
+        # [NEW] 같은 시점에 대기 중인 분석을 함께 선점 (마이크로 배치)
+        batch = [(analysis_result, model_preference)] + [
+            (peer, peer.model_preference)
+            for peer in _claim_pending_analyses(db, ANALYSIS_BATCH_SIZE - 1, exclude_id=analysis_result_id)
+        ]
+        if len(batch) > 1:
+            print(f"Micro-batch of {len(batch)} analyses led by task {analysis_result_id}")
+
+        # 3. 오디오 파일 정보 / [NEW] 장비 캘리브레이션 데이터 조회 (배치 전체 1회)
+        audio_files = {
+            audio_file.id: audio_file
+            for audio_file in db.query(AudioFile).filter(
+                AudioFile.id.in_([result.audio_file_id for result, _ in batch])
+            ).all()
+        }
+        devices = {
+            device.device_id: device
+            for device in db.query(Device).filter(
+                Device.device_id.in_({result.device_id for result, _ in batch if result.device_id})
+            ).all()
+        }
+
+        # 분석 대상 정리 (오디오 파일 레코드가 없는 분석은 FAILED 처리)
+        targets = []
+        for result, preference in batch:
+            audio_file = audio_files.get(result.audio_file_id)
+            if not audio_file:
+                print(f"Audio File for Result ID {result.id} not found.")
+                _record_failure(db, result, "Audio file record not found")
+                continue
+
+            device = devices.get(result.device_id)
+            calibration_data = device.calibration_data if device else None
+            if calibration_data:
+                print(f"Applying calibration data for device {result.device_id}: {calibration_data}")
+
+            # 이전에 분산 분석을 시작했지만 reducer가 끝내지 못하고 선점이 만료된 분석 (세그먼트 유실 / 만료) → FAILED
+            if (result.result_data or {}).get("fanout"):
+                print(f"Analysis {result.id}: distributed segment analysis did not finish, marking as failed.")
+                _record_failure(db, result, f"Distributed segment analysis did not finish within {ANALYSIS_CLAIM_TIMEOUT_SEC:.0f}s")
+                continue
+
+            # [NEW] 매우 긴 녹음: 윈도우 세그먼트를 chord로 여러 워커에 분산 (결과는 reduce_segments_task가 기록)
+            # 세그먼트 메시지는 선점 만료 시간이 지나면 실행하지 않음 (만료된 분석은 위의 분기에서 FAILED 처리)
+            plan = _plan_fanout(audio_file)
+            if plan is not None:
+                header, segments = plan
+                result.result_data = {"fanout": {"segments": len(segments), "duration_sec": header["duration"]}}
+                db.commit()
+                chord(
+                    analyze_segment_task.s(result.id, audio_file.file_path, segment, preference or "level1", calibration_data)
+                    .set(expires=ANALYSIS_CLAIM_TIMEOUT_SEC)
+                    for segment in segments
+                )(reduce_segments_task.s(result.id, header["duration"]))
+                fanned_out[result.id] = len(segments)
+                print(f"Analysis {result.id}: {header['duration']:.0f}s recording fanned out to {len(segments)} segment task(s)")
+                continue
+            targets.append((result, audio_file.file_path, preference, calibration_data))
+
+        # 4. R2 다운로드(prefetch)와 디코딩/특징 추출을 겹쳐서 수행:
+        #    현재 클립을 처리하는 동안 다음 AUDIO_PREFETCH_DEPTH건을 백그라운드로 메모리에 내려받음 (임시 파일 없음)
+        prepared = []
+        pending = []
+        with AudioPrefetcher(get_storage(), [file_path for _, file_path, _, _ in targets]) as prefetcher:
+            for (result, file_path, preference, calibration_data), (_, fetched) in zip(targets, prefetcher):
+                if isinstance(fetched, Exception):
+                    print(f"Analysis failed: {fetched}")
+                    _record_failure(db, result, str(fetched))
+                    continue
+                try:
+                    clip = worker_loop.run(pipeline_executor.prepare_clip({
+                        "audio_bytes": fetched,
+                        "name": file_path,
+                        "model_preference": preference or "level1",
+                        "calibration_data": calibration_data
+                    }))
+                except Exception as e:
+                    clip = e
+                prepared.append(clip)
+                pending.append(result)
+
+        # 실제 추론 (Using PipelineExecutor, 모델별 배치 추론)
+        outcomes = worker_loop.run(pipeline_executor.score_prepared(prepared)) if prepared else []
+
+        # 5. 상태 업데이트: 건별 COMPLETED / FAILED
+        for result, outcome in zip(pending, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"Analysis failed: {outcome}")
+                _record_failure(db, result, str(outcome))
+                continue
+            result.status = "COMPLETED"
+            result.completed_at = datetime.now(timezone.utc) # [수정] UTC 시간 사용
+            result.result_data = outcome
+            db.commit()
+
+        if analysis_result.id in fanned_out:
+            return f"Fanned out: {fanned_out[analysis_result.id]} segment(s)"
+        if analysis_result.status != "COMPLETED":
+            return f"Failed: {(analysis_result.result_data or {}).get('error', 'Unknown error')}"
+        label = analysis_result.result_data.get("label", "UNKNOWN")
         return f"Analysis Completed: {label}"
 
     except Exception as e:
         print(f"Analysis failed: {e}")
-        # DB 세션이 유효하다면 상태를 FAILED로 업데이트
+        # DB 세션이 유효하다면 배치 내 미완료 분석을 FAILED로 업데이트
         try:
-            if 'analysis_result' in locals() and analysis_result:
-                analysis_result.status = "FAILED"
-                analysis_result.result_data = {"error": str(e)}
-                db.commit()
+            db.rollback()
+            for result, _ in batch:
+                if result.status != "COMPLETED" and result.id not in fanned_out:
+                    result.status = "FAILED"
+                    result.result_data = {"error": str(e)}
+            db.commit()
+        except:
+            pass
+        return f"Failed: {e}"
+    finally:
+        db.close()
+
+@celery_app.task(name=ANALYZE_SEGMENT_TASK, acks_late=True, reject_on_worker_lost=True)
+def analyze_segment_task(analysis_result_id: str, object_name: str, segment: dict, model_preference: str = "level1", calibration_data: dict = None):
+    """
+    [NEW] 분산 윈도우 분석의 세그먼트 1건: R2에서 세그먼트 byte-range만 내려받아 그 안의 윈도우를 배치 추론합니다.
+    실패해도 예외 대신 {"error": ...}를 반환합니다 (chord는 헤더 태스크가 실패하면 reducer를 실행하지 않으므로,
+    reducer가 분석을 FAILED로 기록할 수 있도록).
+    결과가 입력에만 의존하므로 acks_late: 실행 중 워커가 죽으면 메시지가 다른 워커에 다시 전달됩니다.
+    """
+    try:
+        data = get_storage().get_object_range(object_name, segment["byte_start"], segment["byte_end"])
+        if data is None:
+            raise FileNotFoundError(f"Failed to read bytes {segment['byte_start']}-{segment['byte_end']} of {object_name}")
+        executor = get_pipeline_executor()
+        windows = executor.dsp_filter.iter_pcm_windows(
+            data, segment["starts"], base_frame=segment["base_frame"], total_frames=segment["total_frames"]
+        )
+        return {"windows": worker_loop.run(executor.score_windows(windows, model_preference, calibration_data))}
+    except Exception as e:
+        print(f"Segment analysis failed for {analysis_result_id} (frame {segment.get('base_frame')}): {e}")
+        return {"error": str(e)}
+
+@celery_app.task(name=REDUCE_SEGMENTS_TASK)
+def reduce_segments_task(segment_results: list, analysis_result_id: str, duration: float):
+    """[NEW] 세그먼트별 윈도우 결과를 합쳐 (단일 태스크 윈도우 분석과 같은 형식으로) AIAnalysisResult에 기록합니다."""
+    db: Session = SessionLocal()
+    try:
+        analysis_result = (
+            db.query(AIAnalysisResult)
+            .filter(AIAnalysisResult.id == analysis_result_id)
+            .with_for_update()
+            .first()
+        )
+        if not analysis_result:
+            print(f"Analysis Result ID {analysis_result_id} not found.")
+            return "Not Found"
+        if analysis_result.status == "COMPLETED":
+            db.commit()
+            return "Skipped: COMPLETED"
+
+        errors = [segment["error"] for segment in segment_results if "error" in segment]
+        if errors:
+            _record_failure(db, analysis_result, f"{len(errors)}/{len(segment_results)} segment(s) failed: {errors[0]}")
+            return f"Failed: {errors[0]}"
+
+        windows = sorted(
+            (window for segment in segment_results for window in segment["windows"]),
+            key=lambda window: window["start_sec"]
+        )
+        outcome = get_pipeline_executor().anomaly_scorer.aggregate_windows(windows, duration)
+        outcome["details"]["windows"]["segments"] = len(segment_results)
+
+        analysis_result.status = "COMPLETED"
+        analysis_result.completed_at = datetime.now(timezone.utc)
+        analysis_result.result_data = outcome
+        db.commit()
+        return f"Analysis Completed: {outcome['label']}"
+    except Exception as e:
+        print(f"Reducing segments failed for {analysis_result_id}: {e}")
+        try:
+            db.rollback()
+            analysis_result = db.query(AIAnalysisResult).filter(AIAnalysisResult.id == analysis_result_id).first()
+            if analysis_result and analysis_result.status != "COMPLETED":
+                _record_failure(db, analysis_result, str(e))
         except:
             pass
         return f"Failed: {e}"
     finally:
-        # 6. 파일 청소 (Cleanup)
-        if local_audio_path and os.path.exists(local_audio_path):
-            try:
-                os.remove(local_audio_path)
-                print(f"Deleted temporary file: {local_audio_path}")
-            except Exception as cleanup_error:
-                print(f"Failed to delete file {local_audio_path}: {cleanup_error}")
-        
-        db.close()
\ No newline at end of file
+        db.close()
+
+def _plan_fanout(audio_file: AudioFile):
+    """
+    FANOUT_MIN_DURATION_SEC 이상인 표준 WAV 녹음이면 (헤더, 세그먼트 목록), 아니면 None.
+    file_size로 먼저 걸러 짧은 녹음은 R2 요청(헤더 byte-range)을 추가로 하지 않습니다.
+    """
+    if FANOUT_MIN_DURATION_SEC <= 0 or not audio_file.file_size or audio_file.file_size < FANOUT_MIN_DURATION_SEC * SAMPLE_RATE * 2:
+        return None
+    prefix = get_storage().get_object_range(audio_file.file_path, 0, BUFFER_HEADER_PEEK_BYTES - 1)
+    header = parse_wav_header(io.BytesIO(prefix)) if prefix else None
+    if not is_canonical_wav(header) or header["duration"] < FANOUT_MIN_DURATION_SEC:
+        return None
+    return header, plan_window_segments(header, FANOUT_WINDOWS_PER_SEGMENT)
+
+def _claim(analysis_result: AIAnalysisResult):
+    analysis_result.status = "PROCESSING"
+    analysis_result.claimed_at = datetime.now(timezone.utc)
+
+def _is_stale_claim(analysis_result: AIAnalysisResult) -> bool:
+    """PROCESSING 선점 시각이 ANALYSIS_CLAIM_TIMEOUT_SEC보다 오래되었는지 (선점 시각이 없는 이전 행도 오래된 것으로 간주)"""
+    claimed_at = analysis_result.claimed_at
+    if claimed_at is None:
+        return True
+    if claimed_at.tzinfo is None:
+        claimed_at = claimed_at.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - claimed_at > timedelta(seconds=ANALYSIS_CLAIM_TIMEOUT_SEC)
+
+def _stale_claim_filter():
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=ANALYSIS_CLAIM_TIMEOUT_SEC)
+    return and_(
+        AIAnalysisResult.status == "PROCESSING",
+        or_(AIAnalysisResult.claimed_at.is_(None), AIAnalysisResult.claimed_at < cutoff)
+    )
+
+def _claim_pending_analyses(db: Session, limit: int, exclude_id: str) -> list:
+    """
+    PENDING 분석(과 선점이 오래된 PROCESSING 분석)을 최대 limit건 선점하여 PROCESSING으로 바꿉니다
+    (FOR UPDATE SKIP LOCKED → 워커 간 중복 선점 없음).
+    분석이 계속 들어오는 동안에는 limit건이 모일 때까지 최대 ANALYSIS_BATCH_WAIT_MS 동안 다시 조회하고,
+    조회 결과가 비면 (대기열이 비어 있으면) 바로 중단합니다.
+    model_preference가 기록되지 않은 (레거시) 분석은 자신의 태스크에서 처리되도록 제외합니다.
+    """
+    claimed = []
+    if limit <= 0:
+        return claimed
+
+    deadline = time.monotonic() + ANALYSIS_BATCH_WAIT_MS / 1000
+    while True:
+        query = db.query(AIAnalysisResult).filter(
+            or_(AIAnalysisResult.status == "PENDING", _stale_claim_filter()),
+            AIAnalysisResult.model_preference.isnot(None),
+            AIAnalysisResult.id != exclude_id
+        )
+        if claimed:
+            query = query.filter(AIAnalysisResult.id.notin_([result.id for result in claimed]))
+        rows = (
+            query.order_by(AIAnalysisResult.created_at)
+            .limit(limit - len(claimed))
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not rows:
+            return claimed
+        for result in rows:
+            _claim(result)
+        db.commit()
+        claimed.extend(rows)
+
+        remaining = deadline - time.monotonic()
+        if len(claimed) >= limit or remaining <= 0:
+            return claimed
+        time.sleep(min(0.01, remaining))
+
+def _record_failure(db: Session, analysis_result: AIAnalysisResult, error: str):
+    analysis_result.status = "FAILED"
+    analysis_result.result_data = {"error": error}
+    db.commit()
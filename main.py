@@ -1,7 +1,11 @@
 # main.py
+import time
+_import_started = time.perf_counter() # [NEW] API 임포트 시간 측정 시작 (import_report)
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.worker import test_task
+from app.tasks import test_task # [수정] app.worker 대신 태스크 시그니처만 임포트 (ML 스택 로드 안 함)
+from app.core.import_report import log_import_report
 from app.security import get_password_hash
 from sqlalchemy import select, text, inspect # Added select and inspect
 from app import models # Added models import for seed data
@@ -33,6 +37,9 @@ app.include_router(audio_analysis_router, prefix="/api/mobile", tags=["Mobile An
 # [NEW] V1 API 라우터 등록
 app.include_router(calibration.router, prefix="/api/v1", tags=["Calibration"])
 
+# [NEW] API 임포트 시간 / ML 모듈 로드 여부 기록 (torch 등이 로드되면 경고)
+log_import_report(_import_started)
+
 @app.get("/")
 def read_root():
     return {"message": "SignalCraft API is running!"}
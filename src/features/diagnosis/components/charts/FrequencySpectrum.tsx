@@ -12,6 +12,7 @@ const graphHeight = chartHeight - padding * 2;
 interface DetectedPeak {
   hz: number;
   amp: number;
+  prominence?: number | null;
   match: boolean;
   label?: string;
 }
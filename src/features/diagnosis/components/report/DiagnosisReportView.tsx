@@ -15,6 +15,8 @@ export interface AnalysisDetails {
   method?: string;
   ml_anomaly_score?: number;
   peak_frequencies?: number[];
+  peak_amplitudes?: number[]; // 포락선 스펙트럼 피크 진폭 (peak_frequencies와 같은 순서)
+  peak_prominences?: number[];
   noise_level?: number;
   frequency?: number;
   resonance_energy_ratio?: number;
@@ -56,6 +58,7 @@ interface EnsembleAnalysisData {
 interface DetectedPeak {
   hz: number;
   amp: number;
+  prominence?: number | null;
   match: boolean;
   label?: string;
 }
@@ -202,11 +205,14 @@ export const DetailAnalysisTab: React.FC<{ reportData: DetailedAnalysisReport }>
   if (reportData.analysis_details?.peak_frequencies && reportData.analysis_details.peak_frequencies.length > 0) {
     // 실제 ML 분석 결과가 있으면 덮어쓰기
     const rawPeaks = reportData.analysis_details.peak_frequencies;
+    const rawAmps = reportData.analysis_details.peak_amplitudes ?? [];
+    const rawProms = reportData.analysis_details.peak_prominences ?? [];
     frequencyData = {
       ...frequencyData,
-      detected_peaks: rawPeaks.map(hz => ({
+      detected_peaks: rawPeaks.map((hz, i) => ({
         hz: hz,
-        amp: 0.8, // 백엔드에서 진폭을 안 주므로 시각화용 고정값 사용 (추후 개선 가능)
+        amp: rawAmps[i] ?? 0.8, // 진폭이 없는 이전 분석 결과는 시각화용 고정값 사용
+        prominence: rawProms[i] ?? null,
         match: hz > 0,
         label: `${hz.toFixed(0)}Hz`
       })),
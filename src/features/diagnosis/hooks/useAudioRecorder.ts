@@ -60,9 +60,9 @@ export const useAudioRecorder = () => {
           extension: '.wav', 
           outputFormat: Audio.IOSOutputFormat.LINEARPCM,
           audioQuality: Audio.IOSAudioQuality.HIGH,
-          sampleRate: 44100,        // [변경] 고품질 샘플레이트 (22kHz까지 분석 가능)
+          sampleRate: 16000,        // [수정] 서버 분석 샘플레이트(SAMPLE_RATE)로 녹음 → 업로드 시 ffmpeg 변환 없이 그대로 저장
           numberOfChannels: 1,      // 모노
-          bitRate: 1411,           // 무손실 PCM (16-bit)
+          bitRate: 256,            // 무손실 PCM (16-bit, 16kHz)
           linearPCMBitDepth: 16,
           linearPCMIsBigEndian: false,
           linearPCMIsFloat: false,
@@ -55,7 +55,7 @@ class AnalysisService {
             audio_format: 'm4a', // 포맷 정보 명시
             sample_rate: '44100',  // 샘플레이트 정보 전송
             channels: '2',          // 채널 정보 전송
-            model_preference: selectedModelType, // [수정] model_preference로 selectedModelType 전달
+            model_preference: selectedModelType.startsWith('level2') ? 'level2' : 'level1', // [수정] 레지스트리 모델 타입 대신 분석 레벨 전달 (서버에서 허용 값만 수락)
             target_model_id: selectedModelId, // [NEW] target_model_id 전달
           },
           headers: {